@@ -0,0 +1,419 @@
+"""End-to-end benchmark of the osc-kreuz.
+
+An OSCComCenter with the configured number of sources and receivers is started in this process, while a separate
+driver process sends position updates to its data port at a fixed rate and receives the output of all receivers
+with local sinks. The sustained rates, the latency between sending a position and receiving it at a sink
+and the cpu time the osc-kreuz spent per incoming message are reported.
+"""
+
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+import json
+import logging
+from multiprocessing import get_context
+from multiprocessing.connection import Connection
+from pathlib import Path
+import socket
+import struct
+import sys
+from threading import Thread
+from time import monotonic, process_time, sleep
+from typing import Any, Iterator
+
+import click
+import numpy as np
+from pythonosc.osc_bundle import OscBundle
+from pythonosc.osc_message import OscMessage
+from pythonosc.parsing import osc_types
+
+import osc_kreuz.osccomcenter as osccomcenter
+from osc_kreuz.receiver import createReceiverClient
+from osc_kreuz.receiver.base_receiver import BaseReceiver, ReceiverException
+from osc_kreuz.soundobject import SoundObject
+
+log = logging.getLogger("benchmark")
+
+# the load generator sends to this path, the x coordinate carries a per source sequence number
+# so the sinks can match received positions with the time they were sent
+POSITION_PATH = "/source/xyz"
+POSITION_HEADER = osc_types.write_string(POSITION_PATH) + osc_types.write_string(
+    ",ifff"
+)
+POSITION_ARGS = struct.Struct(">ifff")
+
+# float32 represents integers exactly up to this value
+MAX_SEQUENCE = 1 << 24
+
+# class variables set up for the benchmark, see preserved_class_variables
+configured_class_variables: dict[type, list[str]] = {
+    SoundObject: ["globalConfig", "preferUi", "dataPortTimeOut", "number_renderer"],
+    BaseReceiver: ["globalConfig", "n_sources", "sources", "scheduler", "resolver"],
+}
+
+
+@dataclass
+class BenchmarkResult:
+    n_sources: int
+    n_receivers: int
+    receiver_type: str
+    duration: float
+    messages_sent: int
+    messages_received: int
+    positions_matched: int
+    sent_per_second: float
+    received_per_second: float
+    latency_ms_p50: float
+    latency_ms_p90: float
+    latency_ms_p99: float
+    latency_ms_max: float
+    cpu_us_per_message: float
+
+    def print(self) -> None:
+        print(
+            f"{self.n_sources} sources, {self.n_receivers} {self.receiver_type} receivers, {self.duration:.1f}s"
+        )
+        print(
+            f"  sent:     {self.messages_sent} messages ({self.sent_per_second:.0f}/s)"
+        )
+        print(
+            f"  received: {self.messages_received} messages ({self.received_per_second:.0f}/s), {self.positions_matched} positions matched"
+        )
+        print(
+            f"  latency:  p50 {self.latency_ms_p50:.2f}ms, p90 {self.latency_ms_p90:.2f}ms, p99 {self.latency_ms_p99:.2f}ms, max {self.latency_ms_max:.2f}ms"
+        )
+        print(f"  cpu:      {self.cpu_us_per_message:.1f}us per incoming message")
+
+
+def get_free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def encode_position(source_index: int, sequence: int) -> bytes:
+    return POSITION_HEADER + POSITION_ARGS.pack(source_index + 1, sequence, 0.0, 0.0)
+
+
+def iter_messages(dgram: bytes):
+    if OscBundle.dgram_is_bundle(dgram):
+        for content in OscBundle(dgram):
+            if isinstance(content, OscBundle):
+                yield from iter_messages(content.dgram)
+            else:
+                yield content
+    else:
+        yield OscMessage(dgram)
+
+
+class Sink:
+    """receives the output of a receiver and records when positions arrive"""
+
+    def __init__(self) -> None:
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 22)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.settimeout(0.1)
+        self.port: int = self.sock.getsockname()[1]
+
+        self.running = True
+        self.n_messages = 0
+        # (source index, sequence number, time received)
+        self.positions: list[tuple[int, int, float]] = []
+        self.thread = Thread(target=self.run, name=f"sink {self.port}", daemon=True)
+
+    def run(self) -> None:
+        while self.running:
+            try:
+                dgram = self.sock.recv(65536)
+            except socket.timeout:
+                continue
+            now = monotonic()
+            for msg in iter_messages(dgram):
+                self.n_messages += 1
+                if msg.address == POSITION_PATH:
+                    self.positions.append((msg.params[0], int(msg.params[1]), now))
+
+    def stop(self) -> None:
+        self.running = False
+        self.thread.join()
+        self.sock.close()
+
+
+def run_driver(
+    connection: Connection,
+    start: Any,
+    n_sources: int,
+    n_sinks: int,
+    port_data: int,
+    rate: float,
+    duration: float,
+    drain_time: float,
+) -> None:
+    """runs in the driver process: sends positions at a fixed rate and collects the output of the receivers"""
+    sinks = [Sink() for _ in range(n_sinks)]
+    connection.send([sink.port for sink in sinks])
+    for sink in sinks:
+        sink.thread.start()
+    start.wait()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    target = ("127.0.0.1", port_data)
+    n_total = int(rate * duration)
+    # time each sequence number of each source was sent
+    send_times = np.full((n_sources, n_total // n_sources + 2), np.nan)
+
+    time_start = monotonic()
+    n_sent = 0
+    while n_sent < n_total:
+        # send everything that is due, then yield to the sinks
+        n_due = min(n_total, int((monotonic() - time_start) * rate) + 1)
+        while n_sent < n_due:
+            source_index = n_sent % n_sources
+            sequence = n_sent // n_sources + 1
+            send_times[source_index, sequence] = monotonic()
+            sock.sendto(encode_position(source_index, sequence), target)
+            n_sent += 1
+        sleep(0.0005)
+    time_sent = monotonic() - time_start
+
+    sleep(drain_time)
+    for sink in sinks:
+        sink.stop()
+
+    latencies = [
+        recv_time - send_times[source_index, sequence]
+        for sink in sinks
+        for source_index, sequence, recv_time in sink.positions
+        if 0 <= source_index < n_sources and 0 < sequence < send_times.shape[1]
+    ]
+    connection.send(
+        {
+            "messages_sent": n_sent,
+            "time_sent": time_sent,
+            "messages_received": sum(sink.n_messages for sink in sinks),
+            "latencies": np.array(latencies, dtype=float),
+        }
+    )
+
+
+@contextmanager
+def preserved_class_variables() -> Iterator[None]:
+    """restore the class variables the osc-kreuz is configured with when leaving the context,
+    so the benchmark doesn't change the configuration of other osc-kreuz instances in the same process
+    """
+    saved = {
+        (cls, name): getattr(cls, name)
+        for cls, names in configured_class_variables.items()
+        for name in names
+    }
+    try:
+        yield
+    finally:
+        for (cls, name), value in saved.items():
+            setattr(cls, name, value)
+
+
+def run_benchmark(
+    n_sources: int = 64,
+    n_receivers: int = 2,
+    receiver_type: str = "spatial",
+    rate: float = 1000,
+    duration: float = 5.0,
+    updateintervall: int = 10,
+    drain_time: float = 0.5,
+) -> BenchmarkResult:
+    """start an osc-kreuz and measure its throughput, latency and cpu usage
+
+    Args:
+        n_sources (int, optional): number of sources. Defaults to 64.
+        n_receivers (int, optional): number of receivers, each sending to its own sink. Defaults to 2.
+        receiver_type (str, optional): type of the receivers. Defaults to "spatial".
+        rate (float, optional): incoming messages per second. Defaults to 1000.
+        duration (float, optional): time in s the load is sent. Defaults to 5.0.
+        updateintervall (int, optional): update interval of the receivers in ms. Defaults to 10.
+        drain_time (float, optional): time in s to wait for outstanding output after the load stopped. Defaults to 0.5.
+
+    Returns:
+        BenchmarkResult: the measured values
+    """
+    if rate * duration / n_sources >= MAX_SEQUENCE:
+        raise ValueError("too many messages per source")
+
+    port_ui, port_data, port_settings = (get_free_port() for _ in range(3))
+
+    # threads of the resolver, tcp clients or earlier osc-kreuz instances may be running already,
+    # so the driver is spawned instead of forked
+    context = get_context("spawn")
+    connection, driver_connection = context.Pipe()
+    start = context.Event()
+    driver = context.Process(
+        target=run_driver,
+        args=(
+            driver_connection,
+            start,
+            n_sources,
+            n_receivers,
+            port_data,
+            rate,
+            duration,
+            drain_time,
+        ),
+        name="osc-kreuz-bench driver",
+        daemon=True,
+    )
+    driver.start()
+    sink_ports: list[int] = connection.recv()
+
+    render_units = ["ambi", "wfs", "reverb"]
+    globalconfig: dict[str, Any] = {
+        "number_sources": n_sources,
+        "render_units": render_units,
+        "n_renderengines": len(render_units),
+        "number_direct_sends": 32,
+        "max_gain": 2,
+        "data_port_timeout": 0,
+        "send_changes_only": True,
+    }
+    with preserved_class_variables():
+        # the osc-kreuz of the benchmark gets its own resolver and scheduler, they are stopped on shutdown
+        BaseReceiver.scheduler = None
+        BaseReceiver.resolver = None
+        SoundObject.readGlobalConfig(globalconfig)
+        SoundObject.number_renderer = len(render_units)
+        BaseReceiver.globalConfig = globalconfig
+        BaseReceiver.n_sources = n_sources
+        soundobjects = [SoundObject(objectID=i + 1) for i in range(n_sources)]
+        BaseReceiver.sources = soundobjects
+
+        receivers = [
+            createReceiverClient(
+                {
+                    "type": receiver_type,
+                    "hostname": "127.0.0.1",
+                    "port": port,
+                    "updateintervall": updateintervall,
+                }
+            )
+            for port in sink_ports
+        ]
+
+        osc = osccomcenter.OSCComCenter(
+            soundobjects=soundobjects,
+            receivers=receivers,
+            renderengines=render_units,
+            n_sources=n_sources,
+            n_direct_sends=32,
+            ip="127.0.0.1",
+            port_ui=port_ui,
+            port_data=port_data,
+            port_settings=port_settings,
+        )
+        osc.setupOscBindings()
+        osc.start()
+
+        try:
+            # the driver runs in its own process, so the cpu time of this process is used by the osc-kreuz only
+            cpu_start = process_time()
+            start.set()
+            results = connection.recv()
+            cpu_time = process_time() - cpu_start
+        finally:
+            osc.shutdown()
+            for receiver in receivers:
+                receiver.close()
+            driver.join()
+
+    latencies_ms = results["latencies"] * 1000
+    if len(latencies_ms) == 0:
+        latencies_ms = np.array([np.nan])
+    p50, p90, p99 = np.percentile(latencies_ms, [50, 90, 99])
+    time_sent = results["time_sent"]
+
+    return BenchmarkResult(
+        n_sources=n_sources,
+        n_receivers=n_receivers,
+        receiver_type=receiver_type,
+        duration=time_sent,
+        messages_sent=results["messages_sent"],
+        messages_received=results["messages_received"],
+        positions_matched=len(results["latencies"]),
+        sent_per_second=results["messages_sent"] / time_sent,
+        received_per_second=results["messages_received"] / (time_sent + drain_time),
+        latency_ms_p50=float(p50),
+        latency_ms_p90=float(p90),
+        latency_ms_p99=float(p99),
+        latency_ms_max=float(np.max(latencies_ms)),
+        cpu_us_per_message=cpu_time / max(1, results["messages_sent"]) * 1e6,
+    )
+
+
+@click.command(help="Benchmark throughput and latency of the osc-kreuz")
+@click.option("--sources", "n_sources", type=click.INT, default=64, show_default=True)
+@click.option(
+    "--receivers",
+    "n_receivers",
+    type=click.INT,
+    default=2,
+    show_default=True,
+    help="number of receivers, each sends to its own sink",
+)
+@click.option(
+    "--receiver-type", type=click.STRING, default="spatial", show_default=True
+)
+@click.option(
+    "--rate",
+    type=click.FLOAT,
+    default=1000,
+    show_default=True,
+    help="incoming messages per second",
+)
+@click.option(
+    "--duration",
+    type=click.FLOAT,
+    default=5.0,
+    show_default=True,
+    help="time in s the load is sent",
+)
+@click.option(
+    "--updateintervall",
+    type=click.INT,
+    default=10,
+    show_default=True,
+    help="update interval of the receivers in ms",
+)
+@click.option(
+    "--json",
+    "json_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="also write the results to this file",
+)
+def main(
+    n_sources: int,
+    n_receivers: int,
+    receiver_type: str,
+    rate: float,
+    duration: float,
+    updateintervall: int,
+    json_path: Path | None,
+) -> None:
+    logging.basicConfig(level=logging.WARNING)
+    try:
+        result = run_benchmark(
+            n_sources=n_sources,
+            n_receivers=n_receivers,
+            receiver_type=receiver_type,
+            rate=rate,
+            duration=duration,
+            updateintervall=updateintervall,
+        )
+    except (ReceiverException, ValueError) as e:
+        log.error(e)
+        sys.exit(-1)
+
+    result.print()
+    if json_path is not None:
+        json_path.write_text(json.dumps(asdict(result), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -126,6 +126,8 @@ def read_config_option(
                 )
                 option_name = deprecated_option_name
                 break
+        else:
+            return default
     else:
         return default
 
@@ -0,0 +1,129 @@
+"""Tracing of the time between receiving a message and sending the resulting update to the receivers.
+
+The osc servers stamp every datagram with the monotonic time it was received, the stamp is kept for the thread
+handling the datagram until it was handled. When a receiver queues an update of a source while a datagram is handled,
+the time it was received and the time the update was queued are kept until the update is sent.
+Updates that were not caused by a received message, like state dumps, are not traced. The latency is split into
+processing (the time spent handling the message and building and sending the update)
+and hold time (the time the update waited in the queue for the update interval of the receiver to pass).
+"""
+
+from bisect import bisect_left
+from threading import Lock, local
+
+_received = local()
+
+# upper bounds in s of the histogram buckets, four per decade from 10us to 10s, the last bucket is unbounded
+BUCKET_BOUNDS = [10 ** (exponent / 4) for exponent in range(-20, 5)]
+
+
+def set_receive_time(receive_time: float) -> None:
+    """set the time the message handled by the current thread was received
+
+    Args:
+        receive_time (float): time from time.monotonic()
+    """
+    _received.time = receive_time
+
+
+def clear_receive_time() -> None:
+    """forget the receive time of the current thread, called after the message was handled"""
+    _received.time = None
+
+
+def get_receive_time() -> float | None:
+    """get the time the message handled by the current thread was received
+
+    Returns:
+        float | None: time from time.monotonic(), None if the thread isn't handling a received message
+    """
+    return getattr(_received, "time", None)
+
+
+class LatencyHistogram:
+    """histogram of latencies with logarithmically spaced buckets"""
+
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.buckets[bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, p: float) -> float:
+        """upper bound of the bucket containing the p-th percentile, the maximum for the unbounded bucket
+
+        Args:
+            p (float): percentile between 0 and 100
+
+        Returns:
+            float: latency in s, 0 if nothing was recorded
+        """
+        if self.count == 0:
+            return 0.0
+        rank = p / 100 * self.count
+        cumulative = 0
+        for bound, n in zip(BUCKET_BOUNDS, self.buckets):
+            cumulative += n
+            if cumulative >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"mean {self.mean * 1000:.2f}ms, p50 {self.percentile(50) * 1000:.2f}ms, "
+            f"p99 {self.percentile(99) * 1000:.2f}ms, max {self.max * 1000:.2f}ms"
+        )
+
+
+class ReceiverLatency:
+    """latency histograms of a single receiver"""
+
+    def __init__(self) -> None:
+        self.lock = Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.hold = LatencyHistogram()
+            self.processing = LatencyHistogram()
+            self.total = LatencyHistogram()
+
+    def record(
+        self,
+        time_received: float,
+        time_queued: float,
+        time_flushed: float,
+        time_sent: float,
+    ) -> None:
+        """record the latency of a sent update
+
+        Args:
+            time_received (float): time the message that caused the update was received
+            time_queued (float): time the update was queued by the receiver
+            time_flushed (float): time the receiver started building the messages
+            time_sent (float): time all messages were sent
+        """
+        with self.lock:
+            self.hold.record(time_flushed - time_queued)
+            self.processing.record(
+                (time_queued - time_received) + (time_sent - time_flushed)
+            )
+            self.total.record(time_sent - time_received)
+
+    def summary(self) -> str:
+        with self.lock:
+            return (
+                f"{self.total.count} updates, total: {self.total.summary()}; "
+                f"hold: {self.hold.summary()}; processing: {self.processing.summary()}"
+            )
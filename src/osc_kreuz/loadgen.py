@@ -0,0 +1,430 @@
+"""Synthetic load for the osc-kreuz: sources moving on trajectories, gain fader sweeps and attribute toggles.
+
+All values of a tick are computed and packed with numpy at once, only the osc path of each message is
+prepended in python, so a single process can generate well over 100k messages per second.
+"""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+import logging
+import socket
+import sys
+from time import perf_counter, sleep
+
+import click
+import numpy as np
+from pythonosc.parsing import osc_types
+
+import osc_kreuz.conversionsTools as conversions
+from osc_kreuz.coordinates import (
+    CoordinateFormatException,
+    CoordinateSystemType,
+    get_all_coordinate_formats,
+    parse_coordinate_format,
+)
+from osc_kreuz.receiver.updates import BUNDLE_PREFIX
+import osc_kreuz.str_keys_conventions as skc
+
+log = logging.getLogger("loadgen")
+
+trajectories = ["circle", "line", "random"]
+toggled_attributes = [skc.SourceAttributes.doppler, skc.SourceAttributes.planewave]
+
+
+@dataclass
+class LoadConfig:
+    n_sources: int = 64
+    rate: float = 10000
+    coordinate_format: str = "xyz"
+    trajectory: str = "circle"
+    radius: float = 5.0
+    period: float = 10.0
+    extended_ratio: float = 0.5
+    gain_ratio: float = 0.1
+    attribute_ratio: float = 0.01
+    render_units: tuple[str, ...] = ("ambi", "wfs", "reverb")
+    bundle_size: int = 1
+    tick: float = 0.01
+    seed: int = 0
+
+
+def osc_header(path: str, type_tags: str) -> bytes:
+    return osc_types.write_string(path) + osc_types.write_string("," + type_tags)
+
+
+class LoadGenerator:
+    """Generates the datagrams sent in each tick of the load"""
+
+    def __init__(self, config: LoadConfig) -> None:
+        if config.coordinate_format not in get_all_coordinate_formats():
+            raise CoordinateFormatException(
+                f"invalid coordinate format {config.coordinate_format}"
+            )
+        if config.trajectory not in trajectories:
+            raise ValueError(f"invalid trajectory {config.trajectory}")
+
+        self.config = config
+        self.rng = np.random.default_rng(config.seed)
+        self.coordinate_system, coordinate_keys = parse_coordinate_format(
+            config.coordinate_format
+        )
+        self.coordinate_keys = [key.value for key in coordinate_keys]
+        n_values = len(self.coordinate_keys)
+        self.n_sent = 0
+
+        n = config.n_sources
+        sources = np.arange(n)
+        # every source starts at a different point of the trajectory
+        self.phases = sources / n * 2 * np.pi
+        self.heights = np.linspace(0, 2, n)
+        self.walk = self.rng.uniform(-config.radius, config.radius, (3, n))
+        self.walk[2] = 0
+
+        fmt = config.coordinate_format
+        render_unit_aliases = [
+            skc.osc_aliases.get(render_unit, [render_unit])[0]
+            for render_unit in config.render_units
+        ]
+
+        # osc path and type tags of every message kind, for base paths the source index is the first argument
+        position_base = osc_header(f"/source/{fmt}", "i" + "f" * n_values)
+        position_extended = [
+            osc_header(f"/source/{i + 1}/{fmt}", "f" * n_values) for i in sources
+        ]
+        gain_base = [osc_header(f"/source/send/{r}", "if") for r in render_unit_aliases]
+        gain_extended = [
+            [osc_header(f"/source/{i + 1}/send/{r}", "f") for r in render_unit_aliases]
+            for i in sources
+        ]
+        attribute_base = [
+            osc_header(f"/source/{a.value}", "if") for a in toggled_attributes
+        ]
+        attribute_extended = [
+            [osc_header(f"/source/{i + 1}/{a.value}", "f") for a in toggled_attributes]
+            for i in sources
+        ]
+        self.headers: dict[str, Callable[[int, int], bytes]] = {
+            "position_base": lambda source, _: position_base,
+            "position_extended": lambda source, _: position_extended[source],
+            "gain_base": lambda source, sub: gain_base[sub],
+            "gain_extended": lambda source, sub: gain_extended[source][sub],
+            "attribute_base": lambda source, sub: attribute_base[sub],
+            "attribute_extended": lambda source, sub: attribute_extended[source][sub],
+        }
+
+    def get_positions(self, t: float) -> np.ndarray:
+        """positions of all sources at time t in the coordinate format of the load, shape (n_values, n_sources)"""
+        config = self.config
+        angles = self.phases + 2 * np.pi * t / config.period
+        if config.trajectory == "circle":
+            xyz = np.array(
+                [
+                    config.radius * np.cos(angles),
+                    config.radius * np.sin(angles),
+                    self.heights,
+                ]
+            )
+        elif config.trajectory == "line":
+            x = config.radius * np.sin(angles)
+            xyz = np.array([x, np.zeros_like(x), self.heights])
+        else:
+            step = config.radius * config.tick / config.period
+            self.walk[:2] += self.rng.normal(0, step, (2, config.n_sources))
+            np.clip(self.walk, -config.radius, config.radius, out=self.walk)
+            xyz = self.walk.copy()
+
+        if self.coordinate_system == CoordinateSystemType.Cartesian:
+            values = dict(zip("xyz", xyz))
+        else:
+            values = dict(
+                zip(
+                    "aed",
+                    conversions.xyz2aed(
+                        *xyz,
+                        coordinates_in_degree=self.coordinate_system
+                        == CoordinateSystemType.Polar,
+                    ),
+                )
+            )
+        return np.array([values[key] for key in self.coordinate_keys])
+
+    def encode(
+        self,
+        kind: str,
+        sources: np.ndarray,
+        sub_indices: np.ndarray,
+        extended: np.ndarray,
+        values: np.ndarray,
+    ) -> list[bytes]:
+        """encode messages of one kind, the arguments are packed for all messages at once
+
+        Args:
+            kind (str): position, gain or attribute
+            sources (np.ndarray): source index of every message
+            sub_indices (np.ndarray): render unit or attribute index of every message
+            extended (np.ndarray): True for messages sent to the extended path
+            values (np.ndarray): float arguments of every message, shape (n_messages, n_values)
+
+        Returns:
+            list[bytes]: the encoded messages
+        """
+        messages: list[bytes] = []
+        for is_extended in (False, True):
+            mask = extended == is_extended
+            if not np.any(mask):
+                continue
+            n_values = values.shape[1]
+            fields = [(f"v{i}", ">f4") for i in range(n_values)]
+            if not is_extended:
+                fields.insert(0, ("source", ">i4"))
+            args = np.empty(int(np.count_nonzero(mask)), dtype=fields)
+            if not is_extended:
+                args["source"] = sources[mask] + 1
+            for i in range(n_values):
+                args[f"v{i}"] = values[mask, i]
+
+            header = self.headers[f"{kind}_{'extended' if is_extended else 'base'}"]
+            data = args.tobytes()
+            size = args.dtype.itemsize
+            messages.extend(
+                header(source, sub) + data[i * size : (i + 1) * size]
+                for i, (source, sub) in enumerate(
+                    zip(sources[mask].tolist(), sub_indices[mask].tolist())
+                )
+            )
+        return messages
+
+    def generate(self, t: float, n_messages: int) -> list[bytes]:
+        """generate the messages of a tick
+
+        Args:
+            t (float): time since the start of the load in s
+            n_messages (int): number of messages
+
+        Returns:
+            list[bytes]: datagrams, single messages or bundles
+        """
+        config = self.config
+        if n_messages <= 0:
+            return []
+
+        # sources take turns, the kind of every message is drawn randomly
+        sources = (self.n_sent + np.arange(n_messages)) % config.n_sources
+        self.n_sent += n_messages
+        kinds = self.rng.random(n_messages)
+        extended = self.rng.random(n_messages) < config.extended_ratio
+        is_gain = kinds < config.gain_ratio
+        is_attribute = ~is_gain & (kinds < config.gain_ratio + config.attribute_ratio)
+        is_position = ~is_gain & ~is_attribute
+
+        messages: list[bytes] = []
+        if np.any(is_position):
+            positions = self.get_positions(t)
+            messages += self.encode(
+                "position",
+                sources[is_position],
+                np.zeros(np.count_nonzero(is_position), dtype=int),
+                extended[is_position],
+                positions[:, sources[is_position]].T,
+            )
+        if np.any(is_gain):
+            gain_sources = sources[is_gain]
+            render_units = gain_sources % len(config.render_units)
+            # faders sweep between 0 and 1
+            gains = 0.5 + 0.5 * np.sin(
+                self.phases[gain_sources] + 2 * np.pi * t / config.period
+            )
+            messages += self.encode(
+                "gain", gain_sources, render_units, extended[is_gain], gains[:, None]
+            )
+        if np.any(is_attribute):
+            attribute_sources = sources[is_attribute]
+            attributes = attribute_sources % len(toggled_attributes)
+            # attributes are toggled every period
+            toggles = (int(t / config.period) + attribute_sources) % 2
+            messages += self.encode(
+                "attribute",
+                attribute_sources,
+                attributes,
+                extended[is_attribute],
+                toggles[:, None].astype(float),
+            )
+
+        if config.bundle_size <= 1:
+            return messages
+
+        header = BUNDLE_PREFIX + osc_types.write_date(osc_types.IMMEDIATELY)
+        return [
+            header
+            + b"".join(
+                osc_types.write_int(len(msg)) + msg
+                for msg in messages[i : i + config.bundle_size]
+            )
+            for i in range(0, len(messages), config.bundle_size)
+        ]
+
+
+def run_load(
+    config: LoadConfig, ip: str, port: int, duration: float = 0
+) -> tuple[int, float]:
+    """send the load to an osc-kreuz
+
+    Args:
+        config (LoadConfig): configuration of the load
+        ip (str): ip of the osc-kreuz
+        port (int): port of the osc-kreuz
+        duration (float, optional): time in s the load is sent, 0 runs forever. Defaults to 0.
+
+    Returns:
+        tuple[int, float]: number of sent messages and the time it took
+    """
+    generator = LoadGenerator(config)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 22)
+    target = (ip, port)
+
+    n_sent = 0
+    time_start = perf_counter()
+    next_tick = time_start
+    while duration <= 0 or next_tick - time_start < duration:
+        t = next_tick - time_start
+        # the number of messages that are due, so rounding errors don't add up
+        n_messages = int((t + config.tick) * config.rate) - n_sent
+        for dgram in generator.generate(t, n_messages):
+            sock.sendto(dgram, target)
+        n_sent += max(0, n_messages)
+
+        next_tick += config.tick
+        delay = next_tick - perf_counter()
+        if delay > 0:
+            sleep(delay)
+        elif delay < -1:
+            log.warning(f"can't keep up with the rate, {-delay:.1f}s behind")
+            next_tick = perf_counter()
+
+    sock.close()
+    return n_sent, perf_counter() - time_start
+
+
+@click.command(help="Send synthetic load to an osc-kreuz")
+@click.option("-i", "--ip", type=click.STRING, default="127.0.0.1", show_default=True)
+@click.option(
+    "--target",
+    type=click.Choice(["ui", "data"]),
+    default="data",
+    show_default=True,
+    help="port the load is sent to",
+)
+@click.option(
+    "-p", "--port", type=click.INT, help="send to this port instead of the default"
+)
+@click.option("--sources", "n_sources", type=click.INT, default=64, show_default=True)
+@click.option(
+    "--rate",
+    type=click.FLOAT,
+    default=10000,
+    show_default=True,
+    help="messages per second",
+)
+@click.option(
+    "--duration",
+    type=click.FLOAT,
+    default=0,
+    show_default=True,
+    help="time in s, 0 runs until interrupted",
+)
+@click.option(
+    "--format",
+    "coordinate_format",
+    type=click.STRING,
+    default="xyz",
+    show_default=True,
+    help="coordinate format of the positions",
+)
+@click.option(
+    "--trajectory",
+    type=click.Choice(trajectories),
+    default="circle",
+    show_default=True,
+)
+@click.option("--radius", type=click.FLOAT, default=5.0, show_default=True)
+@click.option(
+    "--period",
+    type=click.FLOAT,
+    default=10.0,
+    show_default=True,
+    help="time in s for a round of the trajectory and a fader sweep",
+)
+@click.option(
+    "--extended-ratio",
+    type=click.FLOAT,
+    default=0.5,
+    show_default=True,
+    help="share of messages sent to extended paths (source index in the path)",
+)
+@click.option(
+    "--gain-ratio",
+    type=click.FLOAT,
+    default=0.1,
+    show_default=True,
+    help="share of gain messages",
+)
+@click.option(
+    "--attribute-ratio",
+    type=click.FLOAT,
+    default=0.01,
+    show_default=True,
+    help="share of attribute messages",
+)
+@click.option(
+    "--bundle-size",
+    type=click.INT,
+    default=1,
+    show_default=True,
+    help="messages per bundle, 1 sends single messages",
+)
+def main(
+    ip: str,
+    target: str,
+    port: int | None,
+    n_sources: int,
+    rate: float,
+    duration: float,
+    coordinate_format: str,
+    trajectory: str,
+    radius: float,
+    period: float,
+    extended_ratio: float,
+    gain_ratio: float,
+    attribute_ratio: float,
+    bundle_size: int,
+) -> None:
+    logging.basicConfig(level=logging.INFO)
+    if port is None:
+        port = 4455 if target == "ui" else 4007
+
+    config = LoadConfig(
+        n_sources=n_sources,
+        rate=rate,
+        coordinate_format=coordinate_format,
+        trajectory=trajectory,
+        radius=radius,
+        period=period,
+        extended_ratio=extended_ratio,
+        gain_ratio=gain_ratio,
+        attribute_ratio=attribute_ratio,
+        bundle_size=bundle_size,
+    )
+    log.info(f"sending {rate:.0f} messages/s for {n_sources} sources to {ip}:{port}")
+    try:
+        n_sent, time_sent = run_load(config, ip, port, duration)
+    except (CoordinateFormatException, ValueError) as e:
+        log.error(e)
+        sys.exit(-1)
+    except KeyboardInterrupt:
+        return
+    log.info(f"sent {n_sent} messages in {time_sent:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
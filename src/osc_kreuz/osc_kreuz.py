@@ -5,7 +5,7 @@ from pathlib import Path
 import signal
 import sys
 from threading import Event
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import click
 
@@ -18,10 +18,14 @@ from osc_kreuz.config import (
 )
 import osc_kreuz.osccomcenter as osccomcenter
 from osc_kreuz.receiver.base_receiver import BaseReceiver, ReceiverException
-from osc_kreuz.receiver import createReceiverClient, receiver_name_dict
+from osc_kreuz.receiver import createReceiverClient, get_receiver_class
 from osc_kreuz.soundobject import SoundObject
 import osc_kreuz.str_keys_conventions as skc
 
+# the state file is only imported if it is configured
+if TYPE_CHECKING:
+    from osc_kreuz.receiver.source_state import SourceStateFile
+
 logFormat = "%(asctime)s [%(threadName)-12.12s] [%(levelname)-5.5s]: %(message)s"
 timeFormat = "%Y-%m-%d %H:%M:%S"
 logging.basicConfig(format=logFormat, datefmt=timeFormat, level=logging.INFO)
@@ -87,6 +91,29 @@ def debug_prints(
     help='ip and port for debug messages, e.g. "130.149.23.46:55112"',
     type=click.STRING,
 )
+@click.option(
+    "--oscdebug-sample",
+    help="only copy every n-th packet to the debug client",
+    type=click.INT,
+    default=1,
+)
+@click.option(
+    "--oscdebug-filter",
+    help='only copy packets of this receiver type, or messages starting with this path if it starts with "/"',
+    type=click.STRING,
+    default="",
+)
+@click.option(
+    "--oscdebug-bundle",
+    help="send unchanged copies wrapped in bundles instead of prefixing the osc path",
+    is_flag=True,
+)
+@click.option(
+    "--record",
+    "record_path",
+    help="record all incoming osc to this file, it can be replayed with osc-kreuz-replay",
+    type=click.Path(dir_okay=False, path_type=Path),
+)
 @click.option(
     "-i",
     "--ip",
@@ -116,6 +143,10 @@ def debug_prints(
 def main(
     config_path: Path,
     oscdebug: str | None,
+    oscdebug_sample: int,
+    oscdebug_filter: str,
+    oscdebug_bundle: bool,
+    record_path: Path | None,
     verbose: int,
     ip: str | None,
     port_ui: int | None,
@@ -135,8 +166,13 @@ def main(
         oscDebugParams = oscdebug.split(":")
         debugIp = oscDebugParams[0]
         debugPort = int(oscDebugParams[1])
-        BaseReceiver.createDebugClient(debugIp, debugPort)
-        BaseReceiver.debugCopy = True
+        BaseReceiver.createDebugClient(
+            debugIp,
+            debugPort,
+            sample_every=oscdebug_sample,
+            filter=oscdebug_filter,
+            wrap_in_bundles=oscdebug_bundle,
+        )
 
     # read config values
     globalconfig: dict[str, Any] = read_config_option(
@@ -181,6 +217,14 @@ def main(
     # soundobjects are added as a class variable to the render class, so every renderer has access to them
     BaseReceiver.sources = soundobjects
 
+    # restore the state of the sources from the last run
+    source_state_path = read_config_option(globalconfig, "source_state_file", str, None)
+    source_state_restored = False
+    if source_state_path is not None:
+        from osc_kreuz.receiver.source_state import load_source_state
+
+        source_state_restored = load_source_state(source_state_path, soundobjects)
+
     receivers: list[BaseReceiver] = []
 
     # setting up receivers from config file
@@ -198,8 +242,15 @@ def main(
 
     # setting up receivers from state file
     for receiver in get_receivers_with_state_file():
+        try:
+            receiver_class = get_receiver_class(receiver)
+        except ReceiverException as e:
+            log.error(f"Can't create receiver {receiver} from state file:")
+            log.error(e)
+            continue
+
         # check if receiver for this state already exists
-        if any((isinstance(r, receiver_name_dict[receiver]) for r in receivers)):
+        if any((isinstance(r, receiver_class) for r in receivers)):
             log.warning(
                 "receiver with state from last run already exists, state is thus ignored"
             )
@@ -212,10 +263,30 @@ def main(
             "updateintervall": 50,  # TODO find a better way to set this default
         }
         try:
-            receivers.append(createReceiverClient(receiver_config))
+            state_receiver = createReceiverClient(receiver_config)
         except ReceiverException as e:
             log.error(f"Can't create receiver {receiver} from state file:")
             log.error(e)
+            continue
+        # receivers from the state file are not part of the config, so they are kept when it is reloaded
+        state_receiver.config = None
+        receivers.append(state_receiver)
+
+    # keep writing the state of the sources to the file it was restored from
+    source_state_file: "SourceStateFile | None" = None
+    if source_state_path is not None:
+        from osc_kreuz.receiver.source_state import SourceStateFile
+
+        try:
+            source_state_file = SourceStateFile(
+                source_state_path,
+                flush_interval=read_config_option(
+                    globalconfig, "source_state_flush_interval", float, 1.0
+                ),
+            )
+            receivers.append(source_state_file)
+        except ReceiverException as e:
+            log.error(e)
 
     # Setup OSC Com center
     osc = osccomcenter.OSCComCenter(
@@ -228,21 +299,30 @@ def main(
         port_ui=port_ui,
         port_data=port_data,
         port_settings=port_settings,
+        config_path=config_path,
     )
     osc.setupOscBindings()
     osc.setVerbosity(verbose)
+    if record_path is not None:
+        osc.start_recording(record_path)
 
     # TODO handle this somewhere else
     extendedOscInput = True
     if verbose > 0:
         debug_prints(globalconfig, extendedOscInput, verbose)
     osc.start()
+    if source_state_restored:
+        # send the restored state right away, instead of waiting for the clients to send it again
+        for receiver in osc.receivers:
+            receiver.dump_state()
     log.info("OSC router ready to use")
     log.info("have fun...")
     try:
         signal.signal(signal.SIGTERM, signal_handler)
         # signal.signal(signal.SIGINT, signal_handler)
         signal.signal(signal.SIGUSR1, signal_handler)
+        signal.signal(signal.SIGUSR2, lambda *args: osc.start_profiling())
+        signal.signal(signal.SIGHUP, lambda *args: osc.request_reload())
     except ValueError:
         log.warning("can't register signal handlers in sub threads")
 
@@ -251,6 +331,8 @@ def main(
         stop_event.wait()
     finally:
         osc.shutdown()
+        if source_state_file is not None:
+            source_state_file.close()
 
 
 if __name__ == "__main__":
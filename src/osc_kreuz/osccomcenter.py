@@ -1,23 +1,149 @@
 from collections.abc import Callable
+from copy import deepcopy
 from functools import partial
 import ipaddress
 import logging
-from threading import Semaphore, Thread
-from typing import Any
+from pathlib import Path
+from threading import Lock, Semaphore, Thread
+from time import monotonic, time
+from typing import TYPE_CHECKING, Any
 
 from pythonosc.dispatcher import Dispatcher
+from pythonosc.osc_message import OscMessage
+from pythonosc.osc_packet import OscPacket, ParseError
 from pythonosc.osc_server import BlockingOSCUDPServer
 
+from osc_kreuz.config import ConfigError, read_config, read_config_option
 from osc_kreuz.coordinates import get_all_coordinate_formats
+from osc_kreuz.latency import clear_receive_time, set_receive_time
+from osc_kreuz.profiler import SamplingProfiler
+from osc_kreuz.receiver import createReceiverClient
 from osc_kreuz.receiver.base_receiver import BaseReceiver, ReceiverException
-from osc_kreuz.receiver.viewclient import ViewClient
-from osc_kreuz.receiver.wonder import TWonder
+from osc_kreuz.recorder import PortType, TrafficRecorder
+from osc_kreuz.scheduler import Scheduler
 from osc_kreuz.soundobject import SoundObject
 import osc_kreuz.str_keys_conventions as skc
 
+# view clients and twonders are only imported when the first one connects
+if TYPE_CHECKING:
+    from osc_kreuz.receiver.viewclient import (
+        LivenessManager,
+        ViewClient,
+        ViewClientGroup,
+        ViewClientGroupKey,
+    )
+
 log = logging.getLogger("OSCcomcenter")
 # log.setLevel(logging.DEBUG)
 
+# the sources, servers and renderer indices are built from these options, changing them needs a restart
+restart_config_options = [
+    "number_sources",
+    "render_units",
+    "number_direct_sends",
+    "room_scaling_factor",
+    "ip",
+    "port_ui",
+    "port_data",
+    "port_settings",
+    "source_state_file",
+]
+
+# options of a receiver config that can be changed without recreating the receiver
+host_config_options = ["hostname", "hosts", "port"]
+
+
+def without_host_options(receiver_config: dict | None) -> dict | None:
+    if receiver_config is None:
+        return None
+    return {
+        option: value
+        for option, value in receiver_config.items()
+        if option not in host_config_options
+    }
+
+
+class OSCUDPServer(BlockingOSCUDPServer):
+    """BlockingOSCUDPServer that stamps every received datagram with the time it was received
+    and passes it to a recorder, if one is set"""
+
+    def __init__(self, server_address, dispatcher, port_type: PortType) -> None:
+        super().__init__(server_address, dispatcher)
+        self.port_type = port_type
+        self.recorder: TrafficRecorder | None = None
+
+    def verify_request(self, request, client_address) -> bool:
+        set_receive_time(monotonic())
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record(self.port_type, request[0])
+        return True
+
+    def process_request(self, request, client_address) -> None:
+        try:
+            super().process_request(request, client_address)
+        finally:
+            # updates sent later by this thread, e.g. from a timer, were not caused by this datagram
+            clear_receive_time()
+
+
+class ScheduledDispatcher(Dispatcher):
+    """Dispatcher that handles the messages of bundles with a timetag in the future at their due time on a Scheduler.
+    The Dispatcher of python-osc waits for the timetag in the server thread, blocking all messages received after it
+    """
+
+    def __init__(self, scheduler: Scheduler) -> None:
+        super().__init__()
+        self.scheduler = scheduler
+
+    def call_handlers_for_packet(
+        self, data: bytes, client_address: tuple[str, int]
+    ) -> list:
+        results = []
+        try:
+            packet = OscPacket(data)
+        except ParseError:
+            return results
+
+        # messages that are due are timed with the time the packet was parsed, so this is never earlier
+        now = time()
+        scheduled_messages: dict[float, list[OscMessage]] = {}
+        for timed_msg in packet.messages:
+            if timed_msg.time > now:
+                scheduled_messages.setdefault(timed_msg.time, []).append(
+                    timed_msg.message
+                )
+            else:
+                results.extend(self.call_handlers(timed_msg.message, client_address))
+
+        # timetags are system time, the scheduler runs on the monotonic clock
+        for timetag, messages in scheduled_messages.items():
+            self.scheduler.call_later(
+                timetag - now, self.call_scheduled_handlers, messages, client_address
+            )
+        return results
+
+    def call_handlers(
+        self, message: OscMessage, client_address: tuple[str, int]
+    ) -> list:
+        results = []
+        for handler in self.handlers_for_address(message.address):
+            result = handler.invoke(client_address, message)
+            if result is not None:
+                results.append(result)
+        return results
+
+    def call_scheduled_handlers(
+        self, messages: list[OscMessage], client_address: tuple[str, int]
+    ) -> None:
+        # the latency of the resulting updates is counted from the time the messages are applied
+        set_receive_time(monotonic())
+        try:
+            for message in messages:
+                self.call_handlers(message, client_address)
+        finally:
+            clear_receive_time()
+
 
 class OSCComCenter:
     def __init__(
@@ -31,10 +157,15 @@ class OSCComCenter:
         port_ui: int,
         port_data: int,
         port_settings: int,
+        config_path: Path | None = None,
     ) -> None:
         self.soundobjects = soundobjects
+        # the config file is read again on reload, if it is None the default locations are searched
+        self.config_path = config_path
 
-        self.subscribed_clients: dict[str, ViewClient] = {}
+        self.subscribed_clients: dict[str, "ViewClient"] = {}
+        # view clients with the same output format share a group, which is the actual receiver
+        self.view_client_groups: dict["ViewClientGroupKey", "ViewClientGroup"] = {}
         self.receivers = receivers
         self.extendedOscInput = True
         self.verbosity = 0
@@ -45,8 +176,13 @@ class OSCComCenter:
         self.n_sources = n_sources
         self.n_direct_sends = n_direct_sends
 
-        self.osc_ui_dispatcher = Dispatcher()
-        self.osc_data_dispatcher = Dispatcher()
+        # timed tasks run on a single scheduler thread
+        self.scheduler = Scheduler()
+        BaseReceiver.scheduler = self.scheduler
+
+        # bundles with a timetag in the future are applied to the sources at their due time
+        self.osc_ui_dispatcher = ScheduledDispatcher(self.scheduler)
+        self.osc_data_dispatcher = ScheduledDispatcher(self.scheduler)
         self.osc_setting_dispatcher = Dispatcher()
 
         self.ip = ip
@@ -54,19 +190,29 @@ class OSCComCenter:
         self.port_data = port_data
         self.port_settings = port_settings
 
-        self.osc_ui_server = BlockingOSCUDPServer(
-            (self.ip, self.port_ui), self.osc_ui_dispatcher
+        self.osc_ui_server = OSCUDPServer(
+            (self.ip, self.port_ui), self.osc_ui_dispatcher, PortType.ui
         )
-        self.osc_data_server = BlockingOSCUDPServer(
-            (self.ip, self.port_data), self.osc_data_dispatcher
+        self.osc_data_server = OSCUDPServer(
+            (self.ip, self.port_data), self.osc_data_dispatcher, PortType.data
         )
-        self.osc_setting_server = BlockingOSCUDPServer(
-            (self.ip, self.port_settings), self.osc_setting_dispatcher
+        self.osc_setting_server = OSCUDPServer(
+            (self.ip, self.port_settings),
+            self.osc_setting_dispatcher,
+            PortType.settings,
         )
+        self.recorder: TrafficRecorder | None = None
+        self.profiler: SamplingProfiler | None = None
 
         self.connection_semaphore = Semaphore()
+        # reloads run on their own thread, one at a time
+        self.reload_lock = Lock()
+
+        # pings the view clients, created when the first view client subscribes
+        self.liveness: "LivenessManager | None" = None
 
     def start(self):
+        self.scheduler.start()
         Thread(
             target=self.osc_ui_server.serve_forever, args=(0.1,), name="osc ui"
         ).start()
@@ -83,9 +229,200 @@ class OSCComCenter:
         self.osc_ui_server.shutdown()
         self.osc_data_server.shutdown()
         self.osc_setting_server.shutdown()
-        for c in self.subscribed_clients.values():
-            if c.pingTimer is not None:
-                c.pingTimer.cancel()
+        self.scheduler.shutdown()
+
+        # receivers created later in this process must not use the stopped scheduler and resolver
+        if BaseReceiver.scheduler is self.scheduler:
+            BaseReceiver.scheduler = None
+        if BaseReceiver.resolver is not None:
+            BaseReceiver.resolver.stop()
+            BaseReceiver.resolver = None
+        self.stop_recording()
+        if self.profiler is not None:
+            self.profiler.stop()
+
+    def start_recording(self, path: Path | str) -> None:
+        """record all datagrams received on the ui, data and settings port, see osc_kreuz.recorder
+
+        Args:
+            path (Path | str): path of the recording, an existing file is overwritten
+        """
+        self.stop_recording()
+        self.recorder = TrafficRecorder(path)
+        for server in (
+            self.osc_ui_server,
+            self.osc_data_server,
+            self.osc_setting_server,
+        ):
+            server.recorder = self.recorder
+
+    def start_profiling(self, duration: float = 10.0) -> None:
+        """sample the stacks of all threads for duration seconds and write them to the state directory,
+        see osc_kreuz.profiler. Does nothing if a profile is already being taken.
+
+        Args:
+            duration (float, optional): time in s. Defaults to 10.0.
+        """
+        if self.profiler is not None and self.profiler.running:
+            log.warning("profiling is already running")
+            return
+        self.profiler = SamplingProfiler(duration)
+        self.profiler.start()
+
+    def stop_recording(self) -> None:
+        if self.recorder is None:
+            return
+        for server in (
+            self.osc_ui_server,
+            self.osc_data_server,
+            self.osc_setting_server,
+        ):
+            server.recorder = None
+        self.recorder.close()
+        self.recorder = None
+
+    def request_reload(self) -> Thread:
+        """reload the config in the background. Reading the config and creating receivers can take a while,
+        so it runs on its own thread instead of blocking the settings port or delaying the scheduler
+
+        Returns:
+            Thread: the thread reloading the config
+        """
+        thread = Thread(target=self.reload_config, name="config reload", daemon=True)
+        thread.start()
+        return thread
+
+    def reload_config(self) -> None:
+        """read the config file again and apply the changed global options and receivers"""
+        with self.reload_lock:
+            log.info("reloading config")
+            try:
+                config = read_config(self.config_path)
+            except (ConfigError, OSError) as e:
+                log.error(f"reloading config failed, keeping the current config: {e}")
+                return
+            self.apply_config(config)
+
+    def apply_config(self, config: dict) -> None:
+        """apply a new config to the running osc-kreuz without losing the state of the sources.
+        Global options are updated in place, except for the ones that need a restart.
+        Receivers that didn't change are kept, receivers where only the hosts changed are updated,
+        all others are created or removed. New receivers get the complete state.
+
+        Args:
+            config (dict): the new config
+        """
+        self.update_global_config(
+            read_config_option(config, skc.globalconfig, dict, {})
+        )
+
+        receiver_configs = read_config_option(config, "receivers", None, [])
+        if not isinstance(receiver_configs, list):
+            log.warning("receivers in config is not a list, receivers are not changed")
+            return
+        self.reload_receivers(receiver_configs)
+
+    def update_global_config(self, new_globalconfig: dict) -> None:
+        """update the global config shared by all receivers and sound objects
+
+        Args:
+            new_globalconfig (dict): the global section of the new config
+        """
+        globalconfig = BaseReceiver.globalConfig
+        for option in restart_config_options:
+            if new_globalconfig.get(option) != globalconfig.get(option):
+                log.warning(f"changing {option} needs a restart, the change is ignored")
+
+        # the dict is shared, so it is changed in place
+        for option in list(globalconfig.keys()):
+            if option not in new_globalconfig and option not in restart_config_options:
+                globalconfig.pop(option, None)
+        globalconfig.update(
+            {
+                option: value
+                for option, value in new_globalconfig.items()
+                if option not in restart_config_options
+            }
+        )
+        # n_renderengines is not part of the config file
+        globalconfig["n_renderengines"] = self.n_renderengines
+
+        SoundObject.readGlobalConfig(globalconfig)
+        for receiver in self.receivers:
+            receiver.global_config_changed()
+
+    def reload_receivers(self, receiver_configs: list[dict]) -> None:
+        """change the running receivers to the receivers of a new config.
+        Receivers that are not part of the config, like view clients, are not touched.
+        Removed receivers are closed before new receivers are created, so a replacement can take over
+        resources like the shared memory of its predecessor. Receivers are created without holding the
+        connection_semaphore, so subscriptions are only blocked while the list of receivers is changed
+
+        Args:
+            receiver_configs (list[dict]): the receivers section of the new config
+        """
+        # configured receivers are only changed by reloads, which run one at a time
+        unmatched = [r for r in self.receivers if r.config is not None]
+        # receivers in the order of the config, the configs of receivers that have to be created are kept until then
+        configured_receivers: list[BaseReceiver | dict] = []
+
+        for receiver_config in receiver_configs:
+            if not isinstance(receiver_config, dict) or "type" not in receiver_config:
+                log.warning("receiver has no type specified, skipping")
+                continue
+
+            receiver = next((r for r in unmatched if r.config == receiver_config), None)
+            if receiver is None:
+                receiver = next(
+                    (
+                        r
+                        for r in unmatched
+                        if without_host_options(r.config)
+                        == without_host_options(receiver_config)
+                    ),
+                    None,
+                )
+                if receiver is not None:
+                    try:
+                        receiver.update_hosts(receiver_config)
+                    except ReceiverException as e:
+                        log.error(e)
+                        continue
+                    receiver.config = deepcopy(receiver_config)
+
+            if receiver is None:
+                configured_receivers.append(receiver_config)
+            else:
+                unmatched.remove(receiver)
+                configured_receivers.append(receiver)
+
+        if unmatched:
+            with self.connection_semaphore:
+                self.receivers = [r for r in self.receivers if r not in unmatched]
+            for receiver in unmatched:
+                log.info(f"removed receiver {receiver.my_type()}")
+                receiver.close()
+
+        new_receivers: list[BaseReceiver] = []
+        for i, receiver_config in enumerate(configured_receivers):
+            if not isinstance(receiver_config, dict):
+                continue
+            try:
+                receiver = createReceiverClient(deepcopy(receiver_config))
+            except ReceiverException as e:
+                log.error(e)
+                continue
+            log.info(f"added receiver {receiver.my_type()}")
+            configured_receivers[i] = receiver
+            new_receivers.append(receiver)
+
+        with self.connection_semaphore:
+            self.receivers = [r for r in self.receivers if r.config is None] + [
+                r for r in configured_receivers if isinstance(r, BaseReceiver)
+            ]
+
+        for receiver in new_receivers:
+            receiver.dump_state()
 
     def setVerbosity(self, v: int):
         self.verbosity = v
@@ -104,7 +441,15 @@ class OSCComCenter:
                 f"/{base_path}/debug/verbose", self.osc_handler_verbose
             )
             self.osc_setting_dispatcher.map(
-                f"/{base_path}/subscribe", self.osc_handler_subscribe
+                f"/{base_path}/debug/profile", self.osc_handler_profile
+            )
+            self.osc_setting_dispatcher.map(
+                f"/{base_path}/debug/latency", self.osc_handler_latency
+            )
+            self.osc_setting_dispatcher.map(
+                f"/{base_path}/subscribe",
+                self.osc_handler_subscribe,
+                needs_reply_address=True,
             )
             self.osc_setting_dispatcher.map(
                 f"/{base_path}/unsubscribe", self.osc_handler_unsubscribe
@@ -112,10 +457,15 @@ class OSCComCenter:
             self.osc_setting_dispatcher.map(f"/{base_path}/ping", self.osc_handler_ping)
             self.osc_setting_dispatcher.map(f"/{base_path}/pong", self.osc_handler_pong)
             self.osc_setting_dispatcher.map(f"/{base_path}/dump", self.osc_handler_dump)
+            self.osc_setting_dispatcher.map(
+                f"/{base_path}/reload", self.osc_handler_reload
+            )
 
         # handler for twonder connection
         self.osc_setting_dispatcher.map(
-            "/WONDER/stream/render/connect", self.osc_handler_twonder_connect
+            "/WONDER/stream/render/connect",
+            self.osc_handler_twonder_connect,
+            needs_reply_address=True,
         )
 
     def osc_handler_ping(self, address: str, *args):
@@ -138,69 +488,119 @@ class OSCComCenter:
                     _name = args[0]
                 log.info("no renderer for pong message {}".format(_name))
 
-    def osc_handler_subscribe(self, address: str, *args) -> None:
+    def osc_handler_subscribe(
+        self, client_address: tuple[str, int], address: str, *args
+    ) -> None:
         """OSC Callback for subscription Requests.
 
         These requests follow the format:
         /oscrouter/subscribe myname 31441 xyz 0 5
-        /oscrouter/subscribe [client_name] [client_port] [coordinate_format] [source index as value? (0 or 1)] [update rate]
+        /oscrouter/subscribe myname 31441 xyz 0 5 1-16 gain
+        /oscrouter/subscribe [client_name] [client_port] [coordinate_format] [source index as value? (0 or 1)] [update rate] [sources] [parameters]
         args[0] nameFor Client
         args[1] port client listens to
         args[2] format client expects
         args[3] send source index as value instead of inside the osc prefix
         args[4] source position update rate
+        args[5] sources the client is interested in, e.g. "1-16" or "1,3,5", "all" for all sources
+        args[6] parameter types the client is interested in, e.g. "gain" or "position,attribute", "all" for everything
         """
+        from osc_kreuz.receiver.viewclient import (
+            LivenessManager,
+            ViewClient,
+            view_client_group_key,
+        )
+
         client_init_dict: dict[str, Any] = {}
         client_name = args[0]
         if len(args) >= 2:
-            if self.checkPort(args[1]):
-                client_init_dict["port"] = int(args[1])
-                client_infos = self.osc_setting_server.get_request()[1]
-
-                client_init_dict["hostname"] = str(client_infos[0])
+            if not self.checkPort(args[1]):
+                return
 
+            port = int(args[1])
+            hostname = str(client_address[0])
+
+            for arg_index, key in enumerate(
+                [
+                    "dataformat",
+                    "indexAsValue",
+                    "updateintervall",
+                    "sources",
+                    "parameters",
+                ],
+                start=2,
+            ):
                 try:
-                    client_init_dict["dataformat"] = args[2]
-                except KeyError:
-                    pass
-                try:
-                    client_init_dict["indexAsValue"] = args[3]
-                except KeyError:
-                    pass
-                try:
-                    client_init_dict["updateintervall"] = args[4]
-                except KeyError:
+                    client_init_dict[key] = args[arg_index]
+                except IndexError:
                     pass
+
+            try:
+                view_client_group_key(**client_init_dict)
+            except ValueError as e:
+                log.warning(f"invalid subscription request by {client_name}: {e}")
+                return
+
             # make sure clients that try to connect rapidly don't accidentally overwrite themselves
             with self.connection_semaphore:
                 # check if this client is already connected
                 if client_name in self.subscribed_clients:
+                    existing_client = self.subscribed_clients[client_name]
                     if (
-                        self.subscribed_clients[client_name].receivers[0][0]
-                        == client_init_dict["hostname"]
-                        and self.subscribed_clients[client_name].receivers[0][1]._port
-                        == client_init_dict["port"]
+                        existing_client.hostname == hostname
+                        and existing_client.port == port
                     ):
                         log.info(f"client {client_name} tried to reconnect")
                         return
                     else:
                         log.warning(f"client {client_name} exists already")
                         return
-                newViewClient = ViewClient(client_name, **client_init_dict)
 
+                newViewClient = ViewClient(
+                    client_name, hostname, port, group_config=client_init_dict
+                )
                 self.subscribed_clients[client_name] = newViewClient
-                self.receivers.append(newViewClient)
 
                 # always send room polygon to view client after connecting
                 log.info("dumping room polygon")
+                self.get_view_client_group(**client_init_dict).add_member(newViewClient)
                 newViewClient.dump_room_polygon()
-                newViewClient.checkAlive(self.deleteClient)
+                if self.liveness is None:
+                    self.liveness = LivenessManager(
+                        self.scheduler,
+                        self.port_settings,
+                        self.deleteClient,
+                        self.moveClient,
+                    )
+                self.liveness.add_client(newViewClient)
 
         else:
             if self.verbosity > 0:
                 log.info("not enough arguments for view client")
 
-    def osc_handler_twonder_connect(self, address: str, *args) -> None:
+    def get_view_client_group(self, **group_config: Any) -> "ViewClientGroup":
+        """get the ViewClientGroup for the requested output format, create it if it does not exist yet.
+        The caller has to hold the connection_semaphore
+
+        Returns:
+            ViewClientGroup: group for the requested format
+        """
+        from osc_kreuz.receiver.viewclient import ViewClientGroup, view_client_group_key
+
+        key = view_client_group_key(**group_config)
+        try:
+            return self.view_client_groups[key]
+        except KeyError:
+            pass
+
+        group = ViewClientGroup(**group_config)
+        self.view_client_groups[key] = group
+        self.receivers.append(group)
+        return group
+
+    def osc_handler_twonder_connect(
+        self, client_address: tuple[str, int], address: str, *args
+    ) -> None:
 
         # get name of twonder (only sent to osc path with signature "s")
         # TODO do something useful with the name
@@ -213,17 +613,16 @@ class OSCComCenter:
             hostname = args[0]
             port = args[1]
         else:
-            # get hostname and port from the request information
-            client_infos = self.osc_setting_server.get_request()[1]
-
-            hostname = client_infos[0]
-            port = client_infos[1]
+            # get hostname and port from the address the request was sent from
+            hostname, port = client_address
 
         # check validity of hostname and port
         if not self.checkPort(port) or not isinstance(hostname, str):
             log.warning(f"Invalid twonder connection request by {name}")
             return
 
+        from osc_kreuz.receiver.wonder import TWonder
+
         # connect twonders using semaphore so receivers dict is only changed by one twonder at a time
         with self.connection_semaphore:
             # get twonder from receivers list if it already exists
@@ -273,8 +672,27 @@ class OSCComCenter:
             log.warning("not enough arguments für view client")
 
     def osc_handler_dump(self, address: str, *args):
-        pass
-        # TODO: dump all source data to renderer
+        """OSC Callback for dump requests, the complete source state is sent in the background.
+
+        These requests follow the format:
+        /osckreuz/dump [client_name]
+        without a client name the state is sent to all receivers,
+        otherwise only to the subscribed view client with this name
+        """
+        if len(args) >= 1:
+            client_name = args[0]
+            view_client = self.subscribed_clients.get(client_name)
+            if view_client is None or view_client.group is None:
+                log.warning(
+                    f"can't dump state to client {client_name}, it does not exist"
+                )
+                return
+            view_client.group.dump_to_member(view_client)
+            return
+
+        log.info("dumping state to all receivers")
+        for receiver in self.receivers:
+            receiver.dump_state()
 
     def osc_handler_room_polygon(
         self, address: str, client_name: str, osc_path="/room/polygon"
@@ -289,17 +707,54 @@ class OSCComCenter:
 
         view_client.dump_room_polygon(osc_path)
 
-    def deleteClient(self, viewC, alias):
-        # TODO check if this is threadsafe (it probably isn't)
+    def deleteClient(self, viewC: "ViewClient", alias: str):
         # TODO handle client with same name connection/reconnecting. maybe add ip as composite key?
         if self.verbosity > 0:
             log.info(f"deleting client {viewC}, {alias}")
-        try:
-            self.receivers.remove(viewC)
+
+        # called from the settings thread and the scheduler, so receivers are only changed by one of them at a time
+        with self.connection_semaphore:
+            if self.subscribed_clients.get(alias) is not viewC:
+                log.warning(f"tried to delete receiver {alias}, but it does not exist")
+                return
             del self.subscribed_clients[alias]
-            log.info(f"removed client {alias}")
-        except (ValueError, KeyError):
-            log.warning(f"tried to delete receiver {alias}, but it does not exist")
+
+            if self.liveness is not None:
+                self.liveness.remove_client(viewC)
+            self.leave_view_client_group(viewC)
+        log.info(f"removed client {alias}")
+
+    def moveClient(self, viewC: "ViewClient"):
+        """move a view client to the group matching its current update interval
+
+        Args:
+            viewC (ViewClient): client whose update interval changed
+        """
+        with self.connection_semaphore:
+            if self.subscribed_clients.get(viewC.alias) is not viewC:
+                return
+            self.leave_view_client_group(viewC)
+
+            # the client already has the state, so it is only moved to the receivers of the new group.
+            # a full dump on every interval change would flood the link that is struggling
+            self.get_view_client_group(**viewC.get_group_config()).add_member(
+                viewC, dump=False
+            )
+
+    def leave_view_client_group(self, viewC: "ViewClient"):
+        group = viewC.group
+        if group is None:
+            return
+
+        group.remove_member(viewC)
+
+        # groups without members are no longer needed
+        if group.is_empty():
+            self.view_client_groups.pop(group.key, None)
+            try:
+                self.receivers.remove(group)
+            except ValueError:
+                pass
 
     def checkPort(self, port) -> bool:
         """returns true when the port is of type int and in the valid range
@@ -318,35 +773,81 @@ class OSCComCenter:
             return False
 
     def osc_handler_osccopy(self, address: str, *args):
+        """OSC Callback for starting or stopping the debug copy.
+
+        These requests follow the format:
+        /osckreuz/debug/osccopy ip:port [sample_every] [filter] [wrap_in_bundles]
+        /osckreuz/debug/osccopy ip port [sample_every] [filter] [wrap_in_bundles]
+        without arguments the debug copy is stopped.
+        sample_every only mirrors every n-th packet, filter only mirrors packets of this receiver type,
+        or messages starting with filter if it starts with "/".
+        """
         ip = ""
         port = 0
-        if len(args) == 2:
-            ip = args[0]
-            port = args[1]
-        elif len(args) == 1:
+        options: tuple = ()
+        if len(args) >= 1 and isinstance(args[0], str) and ":" in args[0]:
             ipport = args[0].split(":")
             if len(ipport) == 2:
                 ip = ipport[0]
                 port = ipport[1]
+            options = args[1:]
+        elif len(args) >= 2:
+            ip = args[0]
+            port = args[1]
+            options = args[2:]
         else:
-            BaseReceiver.debugCopy = False
+            BaseReceiver.stopDebugClient()
             log.info("debug client: invalid message format")
             return
         try:
             ip = "127.0.0.1" if ip == "localhost" else ip
             osccopy_ip = ipaddress.ip_address(ip)
             osccopy_port = int(port)
+            tap_options = dict(
+                zip(("sample_every", "filter", "wrap_in_bundles"), options)
+            )
+            if "sample_every" in tap_options:
+                tap_options["sample_every"] = int(tap_options["sample_every"])
+            if "filter" in tap_options:
+                tap_options["filter"] = str(tap_options["filter"])
+            if "wrap_in_bundles" in tap_options:
+                tap_options["wrap_in_bundles"] = bool(tap_options["wrap_in_bundles"])
         except Exception:
-            log.info("debug client: invalid ip or port")
+            log.info("debug client: invalid ip, port or options")
             return
         log.info(f"debug client connected: {ip}:{port}")
 
         if 1023 < osccopy_port < 65535:
-            BaseReceiver.createDebugClient(str(osccopy_ip), osccopy_port)
-            BaseReceiver.debugCopy = True
+            BaseReceiver.createDebugClient(str(osccopy_ip), osccopy_port, **tap_options)
+            return
+
+        BaseReceiver.stopDebugClient()
+
+    def osc_handler_profile(self, address: str, *args):
+        """OSC Callback for profiling all threads, the request follows the format
+        /osckreuz/debug/profile [duration in s]
+        """
+        try:
+            duration = float(args[0]) if args else 10.0
+        except ValueError:
+            log.info("profile: invalid duration")
             return
+        self.start_profiling(duration)
 
-        BaseReceiver.debugCopy = False
+    def osc_handler_latency(self, address: str, *args):
+        """OSC Callback for logging the latency histograms of all receivers, the request follows the format
+        /osckreuz/debug/latency [reset]
+        """
+        for receiver in self.receivers:
+            log.info(f"latency of {receiver.my_type()}: {receiver.latency.summary()}")
+            if args and args[0] == "reset":
+                receiver.latency.reset()
+
+    def osc_handler_reload(self, address: str, *args):
+        """OSC Callback for reloading the config file, the request follows the format
+        /osckreuz/reload
+        """
+        self.request_reload()
 
     def osc_handler_verbose(self, address: str, *args):
         vvvv = -1
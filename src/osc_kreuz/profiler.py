@@ -0,0 +1,104 @@
+from collections import Counter
+from datetime import datetime
+import logging
+from pathlib import Path
+import sys
+from threading import Event, Thread, current_thread
+from threading import enumerate as enumerate_threads
+from time import monotonic
+from types import FrameType
+
+from osc_kreuz.config import state_directory
+
+log = logging.getLogger("profiler")
+
+
+def frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples the stacks of all threads in a background thread for a fixed time, so it can be started
+    in a running osc-kreuz without slowing it down noticeably.
+
+    The result is written in the folded stack format (one line per stack with the number of samples,
+    the root is the name of the thread), which can be turned into a flamegraph
+    by flamegraph.pl or opened directly in speedscope.
+    """
+
+    def __init__(
+        self,
+        duration: float = 10.0,
+        interval: float = 0.005,
+        directory: Path = state_directory,
+    ) -> None:
+        """
+        Args:
+            duration (float, optional): time in s stacks are sampled. Defaults to 10.0.
+            interval (float, optional): time in s between samples. Defaults to 0.005.
+            directory (Path, optional): directory the profile is written to. Defaults to the state directory.
+        """
+        self.duration = duration
+        self.interval = interval
+        self.directory = directory
+        self.stacks: Counter[str] = Counter()
+        self.n_samples = 0
+        self.path: Path | None = None
+
+        self.stopped = Event()
+        self.finished = Event()
+        self.thread = Thread(target=self.run, name="profiler", daemon=True)
+
+    @property
+    def running(self) -> bool:
+        return self.thread.is_alive()
+
+    def start(self) -> None:
+        log.info(f"profiling all threads for {self.duration}s")
+        self.thread.start()
+
+    def stop(self) -> None:
+        """stop sampling early, the profile is written anyway"""
+        self.stopped.set()
+
+    def sample(self) -> None:
+        own_id = current_thread().ident
+        thread_names = {thread.ident: thread.name for thread in enumerate_threads()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            labels = []
+            f: FrameType | None = frame
+            while f is not None:
+                labels.append(frame_label(f))
+                f = f.f_back
+            labels.append(thread_names.get(thread_id, str(thread_id)))
+            # folded stacks start at the root and are separated by semicolons
+            self.stacks[";".join(reversed(labels))] += 1
+        self.n_samples += 1
+
+    def run(self) -> None:
+        time_end = monotonic() + self.duration
+        while monotonic() < time_end and not self.stopped.is_set():
+            self.sample()
+            self.stopped.wait(self.interval)
+
+        try:
+            self.path = self.write()
+            log.info(f"wrote profile with {self.n_samples} samples to {self.path}")
+        except OSError as e:
+            log.error(f"writing profile failed: {e}")
+        self.finished.set()
+
+    def write(self) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = (
+            self.directory
+            / f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.folded"
+        )
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
@@ -1,28 +1,89 @@
-from . import (
-    wonder,
-    viewclient,
-    supercolliderengine,
-    audiomatrix,
-    audiorouter,
-    spatial_receiver,
-    base_receiver,
-    seamlessplugin,
-)
+from copy import deepcopy
+from importlib import import_module
+from importlib.metadata import entry_points
+import logging
 
+from . import base_receiver
+
+log = logging.getLogger("receiver")
+
+# third party receivers register themselves in this entry point group, e.g. in their pyproject.toml:
+# [project.entry-points."osc_kreuz.receivers"]
+# myreceiver = "my_package.my_module:MyReceiver"
+receiver_entry_point_group = "osc_kreuz.receivers"
+
+# receivers are given as "module:class", modules are only imported when a receiver of this type is created
 receiver_name_dict = {
-    "wonder": wonder.Wonder,
-    "twonder": wonder.TWonder,
+    "wonder": "osc_kreuz.receiver.wonder:Wonder",
+    "twonder": "osc_kreuz.receiver.wonder:TWonder",
     # "panoramix": Panoramix,
-    "viewclient": viewclient.ViewClient,
+    "viewclient": "osc_kreuz.receiver.viewclient:ViewClientGroup",
     # "oscar": Oscar,
-    "scengine": supercolliderengine.SuperColliderEngine,
-    "audiorouter": audiorouter.Audiorouter,
-    "seamlessplugin": seamlessplugin.SeamlessPlugin,
-    "audiorouterwfs": audiorouter.AudiorouterWFS,
-    "audiomatrix": audiomatrix.AudioMatrix,
-    "spatial": spatial_receiver.SpatialReceiver,
+    "scengine": "osc_kreuz.receiver.supercolliderengine:SuperColliderEngine",
+    "audiorouter": "osc_kreuz.receiver.audiorouter:Audiorouter",
+    "seamlessplugin": "osc_kreuz.receiver.seamlessplugin:SeamlessPlugin",
+    "audiorouterwfs": "osc_kreuz.receiver.audiorouter:AudiorouterWFS",
+    "audiomatrix": "osc_kreuz.receiver.audiomatrix:AudioMatrix",
+    "spatial": "osc_kreuz.receiver.spatial_receiver:SpatialReceiver",
+    "sharedmemory": "osc_kreuz.receiver.shared_memory:SharedMemoryState",
 }
 
+# receiver classes that were already loaded
+receiver_classes: dict[str, type[base_receiver.BaseReceiver]] = {}
+
+
+def get_receiver_class(receiver_type: str) -> type[base_receiver.BaseReceiver]:
+    """get the class of a receiver type, importing its module if necessary.
+    Built in receivers are looked up first, then the receivers installed as plugins in the osc_kreuz.receivers entry point group
+
+    Args:
+        receiver_type (str): name of the receiver type, case insensitive
+
+    Raises:
+        base_receiver.ReceiverException: the receiver type does not exist or can't be loaded
+
+    Returns:
+        type[base_receiver.BaseReceiver]: class of the receiver
+    """
+    receiver_type = receiver_type.lower()
+    if receiver_type in receiver_classes:
+        return receiver_classes[receiver_type]
+
+    try:
+        if receiver_type in receiver_name_dict:
+            module_name, class_name = receiver_name_dict[receiver_type].split(":")
+            receiver_class = getattr(import_module(module_name), class_name)
+        else:
+            entry_point = next(
+                (
+                    ep
+                    for ep in entry_points(group=receiver_entry_point_group)
+                    if ep.name.lower() == receiver_type
+                ),
+                None,
+            )
+            if entry_point is None:
+                raise base_receiver.ReceiverException(
+                    f"Invalid receiver type: {receiver_type}"
+                )
+            receiver_class = entry_point.load()
+            log.info(f"loaded receiver plugin {receiver_type} from {entry_point.value}")
+    except (ImportError, AttributeError) as e:
+        raise base_receiver.ReceiverException(
+            f"Can't load receiver type {receiver_type}: {e}"
+        )
+
+    if not (
+        isinstance(receiver_class, type)
+        and issubclass(receiver_class, base_receiver.BaseReceiver)
+    ):
+        raise base_receiver.ReceiverException(
+            f"Receiver type {receiver_type} is not a subclass of BaseReceiver"
+        )
+
+    receiver_classes[receiver_type] = receiver_class
+    return receiver_class
+
 
 def createReceiverClient(config: dict) -> base_receiver.BaseReceiver:
 
@@ -44,10 +105,11 @@ def createReceiverClient(config: dict) -> base_receiver.BaseReceiver:
     if "type" not in config:
         raise base_receiver.ReceiverException("Type of receiver unspecified")
 
+    # the config is kept, so it can be compared to the config after a reload
+    receiver_config = deepcopy(config)
     receiver_type = config["type"].lower()
     del config["type"]
 
-    if receiver_type not in receiver_name_dict:
-        raise base_receiver.ReceiverException(f"Invalid receiver type: {receiver_type}")
-
-    return receiver_name_dict[receiver_type](**config)
+    receiver = get_receiver_class(receiver_type)(**config)
+    receiver.config = receiver_config
+    return receiver
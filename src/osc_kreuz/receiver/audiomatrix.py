@@ -1,9 +1,13 @@
 from collections.abc import Iterable
 import logging
+from threading import Lock, Semaphore, Timer
+from time import time
 
 from typing import Any
 
-from .updates import GainUpdate, PositionUpdate
+import numpy as np
+
+from .updates import GainUpdate, PositionUpdate, Update
 
 from .base_receiver import BaseReceiver
 from ..config import read_config_option
@@ -12,12 +16,63 @@ log = logging.getLogger("receiver")
 verbosity = 0
 
 
+class GainRowUpdate(Update):
+    """Gains of a single source for all render units, taken from a row of the gain matrix"""
+
+    def __init__(self, path: str, gain_matrix: np.ndarray, source_index: int):
+        super().__init__(path, soundobject=None, source_index=source_index)  # type: ignore
+        self.gain_matrix = gain_matrix
+
+    def get_value(self):
+        return self.gain_matrix[self.source_index].tolist()
+
+    def __hash__(self):
+        # the gain matrix itself is not hashable
+        return hash((self.__class__, self.path, self.source_index))
+
+
+class GainColumnUpdate(Update):
+    """Gains of all sources for a single render unit, taken from a column of the gain matrix"""
+
+    def __init__(
+        self,
+        path: str,
+        gain_matrix: np.ndarray,
+        render_idx: int,
+        include_render_idx=False,
+    ):
+        super().__init__(
+            path,
+            soundobject=None,  # type: ignore
+            pre_arg=render_idx if include_render_idx else None,
+        )
+        self.gain_matrix = gain_matrix
+        self.render_idx = render_idx
+
+    def get_value(self):
+        return self.gain_matrix[:, self.render_idx].tolist()
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, self.__class__)
+            and self.path == other.path
+            and self.render_idx == other.render_idx
+        )
+
+    def __hash__(self):
+        return hash((self.__class__, self.path, self.render_idx))
+
+
 class AudioMatrix(BaseReceiver):
     def __init__(self, paths: Iterable[dict[str, Any]], **kwargs):
         super().__init__(**kwargs)
         self.gain_paths: dict[int, list[str]] = {}
         self.pos_paths: list[tuple[str, str]] = []
 
+        # paths receiving whole rows (all render units of a source) or columns (all sources of a render unit) of the gain matrix
+        self.gain_row_paths: list[str] = []
+        self.gain_column_paths: list[tuple[str, int | None]] = []
+
         # this dict is used to translate between render unit index and render unit name
         self.render_unit_indices = {}
 
@@ -41,30 +96,128 @@ class AudioMatrix(BaseReceiver):
                 coord_fmt = read_config_option(path, "dataformat", str, "xyz")
 
                 self.pos_paths.append((osc_path, coord_fmt))
+            elif path_type == "gain_row":
+                self.gain_row_paths.append(osc_path)
+            elif path_type == "gain_column":
+                # without a renderer the columns of all render units are sent to this path
+                renderer = path.get("renderer")
+                self.gain_column_paths.append(
+                    (
+                        osc_path,
+                        (
+                            self.render_unit_indices[renderer]
+                            if renderer is not None
+                            else None
+                        ),
+                    )
+                )
+
+        # gains of all sources (rows) for all render units (columns)
+        n_render_units = len(self.globalConfig["render_units"])
+        self.gain_matrix = np.zeros((self.n_sources, n_render_units))
+        for source_idx, source in enumerate(self.sources[: self.n_sources]):
+            for render_idx in range(n_render_units):
+                self.gain_matrix[source_idx, render_idx] = source.getRenderGain(
+                    render_idx
+                )
+
+        # columns don't belong to a single source, so they have their own update queue
+        self.column_queue: set[GainColumnUpdate] = set()
+        self.column_queue_lock = Lock()
+        self.column_semaphore = Semaphore()
 
         log.debug("Audio Matrix initialized")
 
+    def add_update(self, source_idx: int, update: Update) -> None:
+        if isinstance(update, GainColumnUpdate):
+            with self.column_queue_lock:
+                self.column_queue.add(update)
+            if self.frameclock:
+                self.start_frame_clock()
+            else:
+                self.update_columns()
+        else:
+            super().add_update(source_idx, update)
+
+    def frame_updates(self) -> list[Update]:
+        with self.column_queue_lock:
+            updates, self.column_queue = self.column_queue, set()
+        return list(updates)
+
+    def update_columns(self) -> None:
+        """Sends all queued column updates, at most one per column and update interval.
+        Works like update_source, but for the column queue
+        """
+        if not self.column_semaphore.acquire(blocking=False):
+            return
+
+        with self.column_queue_lock:
+            updates, self.column_queue = self.column_queue, set()
+
+        if len(updates) == 0:
+            self.column_semaphore.release()
+            return
+
+        time_start = time()
+        self.send_updates([update.to_message() for update in updates])
+
+        # schedule releasing of update lock
+        delay = self.update_interval - (time() - time_start)
+        if self.scheduler is not None:
+            self.scheduler.call_later(delay, self.release_column_lock)
+        else:
+            t = Timer(delay, self.release_column_lock)
+            t.name = f"rel_columns_{self.my_type()}"
+            t.start()
+
+    def release_column_lock(self) -> None:
+        self.column_semaphore.release()
+        if len(self.column_queue) > 0:
+            self.update_columns()
+
     def sourceRenderGainChanged(self, source_idx, render_idx):
-        if render_idx in self.gain_paths:
-            for path in self.gain_paths[render_idx]:
-                self.add_update(
-                    source_idx,
-                    GainUpdate(
-                        path=path,
-                        soundobject=self.sources[source_idx],
-                        render_idx=render_idx,
-                        source_index=source_idx,
-                    ),
+        self.gain_matrix[source_idx, render_idx] = self.sources[
+            source_idx
+        ].getRenderGain(render_idx)
+        super().sourceRenderGainChanged(source_idx, render_idx)
+
+    def render_gain_updates(self, source_idx: int, render_idx: int) -> list[Update]:
+        if render_idx not in self.gain_paths:
+            return []
+
+        updates: list[Update] = [
+            GainUpdate(
+                path=path,
+                soundobject=self.sources[source_idx],
+                render_idx=render_idx,
+                source_index=source_idx,
+            )
+            for path in self.gain_paths[render_idx]
+        ]
+
+        # vectors are queued like single gains, so at most one vector per row or column is sent per update interval
+        for path in self.gain_row_paths:
+            updates.append(GainRowUpdate(path, self.gain_matrix, source_idx))
+
+        for path, column_render_idx in self.gain_column_paths:
+            if column_render_idx is None or column_render_idx == render_idx:
+                updates.append(
+                    GainColumnUpdate(
+                        path,
+                        self.gain_matrix,
+                        render_idx,
+                        include_render_idx=column_render_idx is None,
+                    )
                 )
+        return updates
 
-    def sourcePositionChanged(self, source_idx):
-        for path, coord_fmt in self.pos_paths:
-            self.add_update(
-                source_idx,
-                PositionUpdate(
-                    path=path,
-                    soundobject=self.sources[source_idx],
-                    coord_fmt=coord_fmt,
-                    source_index=source_idx,
-                ),
+    def position_updates(self, source_idx: int) -> list[Update]:
+        return [
+            PositionUpdate(
+                path=path,
+                soundobject=self.sources[source_idx],
+                coord_fmt=coord_fmt,
+                source_index=source_idx,
             )
+            for path, coord_fmt in self.pos_paths
+        ]
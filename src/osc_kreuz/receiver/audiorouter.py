@@ -1,67 +1,126 @@
+from collections.abc import Iterable
 import logging
+from typing import Any
 
-from .base_receiver import BaseReceiver
-from .updates import DirectSendUpdate, GainUpdate
+from .base_receiver import BaseReceiver, ReceiverException
+from .updates import DirectSendUpdate, GainUpdate, Update
 
 log = logging.getLogger("receiver")
 verbosity = 0
 
 
+# osc path and whether the render index is included in the message, for a single render unit
+GainRoute = tuple[str, bool]
+
+
 class Audiorouter(BaseReceiver):
+    """Receiver for the audiorouter, sends renderer gains and direct sends.
+
+    Which renderer gain is sent to which osc path is configured with the routing option,
+    a list of rules containing the renderer (name or index), the osc path and include_index.
+    Without routing, all renderers except the second one are sent to /source/send/spatial,
+    the third one is sent to /source/reverb/gain without the render index.
+    """
+
     oscpath_gain_renderer = "/source/send/spatial"
     oscpath_gain_reverb = "/source/reverb/gain"
     oscpath_gain_direct = "/source/send/direct"
 
+    def __init__(self, routing: Iterable[dict[str, Any]] | None = None, **kwargs):
+        super().__init__(**kwargs)
+
+        # the routing rules are compiled into a list indexed by render index, None means the gain is not sent
+        n_render_units = self.globalConfig.get(
+            "n_renderengines", len(self.globalConfig.get("render_units", []))
+        )
+        self.gain_routes: list[GainRoute | None] = [None] * n_render_units
+        rules = routing if routing is not None else self.default_routing()
+        for rule in rules:
+            try:
+                render_idx = self.get_render_index(rule["renderer"])
+                self.gain_routes[render_idx] = (
+                    str(rule["path"]),
+                    bool(rule.get("include_index", True)),
+                )
+            except (KeyError, IndexError) as e:
+                raise ReceiverException(f"Invalid routing rule {rule}: {e}")
+
+    def default_routing(self) -> list[dict[str, Any]]:
+        """routing used when no routing is configured"""
+        rules = []
+        for render_idx in range(len(self.gain_routes)):
+            if render_idx == 1:
+                continue
+            elif render_idx == 2:
+                rules.append(
+                    {
+                        "renderer": render_idx,
+                        "path": self.oscpath_gain_reverb,
+                        "include_index": False,
+                    }
+                )
+            else:
+                rules.append(
+                    {"renderer": render_idx, "path": self.oscpath_gain_renderer}
+                )
+        return rules
+
+    def get_render_index(self, renderer: str | int) -> int:
+        """get the index of a render unit
+
+        Args:
+            renderer (str | int): name or index of the render unit
+
+        Raises:
+            KeyError: the render unit does not exist
+
+        Returns:
+            int: index of the render unit
+        """
+        if isinstance(renderer, int):
+            if not 0 <= renderer < len(self.gain_routes):
+                raise KeyError(renderer)
+            return renderer
+
+        render_units = self.globalConfig.get("render_units", [])
+        if renderer not in render_units:
+            raise KeyError(renderer)
+        return render_units.index(renderer)
+
     def print_self_information(self, print_pos_format=False):
         super().print_self_information(print_pos_format=print_pos_format)
 
-    def sourceDirectSendChanged(self, source_idx, send_idx):
-        self.add_update(
-            source_idx,
+    def direct_send_updates(self, source_idx: int, send_idx: int) -> list[Update]:
+        return [
             DirectSendUpdate(
                 self.oscpath_gain_direct,
                 soundobject=self.sources[source_idx],
                 send_index=send_idx,
                 source_index=source_idx,
                 include_send_idx=True,
-            ),
-        )
+            )
+        ]
 
-    def sourceRenderGainChanged(self, source_idx, render_idx):
-        if render_idx == 1:
-            return
+    def render_gain_updates(self, source_idx: int, render_idx: int) -> list[Update]:
+        route = self.gain_routes[render_idx]
+        if route is None:
+            return []
 
-        if render_idx == 2:
-            path = self.oscpath_gain_reverb
-            include_render_idx = False
-        else:
-            path = self.oscpath_gain_renderer
-            include_render_idx = True
-
-        self.add_update(
-            source_idx,
+        path, include_render_idx = route
+        return [
             GainUpdate(
                 path=path,
                 soundobject=self.sources[source_idx],
                 render_idx=render_idx,
                 source_index=source_idx,
                 include_render_idx=include_render_idx,
-            ),
-        )
+            )
+        ]
 
 
 class AudiorouterWFS(Audiorouter):
-    def sourceRenderGainChanged(self, source_idx, render_idx):
-        if render_idx != 1:
-            return
-
-        self.add_update(
-            source_idx,
-            GainUpdate(
-                path=self.oscpath_gain_renderer,
-                soundobject=self.sources[source_idx],
-                render_idx=render_idx,
-                source_index=source_idx,
-                include_render_idx=True,
-            ),
-        )
+    def default_routing(self) -> list[dict[str, Any]]:
+        # only the gain of the second render unit is sent
+        if len(self.gain_routes) < 2:
+            return []
+        return [{"renderer": 1, "path": self.oscpath_gain_renderer}]
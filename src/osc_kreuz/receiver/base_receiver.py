@@ -1,14 +1,26 @@
 import logging
-import socket
-from threading import Semaphore, Timer
-from time import sleep, thread_time, time
+from threading import Lock, Semaphore, Timer
+from time import monotonic, thread_time, time
+from typing import TYPE_CHECKING, Callable, Generic, TypeVar
 
-from pythonosc.udp_client import SimpleUDPClient
+from pythonosc.osc_message import OscMessage
+from pythonosc.parsing import osc_types
 
 from osc_kreuz.config import read_config_option
+from osc_kreuz.latency import ReceiverLatency, get_receive_time
+from osc_kreuz.scheduler import FrameClock, Scheduler
 from osc_kreuz.soundobject import SoundObject
+import osc_kreuz.str_keys_conventions as skc
 
-from .updates import Update, OSCMessage
+from .state_dump import PacedSender
+from .updates import OSCPacket, Update, OSCMessage, iter_bundles
+
+# the transports, the resolver and the debug tap are only imported when they are first used
+if TYPE_CHECKING:
+    from osc_kreuz.resolver import Resolver
+
+    from .debug_tap import DebugTap
+    from .transport import OSCClient
 
 log = logging.getLogger("receiver")
 verbosity = 0
@@ -18,17 +30,97 @@ class ReceiverException(Exception):
     pass
 
 
+T = TypeVar("T")
+
+
+class LazySourceDict(dict[int, T], Generic[T]):
+    """dict from source index to a value that is only created when the source is first accessed,
+    so bookkeeping for sources that never change doesn't take up memory"""
+
+    def __init__(self, factory: Callable[[], T]) -> None:
+        super().__init__()
+        self.factory = factory
+        self.lock = Lock()
+
+    def __missing__(self, source_idx: int) -> T:
+        # the lock makes sure all threads get the same value, e.g. the same semaphore
+        with self.lock:
+            return self.setdefault(source_idx, self.factory())
+
+
+def parse_hosts(
+    hostname: str | None = None,
+    hosts: list[dict] | None = None,
+    port: int | None = None,
+    transport: str = "udp",
+) -> list[tuple[str, int, str]]:
+    """get the hosts of a receiver from the host options of its config
+
+    Args:
+        hostname (str | None, optional): hostname of a single host. Defaults to None.
+        hosts (list[dict] | None, optional): list of hosts with hostname, port and optionally transport. Defaults to None.
+        port (int | None, optional): port of the single host. Defaults to None.
+        transport (str, optional): transport used by hosts that don't specify one. Defaults to "udp".
+
+    Raises:
+        ReceiverException: raised for hosts without hostname or port
+
+    Returns:
+        list[tuple[str, int, str]]: hostname, port and transport of every host
+    """
+    host_list: list[tuple[str, int, str]] = []
+    # check if hosts are defined as an array
+    # unix sockets are only identified by their path, which is given as hostname
+    if hostname is not None and (port is not None or transport == "unix"):
+        host_list.append((hostname, int(port or 0), transport))
+    if hosts is not None:
+        for host in hosts:
+            try:
+                host_transport = host.get("transport", transport)
+                host_port = (
+                    host.get("port", 0) if host_transport == "unix" else host["port"]
+                )
+                host_list.append((host["hostname"], host_port, host_transport))
+            except KeyError:
+                raise ReceiverException("Invalid Host")
+    return host_list
+
+
+def client_transport(client: "OSCClient") -> str:
+    from .transport import TCPClient, UnixDatagramClient
+
+    if isinstance(client, TCPClient):
+        return "tcp"
+    elif isinstance(client, UnixDatagramClient):
+        return "unix"
+    return "udp"
+
+
+def close_client(client: "OSCClient") -> None:
+    """stop the background thread or connection of a client, if it has one"""
+    from .transport import ResolvingUDPClient, TCPClient
+
+    if isinstance(client, (TCPClient, ResolvingUDPClient)):
+        client.close()
+
+
 class BaseReceiver(object):
-    """The BaseReceiver from which all Receivers should inherit. The methods for all types of information the receiver needs should be overwritten (
-    sourceAttributeChanged, sourceRenderGainChanged, sourceDirectSendChanged, sourcePositionChanged)
+    """The BaseReceiver from which all Receivers should inherit. The methods building the updates for all types of information
+    the receiver needs should be overwritten (position_updates, render_gain_updates, direct_send_updates, attribute_updates).
+    They are used both for single changes and for state dumps, so they must not change any state.
+    Receivers that don't send updates can overwrite the source*Changed methods instead
 
     Attributes:
         n_sources (int): the number of sources, set as a class variable
         sources (list[SoundObject]): list of SoundObject, should be changed as a class variable, so all Receivers access the same SoundObjects
         globalConfig (dict): the global section of the config, set as a class variable
-        debugCopy (bool): if true, all sent OSC messages are also sent to the oscDebugClient, defaults to false
-        oscDebugClient (SimpleUDPClient): OSC receiver for debug messages
+        debugCopy (bool): if true, all sent OSC packets are also mirrored by the debugTap, defaults to false
+        debugTap (DebugTap | None): mirrors sent packets to a debug client in the background
         oscpath_position (str): the OSC path a spatial receiver sends its position to, defaults to /source/{posFormat} if not explicitely set
+        scheduler (Scheduler | None): scheduler used for background tasks like paced state dumps, set as a class variable
+        resolver (Resolver | None): resolves the hostnames of udp hosts in the background, created when the first udp host is added
+        latency (ReceiverLatency): histograms of the time between receiving a change and sending its update
+        config (dict | None): the config the receiver was created from, None for receivers that are not part of the config file
 
     """
 
@@ -36,14 +128,35 @@ class BaseReceiver(object):
     sources: list[SoundObject] = []
     globalConfig: dict = {}
     debugCopy: bool = False
-    oscDebugClient: SimpleUDPClient
+    debugTap: "DebugTap | None" = None
+    scheduler: Scheduler | None = None
+    resolver: "Resolver | None" = None
 
     printOutput = verbosity >= 1
     oscpath_position = ""
+    config: dict | None = None
 
     @classmethod
-    def createDebugClient(cls, ip: str, port: int) -> None:
-        cls.oscDebugClient = SimpleUDPClient(ip, port)
+    def createDebugClient(cls, ip: str, port: int, **tap_options) -> None:
+        """start mirroring all sent packets to a debug client, replaces the previous debug client
+
+        Args:
+            ip (str): ip of the debug client
+            port (int): port of the debug client
+            **tap_options: options of the DebugTap (sample_every, filter, wrap_in_bundles)
+        """
+        from .debug_tap import DebugTap
+
+        cls.stopDebugClient()
+        cls.debugTap = DebugTap(ip, port, **tap_options)
+        cls.debugCopy = True
+
+    @classmethod
+    def stopDebugClient(cls) -> None:
+        cls.debugCopy = False
+        if cls.debugTap is not None:
+            cls.debugTap.close()
+            cls.debugTap = None
 
     @classmethod
     def setVerbosity(cls, v: int):
@@ -60,6 +173,9 @@ class BaseReceiver(object):
         port: int | None = None,
         sourceattributes=(),
         indexAsValue=0,  # XXX unused
+        transport: str = "udp",
+        frameclock: bool = False,
+        timetag: float = 0,
     ):
         self.setVerbosity(verbosity)
 
@@ -69,32 +185,40 @@ class BaseReceiver(object):
         # convert update interval from ms to s
         self.update_interval = int(updateintervall) / 1000
 
-        # sets are used in update stack, so each source is updated only once during the update process
-        self.update_queue: list[set[Update]] = [set() for _ in range(self.n_sources)]
+        # sets are used in update stack, so each source is updated only once during the update process.
+        # the queues and semaphores of a source are created when it is first updated
+        self.update_queue: LazySourceDict[set[Update]] = LazySourceDict(set)
         # second update Stack that is swapped in during updates
-        self.update_queue_swap: list[set[Update]] = [
-            set() for _ in range(self.n_sources)
-        ]
+        self.update_queue_swap: LazySourceDict[set[Update]] = LazySourceDict(set)
 
-        self.update_semaphore: list[Semaphore] = [
-            Semaphore() for _ in range(self.n_sources)
-        ]
+        self.update_semaphore: LazySourceDict[Semaphore] = LazySourceDict(Semaphore)
+
+        # (time received, time queued) of the oldest pending update of each source
+        self.pending_times: dict[int, tuple[float, float]] = {}
+        self.latency = ReceiverLatency()
+
+        # in frame clock mode the updates of all changed sources are sent together on a fixed tick,
+        # instead of rate limiting every source on its own
+        self.frameclock = bool(frameclock)
+        self.frame_clock: FrameClock | None = None
+        self.dirty_sources: set[int] = set()
+        self.dirty_lock = Lock()
+
+        # if set, updates are sent as bundles with a timetag this many s in the future,
+        # so renderers can apply them at a fixed time instead of when they arrive
+        self.timetag = float(timetag) / 1000
 
         if self.oscpath_position == "":
             self.oscpath_position = "/source/" + self.posFormat
 
+        # room polygon messages by osc path, built on first use
+        self.room_polygon_messages: dict[str, OSCMessage | None] = {}
+
         self.hosts: list[tuple[str, int]] = []
-        self.receivers: list[tuple[str, SimpleUDPClient]] = []
-
-        # check if hosts are defined as an array
-        if hostname is not None and port is not None:
-            self.add_receiver(hostname, int(port))
-        if hosts is not None:
-            for host in hosts:
-                try:
-                    self.add_receiver(host["hostname"], host["port"])
-                except KeyError:
-                    raise ReceiverException("Invalid Host")
+        self.receivers: list[tuple[str, "OSCClient"]] = []
+
+        for host in parse_hosts(hostname, hosts, port, transport):
+            self.add_receiver(*host)
 
         if len(self.receivers) == 0:
             log.warning(f"Receiver of type {self.my_type()} has no receivers")
@@ -113,39 +237,189 @@ class BaseReceiver(object):
     def my_type(self) -> str:
         return self.__class__.__name__
 
-    def add_receiver(self, hostname: str, port: int):
+    def add_receiver(self, hostname: str, port: int, transport: str = "udp"):
+        """add a host to this receiver
 
-        # get ip from hostname to prevent repeated dns lookups
-        ip = None
-        n_retries = 120
-        while ip is None:
-            try:
-                ip = socket.gethostbyname(hostname)
-            except socket.gaierror as e:
-                if n_retries <= 0:
-                    log.warning(
-                        f"failed to add receiver {hostname}:{port}, using hostname instead"
-                    )
-                    ip = hostname
-
-                else:
-                    log.warning(
-                        f"getting ip for receiver {hostname}:{port} failed: {e}, retrying..."
-                    )
-                    n_retries -= 1
-                    sleep(1)
-
-        # TODO implement retrying here
+        Args:
+            hostname (str): hostname or ip of the host
+            port (int): port of the host
+            transport (str, optional): "udp", "tcp" for SLIP framed OSC over a persistent tcp connection,
+                or "unix" for a unix datagram socket with the hostname as path. Defaults to "udp".
+
+        Raises:
+            ReceiverException: raised for unknown transports
+        """
+        from .transport import ResolvingUDPClient, TCPClient, UnixDatagramClient
+
+        # clients are started after they were added, so the state dump after connecting finds them
+        if transport == "tcp":
+            # the tcp client resolves the hostname itself when connecting,
+            # the complete state is resent after every (re)connect
+            client = TCPClient(
+                hostname,
+                port,
+                on_connect=lambda: self.dump_state(hostname, port),
+            )
+            self.receivers.append((hostname, client))
+            client.start()
+            return
+        elif transport == "unix":
+            self.receivers.append((hostname, UnixDatagramClient(hostname)))
+            return
+        elif transport != "udp":
+            raise ReceiverException(f"Invalid transport {transport} for {hostname}")
+
+        # the hostname is resolved in the background, so an unresolvable host doesn't block startup.
+        # updates are dropped until the address is known, then the complete state is sent
+        client = ResolvingUDPClient(
+            hostname,
+            port,
+            self.get_resolver(),
+            on_resolve=lambda: self.dump_state(hostname, port),
+        )
+        self.receivers.append((hostname, client))
         try:
-            self.receivers.append((hostname, SimpleUDPClient(ip, port)))
-        except socket.gaierror as e:
+            client.start()
+        except OSError as e:
             log.error(
                 f"failed to connect to receiver {hostname}:{port} for renderer {self.my_type()}: {e}"
             )
+            client.close()
+            self.receivers.remove((hostname, client))
+
+    def get_resolver(self) -> "Resolver":
+        """get the resolver shared by all receivers, it is created when it is first needed"""
+        from osc_kreuz.resolver import Resolver
+
+        if BaseReceiver.resolver is None:
+            BaseReceiver.resolver = Resolver(
+                ttl=read_config_option(self.globalConfig, "dns_ttl", float, 300.0)
+            )
+        return BaseReceiver.resolver
+
+    def update_hosts(self, config: dict) -> None:
+        """change the hosts of this receiver to the hosts of a new config, clients of hosts that didn't change are kept.
+        The complete state is sent to the new hosts
+
+        Args:
+            config (dict): the new config of this receiver
+
+        Raises:
+            ReceiverException: raised for invalid hosts
+        """
+        new_hosts = parse_hosts(
+            config.get("hostname"),
+            config.get("hosts"),
+            config.get("port"),
+            config.get("transport", "udp"),
+        )
+        current_hosts = {
+            (hostname, client._port, client_transport(client)): (hostname, client)
+            for hostname, client in self.receivers
+        }
+
+        removed = [
+            client
+            for host, (_, client) in current_hosts.items()
+            if host not in new_hosts
+        ]
+        added = [host for host in new_hosts if host not in current_hosts]
+
+        self.receivers = [
+            current_hosts[host] for host in new_hosts if host in current_hosts
+        ]
+        for host in added:
+            log.info(f"adding host {host[0]}:{host[1]} to receiver {self.my_type()}")
+            self.add_receiver(*host)
+        for client in removed:
+            log.info(
+                f"removing host {client._address}:{client._port} from receiver {self.my_type()}"
+            )
+            close_client(client)
+
+        for hostname, port, _ in added:
+            self.dump_state(hostname, port)
+
+    def global_config_changed(self) -> None:
+        """called after the global config was reloaded, drops everything that was built from it"""
+        self.room_polygon_messages.clear()
+
+    def close(self) -> None:
+        """stop sending to all hosts, called when the receiver was removed from the config"""
+        if self.frame_clock is not None:
+            self.frame_clock.remove(self.send_frame)
+        clients, self.receivers = self.receivers, []
+        for _, client in clients:
+            close_client(client)
 
     def add_update(self, source_idx: int, update: Update) -> None:
+        if self.frameclock:
+            # the queue is read by send_frame on the clock thread, so it is only touched under the lock
+            with self.dirty_lock:
+                self.queue_update(source_idx, update)
+                self.dirty_sources.add(source_idx)
+            self.start_frame_clock()
+        else:
+            self.queue_update(source_idx, update)
+            self.update_source(source_idx)
+
+    def queue_update(self, source_idx: int, update: Update) -> None:
+        # only updates caused by a received message are traced
+        receive_time = get_receive_time()
+        if receive_time is not None and source_idx not in self.pending_times:
+            self.pending_times[source_idx] = (receive_time, monotonic())
         self.update_queue[source_idx].add(update)
-        self.update_source(source_idx)
+
+    def start_frame_clock(self) -> None:
+        """make sure the next frame is sent, the frame clock is started with the first change"""
+        with self.dirty_lock:
+            if self.frame_clock is None and self.scheduler is not None:
+                self.frame_clock = self.scheduler.frame_clock(self.update_interval)
+                self.frame_clock.add(self.send_frame)
+
+        # without a scheduler there is no clock, so the frame is sent right away
+        if self.scheduler is None:
+            self.send_frame()
+
+    def frame_updates(self) -> list[Update]:
+        """updates that don't belong to a single source and are sent with the next frame
+
+        Returns:
+            list[Update]: updates, removed from their queue
+        """
+        return []
+
+    def send_frame(self) -> None:
+        """Sends the queued updates of all changed sources, packed into as few bundles as possible.
+        Called on every tick of the frame clock
+        """
+        time_flushed = monotonic()
+        updates: list[Update] = []
+        pending_times: list[tuple[float, float]] = []
+        with self.dirty_lock:
+            dirty_sources, self.dirty_sources = self.dirty_sources, set()
+            for source_idx in sorted(dirty_sources):
+                updates.extend(self.update_queue.pop(source_idx, ()))
+                source_pending_times = self.pending_times.pop(source_idx, None)
+                if source_pending_times is not None:
+                    pending_times.append(source_pending_times)
+        updates.extend(self.frame_updates())
+        if not updates:
+            return
+
+        msgs = [update.to_message() for update in updates]
+        for packet in iter_bundles(
+            (msg.build() for msg in msgs), timestamp=self.bundle_timestamp()
+        ):
+            for _, receiver in self.receivers:
+                self.send_packet(packet, receiver, "frame")
+        if self.printOutput:
+            for msg in msgs:
+                self.printOscOutput(msg.path, msg.values)
+
+        time_sent = monotonic()
+        for source_pending_times in pending_times:
+            self.latency.record(*source_pending_times, time_flushed, time_sent)
 
     def update_source(self, source_idx) -> None:
         """Builds and sends source update messages
@@ -163,12 +437,14 @@ class BaseReceiver(object):
             return
 
         time_start = time()
+        time_flushed = monotonic()
 
         # swap stacks so the stack we are working on isn't written to
         self.update_queue[source_idx], self.update_queue_swap[source_idx] = (
             self.update_queue_swap[source_idx],
             self.update_queue[source_idx],
         )
+        pending_times = self.pending_times.pop(source_idx, None)
 
         # get messages from updates
         msgs = []
@@ -178,15 +454,19 @@ class BaseReceiver(object):
             msgs.append(msg)
 
         self.send_updates(msgs)
+        if pending_times is not None:
+            self.latency.record(*pending_times, time_flushed, monotonic())
 
         # schedule releasing of update lock
-        t = Timer(
-            self.update_interval - (time() - time_start),
-            self.release_source_update_lock,
-            args=(source_idx,),
-        )
-        t.name = f"rel_{source_idx:02}_{self.my_type()}"
-        t.start()
+        delay = self.update_interval - (time() - time_start)
+        if self.scheduler is not None:
+            self.scheduler.call_later(
+                delay, self.release_source_update_lock, source_idx
+            )
+        else:
+            t = Timer(delay, self.release_source_update_lock, args=(source_idx,))
+            t.name = f"rel_{source_idx:02}_{self.my_type()}"
+            t.start()
 
     def send_updates(
         self,
@@ -194,68 +474,218 @@ class BaseReceiver(object):
         hostname: str | None = None,
         port: int | None = None,
     ):
-        """This function sends all messages to the osc clients
+        """This function sends all messages to the osc clients.
+        Every message is encoded only once, no matter how many hosts it is sent to
 
         Args:
             msgs (list[OSCMessage]): list of messages
+            hostname (str | None, optional): only send to this host. Defaults to None.
+            port (int | None, optional): only send to this port, used together with hostname. Defaults to None.
         """
         # if explicit hostname and port are specified,
-        # create a list with just one udp client for the specified host
+        # only use the udp client for the specified host
         receivers_to_update = (
-            [(hostname, SimpleUDPClient(hostname, port))]
+            self.get_receivers_for_host(hostname, port)
             if hostname is not None and port is not None
             else self.receivers
         )
+        if self.timetag > 0:
+            # the bundles are encoded once and sent to every host
+            for packet in iter_bundles(
+                (msg.build() for msg in msgs), timestamp=self.bundle_timestamp()
+            ):
+                for _, receiver in receivers_to_update:
+                    self.send_packet(packet, receiver, "timetagged bundle")
+            if self.printOutput:
+                for msg in msgs:
+                    self.printOscOutput(msg.path, msg.values)
+            return
+
         for msg in msgs:
+            osc_msg = msg.build()
             for r_hostname, receiver in receivers_to_update:
-
-                try:
-                    # time sending performance
-                    t1_thread = thread_time()
-                    t1 = time()
-
-                    # actually send
-                    receiver.send_message(msg.path, msg.values)
-
-                    t2_thread = thread_time()
-                    t2 = time()
-                    send_time = (t2 - t1) * 1000
-                    if send_time > 10:
-                        log.warning(
-                            f"sending osc update {msg.path} to {receiver._address} took way too long: {round(send_time,2)}ms, (thread time: {round((t2_thread - t1_thread)*1000, 2)})"
-                        )
-                except Exception as e:
-                    log.error(
-                        f"Exception while sending to {receiver._address}:{receiver._port}: {e}",
-                    )
-
-                if self.debugCopy:
-                    debugOsc = f"/d{self.my_type()}/{receiver._address}:{receiver._port}{msg.path}"
-                    try:
-                        self.oscDebugClient.send_message(debugOsc, msg.values)
-                    except Exception:
-                        pass
+                self.send_packet(osc_msg, receiver, msg.path)
 
             if self.printOutput:
                 self.printOscOutput(msg.path, msg.values)
 
+    def bundle_timestamp(self) -> float:
+        """timetag for the bundles sent now, the configured latency from now or immediately if none is configured
+
+        Returns:
+            float: system time in s, or IMMEDIATELY
+        """
+        if self.timetag > 0:
+            return time() + self.timetag
+        return osc_types.IMMEDIATELY
+
+    def send_packet(
+        self,
+        packet: OscMessage | OSCPacket,
+        receiver: "OSCClient",
+        description: str = "",
+    ) -> None:
+        """send an encoded packet to a single host, errors are logged and not raised
+
+        Args:
+            packet (OscMessage | OSCPacket): encoded message or bundle
+            receiver (OSCClient): client of the host
+            description (str, optional): description of the packet for log messages. Defaults to "".
+        """
+        try:
+            # time sending performance
+            t1_thread = thread_time()
+            t1 = time()
+
+            # actually send
+            receiver.send(packet)
+
+            t2_thread = thread_time()
+            t2 = time()
+            send_time = (t2 - t1) * 1000
+            if send_time > 10:
+                log.warning(
+                    f"sending osc update {description} to {receiver._address} took way too long: {round(send_time,2)}ms, (thread time: {round((t2_thread - t1_thread)*1000, 2)})"
+                )
+        except Exception as e:
+            log.error(
+                f"Exception while sending to {receiver._address}:{receiver._port}: {e}",
+            )
+
+        if self.debugCopy and self.debugTap is not None:
+            self.debugTap.mirror(self.my_type(), receiver, packet, description)
+
+    def get_receivers_for_host(
+        self, hostname: str, port: int
+    ) -> list[tuple[str, "OSCClient"]]:
+        """get the udp client for a single host. If the host is not one of the receivers a new client is created,
+        its hostname is resolved in the background like for all other hosts. Packets sent before it is resolved are dropped
+
+        Args:
+            hostname (str): hostname or ip of the host
+            port (int): port of the host
+
+        Returns:
+            list[tuple[str, OSCClient]]: list containing only the client for this host
+        """
+        for r_hostname, receiver in self.receivers:
+            if receiver._port == port and hostname in (r_hostname, receiver._address):
+                return [(r_hostname, receiver)]
+        from .transport import ResolvingUDPClient
+
+        client = ResolvingUDPClient(hostname, port, self.get_resolver(), one_shot=True)
+        client.start()
+        return [(hostname, client)]
+
     def release_source_update_lock(self, source_idx):
         self.update_semaphore[source_idx].release()
         if len(self.update_queue[source_idx]) > 0:
             self.update_source(source_idx)
 
-    # implement these functions in subclasses for registering for specific updates
-    def sourceAttributeChanged(self, source_idx, attribute):
-        pass
+    # implement these functions in subclasses to build the updates for specific changes
+    def position_updates(self, source_idx: int) -> list[Update]:
+        return []
+
+    def render_gain_updates(self, source_idx: int, render_idx: int) -> list[Update]:
+        return []
+
+    def direct_send_updates(self, source_idx: int, send_idx: int) -> list[Update]:
+        return []
+
+    def attribute_updates(
+        self, source_idx: int, attribute: skc.SourceAttributes
+    ) -> list[Update]:
+        return []
+
+    def queue_updates(self, source_idx: int, updates: list[Update]) -> None:
+        for update in updates:
+            self.add_update(source_idx, update)
+
+    def sourcePositionChanged(self, source_idx):
+        self.queue_updates(source_idx, self.position_updates(source_idx))
 
     def sourceRenderGainChanged(self, source_idx, render_idx):
-        pass
+        self.queue_updates(source_idx, self.render_gain_updates(source_idx, render_idx))
 
     def sourceDirectSendChanged(self, source_idx, send_idx):
-        pass
+        self.queue_updates(source_idx, self.direct_send_updates(source_idx, send_idx))
 
-    def sourcePositionChanged(self, source_idx):
-        pass
+    def sourceAttributeChanged(self, source_idx, attribute):
+        self.queue_updates(source_idx, self.attribute_updates(source_idx, attribute))
+
+    def collect_updates(self, source_idx: int) -> list[Update]:
+        """Get the updates this receiver would send for every parameter of a source, nothing is queued or changed
+
+        Args:
+            source_idx (int): index of the source
+
+        Returns:
+            list[Update]: updates for the complete state of the source
+        """
+        n_renderengines = read_config_option(
+            self.globalConfig, "n_renderengines", int, 3
+        )
+        n_direct_sends = read_config_option(
+            self.globalConfig, "number_direct_sends", int, 32
+        )
+        updates = list(self.position_updates(source_idx))
+        for render_idx in range(n_renderengines):
+            updates += self.render_gain_updates(source_idx, render_idx)
+        for send_idx in range(n_direct_sends):
+            updates += self.direct_send_updates(source_idx, send_idx)
+        for attribute in skc.SourceAttributes:
+            updates += self.attribute_updates(source_idx, attribute)
+        return updates
+
+    def get_state_updates(self) -> list[Update]:
+        """Get the updates this receiver would send for every parameter of every source,
+        the update queues of the receiver are not touched.
+
+        Returns:
+            list[Update]: updates for the complete state, without duplicates
+        """
+        updates: dict[Update, None] = {}
+        for source_idx in range(min(self.n_sources, len(self.sources))):
+            for update in self.collect_updates(source_idx):
+                updates.setdefault(update)
+        return list(updates)
+
+    def dump_state(self, hostname: str | None = None, port: int | None = None) -> None:
+        """Send the complete state of all sources packed into OSC bundles.
+        Which updates are sent is decided right away, sending happens in the background on the scheduler,
+        paced to the rate set by the global config option dump_rate (bytes/s).
+
+        Args:
+            hostname (str | None, optional): only send to this host. Defaults to None.
+            port (int | None, optional): only send to this port, used together with hostname. Defaults to None.
+        """
+        receivers_to_update = (
+            self.get_receivers_for_host(hostname, port)
+            if hostname is not None and port is not None
+            else self.receivers
+        )
+        if len(receivers_to_update) == 0:
+            return
+
+        updates = self.get_state_updates()
+
+        # messages are encoded right before they are sent, so a dump that is still in progress
+        # never overwrites newer values sent by regular updates with older ones
+        osc_msgs = (update.to_message().build() for update in updates)
+        bundle_size = read_config_option(
+            self.globalConfig, "dump_bundle_size", int, 1400
+        )
+        packets = iter_bundles(osc_msgs, bundle_size) if bundle_size > 0 else osc_msgs
+        bytes_per_second = read_config_option(
+            self.globalConfig, "dump_rate", float, 2000000
+        )
+
+        def send_to_all(packet: OscMessage | OSCPacket) -> None:
+            for _, receiver in receivers_to_update:
+                self.send_packet(packet, receiver, "state dump")
+
+        PacedSender(packets, send_to_all, bytes_per_second, self.scheduler).start()
+        log.debug(f"{self.my_type()} dumping {len(updates)} updates")
 
     def dump_source_positions(self):
         # TODO make receiver specifyable by hostname/port so it doesn't have to get sent out for all receivers multi-receiver renderers like twonder
@@ -274,12 +704,19 @@ class BaseReceiver(object):
             ):
                 self.sourceRenderGainChanged(i, j)
 
-    def dump_room_polygon(
-        self,
-        oscpath: str = "/room/polygon",
-        hostname: str | None = None,
-        port: int | None = None,
-    ):
+    def room_polygon_message(self, oscpath: str = "/room/polygon") -> OSCMessage | None:
+        """get the message describing the room polygon from the config.
+        The message is only built once per osc path and then reused, this way it is also only encoded once.
+
+        Args:
+            oscpath (str, optional): osc path of the message. Defaults to "/room/polygon".
+
+        Returns:
+            OSCMessage | None: the message, None if the polygon has no points
+        """
+        if oscpath in self.room_polygon_messages:
+            return self.room_polygon_messages[oscpath]
+
         # send information about room
         room_name = read_config_option(
             self.globalConfig, "room_name", str, "default_room"
@@ -303,11 +740,24 @@ class BaseReceiver(object):
             except ValueError:
                 log.error(f"Invalid type for point {point}")
 
+        msg = None
         if len(args) == 2:
             log.warning("Room Polygon has no points")
-            return
+        else:
+            msg = OSCMessage(oscpath, args)
+
+        self.room_polygon_messages[oscpath] = msg
+        return msg
 
-        self.send_updates([OSCMessage(oscpath, args)], hostname, port)
+    def dump_room_polygon(
+        self,
+        oscpath: str = "/room/polygon",
+        hostname: str | None = None,
+        port: int | None = None,
+    ):
+        msg = self.room_polygon_message(oscpath)
+        if msg is not None:
+            self.send_updates([msg], hostname, port)
 
     def printOscOutput(self, oscpath: str, data: list):
         log.debug("OSC to %s %s with values %s", self.__class__.__name__, oscpath, data)
@@ -0,0 +1,154 @@
+from collections import deque
+import logging
+from threading import Condition, Thread
+from typing import Any
+
+from pythonosc.osc_bundle import OscBundle
+from pythonosc.osc_bundle_builder import IMMEDIATELY, OscBundleBuilder
+from pythonosc.osc_message import OscMessage
+from pythonosc.osc_message_builder import OscMessageBuilder
+from pythonosc.parsing import osc_types
+from pythonosc.udp_client import SimpleUDPClient
+
+from .updates import OSCPacket
+
+log = logging.getLogger("receiver")
+
+
+class DebugTap:
+    """Mirrors the packets sent by receivers to a debug client.
+
+    Receivers only put the already encoded packets into a bounded queue, everything else happens in a background thread,
+    so debugging doesn't slow down sending. When the queue is full, the oldest packets are dropped.
+
+    By default the path of every mirrored message is prefixed with /d{receiver type}/{address}:{port}.
+    With wrap_in_bundles the packets are sent unchanged in a bundle, preceded by the message
+    /debug/target s s i (receiver type, address, port).
+    """
+
+    def __init__(
+        self,
+        ip: str,
+        port: int,
+        sample_every: int = 1,
+        filter: str = "",
+        wrap_in_bundles: bool = False,
+        max_queue_length: int = 1000,
+    ) -> None:
+        """
+        Args:
+            ip (str): ip of the debug client
+            port (int): port of the debug client
+            sample_every (int, optional): only mirror every n-th packet. Defaults to 1.
+            filter (str, optional): only mirror packets of receivers of this type (case insensitive),
+                or messages whose path starts with this if it starts with "/". Defaults to "", which mirrors everything.
+            wrap_in_bundles (bool, optional): send packets unchanged, wrapped in bundles. Defaults to False.
+            max_queue_length (int, optional): number of packets waiting to be mirrored. Defaults to 1000.
+        """
+        self.client = SimpleUDPClient(ip, port)
+        self.sample_every = max(1, int(sample_every))
+        self.receiver_filter = ""
+        self.path_filter = ""
+        if filter.startswith("/"):
+            self.path_filter = filter
+        else:
+            self.receiver_filter = filter.lower()
+        self.wrap_in_bundles = wrap_in_bundles
+
+        self.queue: deque[tuple[str, str, int, bytes]] = deque(maxlen=max_queue_length)
+        self.counter = 0
+        self.condition = Condition()
+        self.running = True
+        self.thread = Thread(target=self.run, name="debug tap", daemon=True)
+        self.thread.start()
+
+    def mirror(
+        self, receiver_type: str, host: Any, packet: Any, path: str = ""
+    ) -> None:
+        """Queue a packet for mirroring, called by receivers for every sent packet.
+
+        Args:
+            receiver_type (str): type of the sending receiver
+            host (Any): client the packet was sent to
+            packet (Any): the encoded packet
+            path (str, optional): osc path of the packet if it is a message, bundles are filtered in the background. Defaults to "".
+        """
+        if self.receiver_filter and receiver_type.lower() != self.receiver_filter:
+            return
+        if (
+            self.path_filter
+            and path.startswith("/")
+            and not path.startswith(self.path_filter)
+        ):
+            return
+
+        self.counter += 1
+        if self.counter % self.sample_every != 0:
+            return
+
+        self.queue.append((receiver_type, host._address, host._port, packet.dgram))
+        with self.condition:
+            self.condition.notify()
+
+    def close(self) -> None:
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+
+    def run(self) -> None:
+        while True:
+            with self.condition:
+                while self.running and not self.queue:
+                    self.condition.wait()
+                if not self.running:
+                    return
+
+            while self.queue:
+                receiver_type, address, port, dgram = self.queue.popleft()
+                try:
+                    self.send(receiver_type, address, port, dgram)
+                except OSError as e:
+                    log.debug(f"debug tap failed to mirror packet: {e}")
+
+    def get_messages(self, dgram: bytes) -> list[OscMessage]:
+        if OscBundle.dgram_is_bundle(dgram):
+            messages = []
+            for content in OscBundle(dgram):
+                if isinstance(content, OscBundle):
+                    messages.extend(self.get_messages(content.dgram))
+                else:
+                    messages.append(content)
+            return messages
+        return [OscMessage(dgram)]
+
+    def send(self, receiver_type: str, address: str, port: int, dgram: bytes) -> None:
+        messages = self.get_messages(dgram)
+        if self.path_filter:
+            messages = [
+                msg for msg in messages if msg.address.startswith(self.path_filter)
+            ]
+            if not messages:
+                return
+
+        if self.wrap_in_bundles:
+            bundle = OscBundleBuilder(IMMEDIATELY)
+            target = OscMessageBuilder(address="/debug/target")
+            target.add_arg(receiver_type)
+            target.add_arg(address)
+            target.add_arg(port)
+            bundle.add_content(target.build())  # type: ignore
+            for msg in messages:
+                bundle.add_content(msg)  # type: ignore
+            self.client.send(bundle.build())
+            return
+
+        prefix = f"/d{receiver_type}/{address}:{port}"
+        for msg in messages:
+            # replace the address of the encoded message, the arguments stay as they are
+            address_size = len(osc_types.write_string(msg.address))
+            self.client.send(
+                OSCPacket(
+                    osc_types.write_string(prefix + msg.address)
+                    + msg.dgram[address_size:]
+                )
+            )
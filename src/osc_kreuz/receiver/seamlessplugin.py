@@ -2,7 +2,7 @@ from collections.abc import Iterable
 import logging
 
 from .spatial_receiver import SpatialReceiver
-from .updates import GainUpdate, PositionUpdate
+from .updates import GainUpdate, PositionUpdate, Update
 import osc_kreuz.str_keys_conventions as skc
 
 log = logging.getLogger("receiver")
@@ -128,28 +128,23 @@ class SeamlessPlugin(SpatialReceiver):
         else:
             return [(osc_pre, [sIdx + 1, values])]
 
-    def sourceAttributeChanged(self, source_idx, attribute):
-        pass
-
-    def sourceRenderGainChanged(self, source_idx, render_idx):
-        self.add_update(
-            source_idx,
+    def render_gain_updates(self, source_idx: int, render_idx: int) -> list[Update]:
+        return [
             GainUpdate(
                 self.oscAddrs["renderGain"],
                 soundobject=self.sources[source_idx],
                 render_idx=render_idx,
                 source_index=source_idx + 1,
                 include_render_idx=True,
-            ),
-        )
+            )
+        ]
 
-    def sourcePositionChanged(self, source_idx):
-        self.add_update(
-            source_idx,
+    def position_updates(self, source_idx: int) -> list[Update]:
+        return [
             PositionUpdate(
                 path=self.oscAddrs[self.posFormat],
                 soundobject=self.sources[source_idx],
                 coord_fmt=self.posFormat,
                 source_index=source_idx + 1,
-            ),
-        )
+            )
+        ]
@@ -0,0 +1,310 @@
+from contextlib import contextmanager
+import logging
+import os
+from multiprocessing import shared_memory
+from threading import Lock
+from time import sleep
+
+import numpy as np
+
+import osc_kreuz.str_keys_conventions as skc
+
+from .base_receiver import BaseReceiver, ReceiverException
+
+log = logging.getLogger("receiver")
+
+STATE_TABLE_MAGIC = b"OKST"
+STATE_TABLE_VERSION = 2
+
+header_dtype = np.dtype(
+    [
+        ("magic", "S4"),
+        ("version", "<u4"),
+        ("n_sources", "<u4"),
+        ("n_coordinates", "<u4"),
+        ("n_gains", "<u4"),
+        ("n_direct_sends", "<u4"),
+        ("n_attributes", "<u4"),
+        ("record_size", "<u4"),
+        ("dataformat", "S16"),
+        # incremented after every change of any source
+        ("sequence", "<u8"),
+        # process id of the osc-kreuz writing the table
+        ("owner_pid", "<u4"),
+    ]
+)
+
+# attributes are stored in this order
+state_table_attributes = list(skc.SourceAttributes)
+
+
+def record_dtype(n_coordinates: int, n_gains: int, n_direct_sends: int) -> np.dtype:
+    """dtype of the record of a single source in the state table"""
+    return np.dtype(
+        [
+            # odd while the record is being written
+            ("sequence", "<u4"),
+            ("position", "<f4", (n_coordinates,)),
+            ("gains", "<f4", (n_gains,)),
+            ("direct_sends", "<f4", (n_direct_sends,)),
+            ("attributes", "<f4", (len(state_table_attributes),)),
+        ],
+        align=True,
+    )
+
+
+def is_stale_state_table(name: str) -> bool:
+    """check if shared memory contains a state table whose owner is not running anymore.
+    Memory that doesn't contain a state table of this version is never considered stale
+
+    Args:
+        name (str): name of the shared memory
+
+    Returns:
+        bool: True if the memory can safely be replaced
+    """
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except OSError:
+        return False
+    try:
+        if shm.size < header_dtype.itemsize:
+            return False
+        header = np.frombuffer(bytes(shm.buf[: header_dtype.itemsize]), header_dtype)[0]
+    finally:
+        shm.close()
+    if header["magic"] != STATE_TABLE_MAGIC or header["version"] != STATE_TABLE_VERSION:
+        return False
+
+    owner_pid = int(header["owner_pid"])
+    if owner_pid == os.getpid():
+        return False
+    try:
+        os.kill(owner_pid, 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        # the process exists, but belongs to another user
+        pass
+    return False
+
+
+class SharedMemoryState(BaseReceiver):
+    """Receiver that writes the state of all sources into a table in shared memory,
+    renderers running on the same machine can poll this table instead of receiving OSC messages.
+
+    The table starts with a header (see header_dtype), followed by one record per source (see record_dtype).
+    Every record is protected by a seqlock: its sequence number is odd while the record is written,
+    so readers have to read the sequence number before and after reading the record, and retry
+    if it was odd or changed in the meantime. The sequence number in the header is incremented
+    after every change, so readers can cheaply check if anything changed.
+    """
+
+    def __init__(self, name: str = "osc_kreuz_state", **kwargs):
+        super().__init__(**kwargs)
+        n_gains = self.globalConfig.get(
+            "n_renderengines", len(self.globalConfig.get("render_units", []))
+        )
+        n_direct_sends = self.globalConfig.get("number_direct_sends", 32)
+        n_coordinates = (
+            len(self.sources[0].getPosition(self.posFormat)) if self.sources else 3
+        )
+
+        self.record_dtype = record_dtype(n_coordinates, n_gains, n_direct_sends)
+        size = header_dtype.itemsize + self.record_dtype.itemsize * self.n_sources
+        buffer = self.open_buffer(name, size)
+
+        self.header = np.ndarray((), dtype=header_dtype, buffer=buffer)
+        self.records = np.ndarray(
+            (self.n_sources,),
+            dtype=self.record_dtype,
+            buffer=buffer,
+            offset=header_dtype.itemsize,
+        )
+        self.header["magic"] = STATE_TABLE_MAGIC
+        self.header["version"] = STATE_TABLE_VERSION
+        self.header["n_sources"] = self.n_sources
+        self.header["n_coordinates"] = n_coordinates
+        self.header["n_gains"] = n_gains
+        self.header["n_direct_sends"] = n_direct_sends
+        self.header["n_attributes"] = len(state_table_attributes)
+        self.header["record_size"] = self.record_dtype.itemsize
+        self.header["dataformat"] = self.posFormat.encode()
+        self.header["owner_pid"] = os.getpid()
+
+        # views of the single fields of all records
+        self.sequences = self.records["sequence"]
+        self.positions = self.records["position"]
+        self.gains = self.records["gains"]
+        self.direct_sends = self.records["direct_sends"]
+        self.attributes = self.records["attributes"]
+
+        # the seqlock only allows a single writer
+        self.write_lock = Lock()
+        # set when the buffer was released, updates that still arrive afterwards are ignored
+        self.closed = False
+
+        for source_idx in range(min(self.n_sources, len(self.sources))):
+            self.write_source(source_idx)
+
+    def print_self_information(self, print_pos_format=True):
+        log.info(f"Initialized receiver {self.my_type()}")
+
+    def open_buffer(self, name: str, size: int):
+        """create the memory the table is written to
+
+        Args:
+            name (str): name of the shared memory
+            size (int): size of the table in bytes
+
+        Raises:
+            ReceiverException: raised if the memory can't be created or is used by a running osc-kreuz
+
+        Returns:
+            the buffer of the table
+        """
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            if not is_stale_state_table(name):
+                raise ReceiverException(
+                    f"shared memory {name} is used by a running osc-kreuz or another program, "
+                    f"choose another name or remove /dev/shm/{name}"
+                )
+            # left over from a previous run that wasn't shut down cleanly
+            log.warning(
+                f"shared memory {name} was left over by a previous run, replacing it"
+            )
+            old_shm = shared_memory.SharedMemory(name=name)
+            old_shm.close()
+            old_shm.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except OSError as e:
+            raise ReceiverException(f"can't create shared memory {name}: {e}")
+        return self.shm.buf
+
+    def close_buffer(self) -> None:
+        self.shm.close()
+        self.shm.unlink()
+
+    def close(self) -> None:
+        # other threads may still be changing sources with this receiver,
+        # so the buffer is only released while nothing is written
+        with self.write_lock:
+            if self.closed:
+                return
+            self.closed = True
+            # the views into the buffer have to be released before closing it
+            del self.header, self.records
+            del self.sequences, self.positions, self.gains, self.direct_sends
+            del self.attributes
+            self.close_buffer()
+
+    @contextmanager
+    def write_record(self, source_idx: int):
+        """context for changing the record of a source, takes care of the seqlock.
+        Yields False if the receiver was closed, the record must not be written then"""
+        with self.write_lock:
+            if self.closed:
+                yield False
+                return
+            self.sequences[source_idx] += 1
+            yield True
+            self.sequences[source_idx] += 1
+            self.header["sequence"] += 1
+
+    def write_source(self, source_idx: int) -> None:
+        """write the complete state of a source into the table"""
+        source = self.sources[source_idx]
+        with self.write_record(source_idx) as writable:
+            if not writable:
+                return
+            self.positions[source_idx] = source.getPosition(self.posFormat)
+            self.gains[source_idx] = source.getAllRendererGains()
+            self.direct_sends[source_idx] = source.getAllDirectSends()
+            self.attributes[source_idx] = [
+                float(source.getAttribute(attribute))
+                for attribute in state_table_attributes
+            ]
+
+    def sourcePositionChanged(self, source_idx):
+        position = self.sources[source_idx].getPosition(self.posFormat)
+        with self.write_record(source_idx) as writable:
+            if writable:
+                self.positions[source_idx] = position
+
+    def sourceRenderGainChanged(self, source_idx, render_idx):
+        gain = self.sources[source_idx].getRenderGain(render_idx)
+        with self.write_record(source_idx) as writable:
+            if writable:
+                self.gains[source_idx, render_idx] = gain
+
+    def sourceDirectSendChanged(self, source_idx, send_idx):
+        gain = self.sources[source_idx].getDirectSend(send_idx)
+        with self.write_record(source_idx) as writable:
+            if writable:
+                self.direct_sends[source_idx, send_idx] = gain
+
+    def sourceAttributeChanged(self, source_idx, attribute):
+        value = float(self.sources[source_idx].getAttribute(attribute))
+        with self.write_record(source_idx) as writable:
+            if writable:
+                self.attributes[source_idx, state_table_attributes.index(attribute)] = (
+                    value
+                )
+
+
+class SharedMemoryStateReader:
+    """Reads the state table written by SharedMemoryState, e.g. from a renderer written in python"""
+
+    def __init__(self, name: str = "osc_kreuz_state") -> None:
+        self.shm = shared_memory.SharedMemory(name=name)
+        self.header = np.ndarray((), dtype=header_dtype, buffer=self.shm.buf)
+        if (
+            self.header["magic"] != STATE_TABLE_MAGIC
+            or self.header["version"] != STATE_TABLE_VERSION
+        ):
+            raise ValueError(f"shared memory {name} does not contain a state table")
+
+        self.record_dtype = record_dtype(
+            int(self.header["n_coordinates"]),
+            int(self.header["n_gains"]),
+            int(self.header["n_direct_sends"]),
+        )
+        self.records = np.ndarray(
+            (int(self.header["n_sources"]),),
+            dtype=self.record_dtype,
+            buffer=self.shm.buf,
+            offset=header_dtype.itemsize,
+        )
+
+    @property
+    def sequence(self) -> int:
+        return int(self.header["sequence"])
+
+    def read_source(self, source_idx: int, max_attempts: int = 1000) -> np.void | None:
+        """get a consistent copy of the record of a source. If the record is being written the read is retried,
+        yielding the rest of the time slice to the writer
+
+        Args:
+            source_idx (int): index of the source
+            max_attempts (int, optional): number of reads before giving up, e.g. because the writer died
+                while writing the record. Defaults to 1000.
+
+        Returns:
+            np.void | None: copy of the record, with the fields position, gains, direct_sends and attributes.
+                None if no consistent copy could be read
+        """
+        sequences = self.records["sequence"]
+        for _ in range(max_attempts):
+            sequence = int(sequences[source_idx])
+            if sequence % 2 == 0:
+                data = self.records[source_idx].copy()
+                if int(sequences[source_idx]) == sequence:
+                    return data
+            sleep(0)
+        return None
+
+    def close(self) -> None:
+        del self.header, self.records
+        self.shm.close()
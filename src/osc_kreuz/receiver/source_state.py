@@ -0,0 +1,149 @@
+import logging
+import mmap
+from pathlib import Path
+from threading import Event, Thread
+
+import numpy as np
+
+from osc_kreuz.soundobject import SoundObject
+
+from .base_receiver import ReceiverException
+from .shared_memory import (
+    STATE_TABLE_MAGIC,
+    STATE_TABLE_VERSION,
+    SharedMemoryState,
+    header_dtype,
+    record_dtype,
+    state_table_attributes,
+)
+
+log = logging.getLogger("receiver")
+
+
+class SourceStateFile(SharedMemoryState):
+    """Receiver that keeps the state of all sources in a file, so it can be restored after a restart or crash
+    with load_source_state().
+
+    The file has the same layout as the state table of SharedMemoryState and is memory mapped, so changes only
+    write to memory. A background thread writes the changed pages to disk every flush_interval seconds,
+    if anything changed in the meantime.
+    """
+
+    def __init__(self, path: Path | str, flush_interval: float = 1.0, **kwargs):
+        """
+        Args:
+            path (Path | str): path of the source state file, an existing file is overwritten
+            flush_interval (float, optional): time in s between writes to disk. Defaults to 1.0.
+        """
+        self.path = Path(path).expanduser()
+        self.flush_interval = flush_interval
+        super().__init__(name=str(self.path), **kwargs)
+
+        self.flushed_sequence = -1
+        self.stopped = Event()
+        self.thread = Thread(target=self.run, name="source state", daemon=True)
+        self.thread.start()
+
+    def print_self_information(self, print_pos_format=True):
+        log.info(f"Initialized receiver {self.my_type()}")
+        log.info(f"\twriting the state of all sources to {self.path}")
+
+    def open_buffer(self, name: str, size: int):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.file = open(self.path, "r+b" if self.path.exists() else "w+b")
+            self.file.truncate(size)
+            self.mmap = mmap.mmap(self.file.fileno(), size)
+        except (OSError, ValueError) as e:
+            raise ReceiverException(f"can't open source state file {self.path}: {e}")
+        return self.mmap
+
+    def close_buffer(self) -> None:
+        self.mmap.close()
+        self.file.close()
+
+    def flush(self) -> None:
+        """write the table to disk if it changed since the last flush"""
+        sequence = int(self.header["sequence"])
+        if sequence == self.flushed_sequence:
+            return
+        try:
+            self.mmap.flush()
+            self.flushed_sequence = sequence
+        except OSError as e:
+            log.error(f"writing source state file {self.path} failed: {e}")
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.flush_interval):
+            self.flush()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.stopped.set()
+        self.thread.join()
+        self.flush()
+        super().close()
+
+
+def load_source_state(path: Path | str, sources: list[SoundObject]) -> bool:
+    """restore the state of the sources from a file written by a SourceStateFile receiver.
+    If the number of sources, renderers or direct sends changed, as much as possible is restored
+
+    Args:
+        path (Path | str): path of the source state file
+        sources (list[SoundObject]): sources the state is restored to
+
+    Returns:
+        bool: True if the state was restored
+    """
+    path = Path(path).expanduser()
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return False
+    except OSError as e:
+        log.error(f"can't read source state file {path}: {e}")
+        return False
+
+    if len(data) < header_dtype.itemsize:
+        log.warning(f"{path} is not a source state file, the state is not restored")
+        return False
+    header = np.frombuffer(data, dtype=header_dtype, count=1)[0]
+    if header["magic"] != STATE_TABLE_MAGIC or header["version"] != STATE_TABLE_VERSION:
+        log.warning(f"{path} is not a source state file, the state is not restored")
+        return False
+
+    n_sources = int(header["n_sources"])
+    records_dtype = record_dtype(
+        int(header["n_coordinates"]),
+        int(header["n_gains"]),
+        int(header["n_direct_sends"]),
+    )
+    if len(data) < header_dtype.itemsize + records_dtype.itemsize * n_sources:
+        log.warning(f"source state file {path} is truncated, the state is not restored")
+        return False
+    records = np.frombuffer(
+        data, dtype=records_dtype, count=n_sources, offset=header_dtype.itemsize
+    )
+    dataformat = header["dataformat"].decode()
+
+    for source, record in zip(sources, records):
+        source.restorePosition(dataformat, *record["position"].tolist())
+        for render_idx, gain in enumerate(
+            record["gains"][: len(source.getAllRendererGains())].tolist()
+        ):
+            source.setRendererGain(render_idx, gain, fromUi=False)
+        for send_idx, gain in enumerate(
+            record["direct_sends"][: len(source.getAllDirectSends())].tolist()
+        ):
+            source.setDirectSend(send_idx, gain, fromUi=False)
+        for attribute, value in zip(state_table_attributes, record["attributes"]):
+            # attributes keep their type, e.g. doppler is sent as an int
+            attribute_type = type(source.getAttribute(attribute))
+            source.setAttribute(attribute, attribute_type(value), fromUi=False)
+
+    log.info(
+        f"restored the state of {min(n_sources, len(sources))} sources from {path}"
+    )
+    return True
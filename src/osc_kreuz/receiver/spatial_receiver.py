@@ -1,15 +1,14 @@
 from .base_receiver import BaseReceiver
-from .updates import PositionUpdate
+from .updates import PositionUpdate, Update
 
 
 class SpatialReceiver(BaseReceiver):
-    def sourcePositionChanged(self, source_idx):
-        self.add_update(
-            source_idx,
+    def position_updates(self, source_idx: int) -> list[Update]:
+        return [
             PositionUpdate(
                 path=self.oscpath_position,
                 soundobject=self.sources[source_idx],
                 coord_fmt=self.posFormat,
                 source_index=source_idx,
-            ),
-        )
+            )
+        ]
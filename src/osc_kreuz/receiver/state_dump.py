@@ -0,0 +1,66 @@
+from collections.abc import Callable, Iterable
+import logging
+from time import monotonic
+
+from pythonosc.osc_message import OscMessage
+
+from osc_kreuz.scheduler import Scheduler
+
+from .updates import OSCPacket
+
+log = logging.getLogger("receiver")
+
+
+class PacedSender:
+    """Sends encoded packets in the background, from the thread of the scheduler.
+    Sending is paced so that on average no more than bytes_per_second are sent,
+    this way a large state dump neither blocks the calling thread nor overflows the receive buffer of the host.
+    Packets are taken from the iterable only when they are sent, so they can be encoded lazily.
+
+    Without a scheduler, or with a rate of 0, all packets are sent right away.
+    """
+
+    def __init__(
+        self,
+        packets: Iterable[OscMessage | OSCPacket],
+        send: Callable[[OscMessage | OSCPacket], None],
+        bytes_per_second: float,
+        scheduler: Scheduler | None = None,
+    ) -> None:
+        self.packets = iter(packets)
+        self.send = send
+        self.bytes_per_second = bytes_per_second
+        self.scheduler = scheduler
+
+        self.bytes_sent = 0
+        self.time_start = 0.0
+
+    def start(self) -> None:
+        if self.scheduler is None or self.bytes_per_second <= 0:
+            for packet in self.packets:
+                self.send(packet)
+            return
+
+        self.time_start = monotonic()
+        self.scheduler.call_later(0, self.send_next)
+
+    def send_next(self) -> None:
+        """send packets as long as they are within the budget, then schedule the next call"""
+        assert self.scheduler is not None
+        now = monotonic()
+        while True:
+            # the time at which all bytes sent so far are paid for
+            time_budget = self.time_start + self.bytes_sent / self.bytes_per_second
+            if time_budget > now:
+                self.scheduler.call_at(time_budget, self.send_next)
+                return
+
+            packet = next(self.packets, None)
+            if packet is None:
+                return
+
+            self.bytes_sent += len(packet.dgram)
+            try:
+                self.send(packet)
+            except OSError as e:
+                log.error(f"failed to send state dump packet: {e}")
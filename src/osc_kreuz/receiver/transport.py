@@ -0,0 +1,266 @@
+from collections.abc import Callable
+import logging
+import socket
+from threading import Condition, Thread
+from typing import Any
+
+from pythonosc import slip
+from pythonosc.osc_message_builder import OscMessageBuilder
+from pythonosc.udp_client import SimpleUDPClient
+
+from osc_kreuz.resolver import Resolver
+
+log = logging.getLogger("receiver")
+
+
+class TCPClient:
+    """OSC 1.1 stream transport: packets are SLIP encoded and sent over a persistent tcp connection.
+    Can be used by receivers like a SimpleUDPClient.
+
+    Packets are queued by send() and written by a background thread, all packets queued in the meantime
+    are written together. The thread connects and reconnects automatically, after every (re)connect
+    on_connect is called, which should resend the complete state. Packets queued while there is no
+    connection are dropped, as the state is resent anyway after connecting.
+    The thread is started by start(), so the client can be stored before on_connect is called the first time.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        port: int,
+        on_connect: Callable[[], Any] | None = None,
+        reconnect_interval: float = 1.0,
+        max_queue_size: int = 1 << 20,
+    ) -> None:
+        """
+        Args:
+            address (str): hostname or ip of the receiver
+            port (int): tcp port of the receiver
+            on_connect (Callable[[], Any] | None, optional): called from the writer thread after connecting. Defaults to None.
+            reconnect_interval (float, optional): time in s to wait between connection attempts. Defaults to 1.0.
+            max_queue_size (int, optional): maximum number of bytes waiting to be sent. When the receiver can't keep up
+                and more is queued, the queue is dropped and the state is resent. Defaults to 1 MiB.
+        """
+        self._address = address
+        self._port = port
+        self.on_connect = on_connect
+        self.reconnect_interval = reconnect_interval
+        self.max_queue_size = max_queue_size
+
+        self.queue: list[bytes] = []
+        self.queue_size = 0
+        self.connected = False
+        self.resync = False
+        self.running = True
+        self.condition = Condition()
+
+        self.thread = Thread(target=self.run, name=f"tcp {address}:{port}", daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def send(self, content: Any) -> None:
+        """queue an encoded message or bundle
+
+        Args:
+            content (Any): anything with a dgram attribute, e.g. OscMessage, OscBundle or OSCPacket
+        """
+        data = slip.encode(content.dgram)
+        with self.condition:
+            if not self.connected:
+                return
+            if self.queue_size + len(data) > self.max_queue_size:
+                # the receiver doesn't keep up, drop everything and resend the complete state instead
+                log.warning(
+                    f"tcp receiver {self._address}:{self._port} is too slow, resending state"
+                )
+                self.queue.clear()
+                self.queue_size = 0
+                self.resync = True
+            else:
+                self.queue.append(data)
+                self.queue_size += len(data)
+            self.condition.notify()
+
+    def send_message(self, address: str, value: Any) -> None:
+        builder = OscMessageBuilder(address=address)
+        values = value if isinstance(value, list) else [value]
+        for v in values:
+            builder.add_arg(v)
+        self.send(builder.build())
+
+    def close(self) -> None:
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+
+    def connect(self) -> socket.socket | None:
+        try:
+            sock = socket.create_connection((self._address, self._port), timeout=5)
+        except OSError as e:
+            log.debug(
+                f"connecting to tcp receiver {self._address}:{self._port} failed: {e}"
+            )
+            return None
+
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.settimeout(None)
+        log.info(f"connected to tcp receiver {self._address}:{self._port}")
+        return sock
+
+    def run(self) -> None:
+        sock: socket.socket | None = None
+        while True:
+            if sock is None:
+                sock = self.connect()
+                if sock is None:
+                    with self.condition:
+                        self.condition.wait(self.reconnect_interval)
+                        if not self.running:
+                            return
+                    continue
+
+                with self.condition:
+                    self.connected = True
+                    self.resync = True
+
+            with self.condition:
+                while self.running and not self.queue and not self.resync:
+                    self.condition.wait()
+                if not self.running:
+                    break
+                resync = self.resync
+                self.resync = False
+
+                # all queued packets are written at once
+                data = b"".join(self.queue)
+                self.queue.clear()
+                self.queue_size = 0
+
+            if resync and self.on_connect is not None:
+                try:
+                    self.on_connect()
+                except Exception as e:
+                    log.error(
+                        f"resending state to {self._address}:{self._port} failed: {e}"
+                    )
+
+            if not data:
+                continue
+
+            try:
+                sock.sendall(data)
+            except OSError as e:
+                log.warning(
+                    f"connection to tcp receiver {self._address}:{self._port} lost: {e}"
+                )
+                with self.condition:
+                    self.connected = False
+                    self.queue.clear()
+                    self.queue_size = 0
+                sock.close()
+                sock = None
+
+        if sock is not None:
+            sock.close()
+
+
+class UnixDatagramClient:
+    """Sends OSC packets to a unix datagram socket, for receivers running on the same machine.
+    Can be used by receivers like a SimpleUDPClient, the path of the socket is used as address.
+
+    Like with udp, packets are dropped silently when no one is listening on the socket or its buffer is full.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._address = path
+        self._port = 0
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.setblocking(False)
+
+    def send(self, content: Any) -> None:
+        try:
+            self._sock.sendto(content.dgram, self._address)
+        except (FileNotFoundError, ConnectionRefusedError, BlockingIOError) as e:
+            log.debug(f"dropped packet for unix socket {self._address}: {e}")
+
+    def send_message(self, address: str, value: Any) -> None:
+        builder = OscMessageBuilder(address=address)
+        values = value if isinstance(value, list) else [value]
+        for v in values:
+            builder.add_arg(v)
+        self.send(builder.build())
+
+
+class ResolvingUDPClient:
+    """Sends OSC packets over udp to a host given by its hostname, which is resolved in the background by a Resolver.
+    Can be used by receivers like a SimpleUDPClient.
+
+    Packets sent before the hostname could be resolved are dropped, once it is resolved on_resolve is called,
+    which should resend the complete state. on_resolve is also called when the address of the host changes.
+    Resolving starts with start(), so the client can be stored before on_resolve is called the first time.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        resolver: Resolver,
+        on_resolve: Callable[[], Any] | None = None,
+        one_shot: bool = False,
+    ) -> None:
+        """
+        Args:
+            hostname (str): hostname or ip of the receiver
+            port (int): udp port of the receiver
+            resolver (Resolver): resolver used to look up the hostname
+            on_resolve (Callable[[], Any] | None, optional): called from the resolver thread
+                after the address of the host changed. Defaults to None.
+            one_shot (bool, optional): stop following the hostname after it was resolved once,
+                for clients that are only used for a single message or dump. Defaults to False.
+        """
+        self.hostname = hostname
+        self._address = hostname
+        self._port = port
+        self.on_resolve = on_resolve
+        self.resolver = resolver
+        self.one_shot = one_shot
+
+        self.client: SimpleUDPClient | None = None
+
+    def start(self) -> None:
+        address = self.resolver.watch(self.hostname, self.set_address)
+        if address is not None:
+            self._address = address
+            self.client = SimpleUDPClient(address, self._port)
+            if self.one_shot:
+                self.close()
+        else:
+            log.info(f"waiting for {self.hostname} to be resolved")
+
+    def set_address(self, address: str) -> None:
+        self.client = SimpleUDPClient(address, self._port)
+        self._address = address
+        if self.one_shot:
+            self.close()
+        if self.on_resolve is not None:
+            self.on_resolve()
+
+    def send(self, content: Any) -> None:
+        client = self.client
+        if client is None:
+            return
+        client.send(content)
+
+    def send_message(self, address: str, value: Any) -> None:
+        client = self.client
+        if client is None:
+            return
+        client.send_message(address, value)
+
+    def close(self) -> None:
+        self.resolver.unwatch(self.hostname, self.set_address)
+
+
+# clients receivers use to send to their hosts
+OSCClient = SimpleUDPClient | TCPClient | UnixDatagramClient | ResolvingUDPClient
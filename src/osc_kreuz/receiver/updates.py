@@ -1,6 +1,13 @@
 from ..soundobject import SoundObject
-from typing import Any, Iterable
+from typing import Any, Iterable, Iterator
+
+from pythonosc.osc_message import OscMessage
+from pythonosc.osc_message_builder import OscMessageBuilder
+from pythonosc.parsing import osc_types
+
 import osc_kreuz.str_keys_conventions as skc
+
+
 class OSCMessage:
     def __init__(self, path: str, values: Any) -> None:
         self.path: str = path
@@ -9,6 +16,72 @@ class OSCMessage:
         else:
             values = list(values)
         self.values: list[Any] = values
+        self.osc_message: OscMessage | None = None
+
+    def build(self) -> OscMessage:
+        """Encode this message, the result can be sent to any number of hosts without encoding it again.
+        The encoded message is kept, so the values should not be changed after calling this.
+
+        Returns:
+            OscMessage: the encoded message
+        """
+        if self.osc_message is None:
+            builder = OscMessageBuilder(address=self.path)
+            for value in self.values:
+                builder.add_arg(value)
+            self.osc_message = builder.build()
+        return self.osc_message
+
+
+class OSCPacket:
+    """An already encoded OSC packet. Like OscMessage and OscBundle it has a dgram attribute,
+    so it can be sent with SimpleUDPClient.send()"""
+
+    def __init__(self, dgram: bytes) -> None:
+        self.dgram = dgram
+
+    @property
+    def size(self) -> int:
+        return len(self.dgram)
+
+
+BUNDLE_PREFIX = b"#bundle\x00"
+
+
+def iter_bundles(
+    msgs: Iterable[OscMessage | OSCPacket],
+    max_size: int = 1400,
+    timestamp: float = osc_types.IMMEDIATELY,
+) -> Iterator[OSCPacket]:
+    """Pack encoded messages into as few bundles as possible, none of them larger than max_size bytes.
+    Messages that don't fit into a bundle on their own get a bundle of their own.
+    msgs is only consumed as far as needed for the next bundle, so it can encode messages lazily.
+
+    Args:
+        msgs (Iterable[OscMessage | OSCPacket]): encoded messages
+        max_size (int, optional): maximum size of a bundle in bytes, the default fits into an ethernet frame. Defaults to 1400.
+        timestamp (float, optional): timetag of the bundles as system time. Defaults to IMMEDIATELY.
+
+    Yields:
+        OSCPacket: the encoded bundles
+    """
+    header = BUNDLE_PREFIX + osc_types.write_date(timestamp)
+    elements: list[bytes] = []
+    size = len(header)
+
+    for msg in msgs:
+        # every element of a bundle is prefixed with its size
+        element = osc_types.write_int(len(msg.dgram)) + msg.dgram
+        if elements and size + len(element) > max_size:
+            yield OSCPacket(header + b"".join(elements))
+            elements = []
+            size = len(header)
+        elements.append(element)
+        size += len(element)
+
+    if elements:
+        yield OSCPacket(header + b"".join(elements))
+
 
 class Update:
     """Base Class for an Update sent via OSC. Updates with specific requirements should inherit from this one"""
@@ -159,4 +232,4 @@ class AttributeUpdate(Update):
             self.pre_arg = attribute.value
 
     def get_value(self):
-        return self.soundobject.getAttribute(self.attribute)
\ No newline at end of file
+        return self.soundobject.getAttribute(self.attribute)
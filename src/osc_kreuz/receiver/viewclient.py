@@ -1,160 +1,549 @@
+from collections.abc import Callable
+import heapq
+from itertools import count
 import logging
-from threading import Timer
+from threading import Lock
+from time import monotonic
+from typing import Any
+
+from pythonosc.osc_message import OscMessage
+from pythonosc.udp_client import SimpleUDPClient
+
 from osc_kreuz.config import read_config_option
+from osc_kreuz.scheduler import ScheduledEvent, Scheduler
+from .base_receiver import BaseReceiver
 from .spatial_receiver import SpatialReceiver
 from .updates import (
     AttributeUpdate,
     DirectSendUpdate,
     GainUpdate,
+    OSCMessage,
     PositionUpdate,
+    Update,
 )
 import osc_kreuz.str_keys_conventions as skc
 
 log = logging.getLogger("receiver")
 verbosity = 0
 
+SourceFilter = frozenset[int] | None
+ParameterFilter = frozenset[skc.ParameterType] | None
+ViewClientGroupKey = tuple[str, bool, int, SourceFilter, ParameterFilter]
 
-class ViewClient(SpatialReceiver):
-    def my_type(self) -> str:
-        return f"{super().my_type()}_{self.alias}"
 
-    def __init__(self, aliasname: str, **kwargs):
-        self.alias = aliasname
+def parse_source_filter(sources: str | int | None) -> SourceFilter:
+    """Parse the source filter of a subscription request.
+    Source indices start at 1, ranges and lists can be combined, e.g. "1-16", "1,3,5-8" or 12.
 
-        super(ViewClient, self).__init__(**kwargs)
+    Args:
+        sources (str | int | None): the filter as sent by the client, None, "" or "all" disable the filter
 
-        self.pingCounter = 0
+    Raises:
+        ValueError: raised when the filter can't be parsed
 
-        self.indexAsValue = False
-        if "indexAsValue" in kwargs.keys():
-            self.indexAsValue = kwargs["indexAsValue"]
+    Returns:
+        SourceFilter: set of zero based source indices, None if all sources are subscribed
+    """
+    if sources is None:
+        return None
+    if isinstance(sources, int):
+        return frozenset([sources - 1])
+
+    sources = sources.strip().lower()
+    if sources in ("", "all"):
+        return None
+
+    source_indices: set[int] = set()
+    for part in sources.split(","):
+        start, _, end = part.partition("-")
+        first = int(start)
+        last = int(end) if end else first
+        if first < 1 or last < first:
+            raise ValueError(f"invalid source range {part}")
+        source_indices.update(range(first - 1, last))
+    return frozenset(source_indices)
 
-        # TODO initialize variables only once, and with a consistent type pl0x
-        self.oscpath_position_with_index = [""] * self.n_sources
-        self.oscpath_gain_with_index = [
-            ["" for j in range(self.globalConfig["n_renderengines"])]
-            for i in range(self.n_sources)
-        ]
 
-        self.createOscPrefixes()
+def parse_parameter_filter(parameters: str | None) -> ParameterFilter:
+    """Parse the parameter filter of a subscription request, e.g. "gain" or "position,attribute"
 
-        self.own_port = (
-            read_config_option(self.globalConfig, skc.inputport_settings, int),
+    Args:
+        parameters (str | None): the filter as sent by the client, None, "" or "all" disable the filter
+
+    Raises:
+        ValueError: raised when a parameter type is unknown
+
+    Returns:
+        ParameterFilter: set of subscribed parameter types, None if all types are subscribed
+    """
+    if parameters is None:
+        return None
+
+    parameters = parameters.strip().lower()
+    if parameters in ("", "all"):
+        return None
+
+    try:
+        return frozenset(
+            skc.parameter_type_aliases[p.strip()] for p in parameters.split(",")
         )
+    except KeyError as e:
+        raise ValueError(f"unknown parameter type {e}")
 
-        self.pingTimer: Timer | None = None
 
-        # send current state to viewclient
-        self.dump_source_positions()
-        self.dump_source_gains()
+def view_client_group_key(
+    dataformat: str = "xyz",
+    indexAsValue=0,
+    updateintervall=10,
+    sources: str | int | None = None,
+    parameters: str | None = None,
+) -> ViewClientGroupKey:
+    """Build the key used to decide which ViewClients can share a ViewClientGroup.
 
-    def createOscPrefixes(self):
-        for i in range(self.n_sources):
-            self.oscpath_position_with_index[i] = f"/source/{i+1}/{self.posFormat}"
+    Args:
+        dataformat (str, optional): coordinate format of the positions. Defaults to "xyz".
+        indexAsValue (int, optional): if set the source index is part of the osc path. Defaults to 0.
+        updateintervall (int, optional): update interval in ms. Defaults to 10.
+        sources (str | int | None, optional): source filter, see parse_source_filter(). Defaults to None.
+        parameters (str | None, optional): parameter filter, see parse_parameter_filter(). Defaults to None.
 
-            try:
-                render_units = self.globalConfig["render_units"]
-            except KeyError:
-                render_units = []
-
-            renderList = [""] * self.globalConfig["n_renderengines"]
-            if (
-                "ambi" in render_units
-                and "wfs" in render_units
-                and "reverb" in render_units
-            ):
-                renderList[render_units.index("ambi")] = f"/source/{i+1}/ambi"
-                renderList[render_units.index("wfs")] = f"/source/{i+1}/wfs"
-                renderList[render_units.index("reverb")] = f"/source/{i+1}/reverb"
-            else:
-                for j in range(self.globalConfig["n_renderengines"]):
-                    self.oscpath_gain_with_index[i][j] = f"/source/{i+1}/send/{j}"
-            self.oscpath_gain_with_index[i] = renderList
+    Raises:
+        ValueError: raised when one of the filters is invalid
 
-    def checkAlive(self, deleteClient):
-        self.pingTimer = Timer(2.0, self.checkAlive, args=(deleteClient,))
-        self.pingTimer.name = f"pingtimer {self.alias}"
+    Returns:
+        ViewClientGroupKey: hashable key describing the output of a group
+    """
+    return (
+        str(dataformat),
+        bool(indexAsValue),
+        int(updateintervall),
+        parse_source_filter(sources),
+        parse_parameter_filter(parameters),
+    )
 
-        if self.pingCounter < 6:
-            try:
-                # get first receiver tuple, get actual receiver
-                self.receivers[0][1].send_message(
-                    # TODO change ping path to constant defined somewhere else
-                    "/oscrouter/ping",
-                    self.own_port,
-                )
-            except Exception as e:
-                log.warning(e)
-                log.warning(f"error while pinging client { self.alias }, removing")
-                self.pingTimer.cancel()
-                deleteClient(self, self.alias)
 
-            self.pingCounter += 1
-            self.pingTimer.start()
+class ViewClientGroup(SpatialReceiver):
+    """Receiver for all ViewClients that expect the same output (data format, index in path, update interval, filters).
+    Updates are built and encoded once per group and the resulting datagram is sent to every member,
+    so the cost of an update scales with the number of groups instead of the number of viewers.
+    """
+
+    def __init__(
+        self,
+        indexAsValue=0,
+        sources: str | int | None = None,
+        parameters: str | None = None,
+        **kwargs,
+    ):
+        self.indexAsValue = bool(indexAsValue)
+        self.members: dict[str, ViewClient] = {}
+
+        # filters are checked before any update is created
+        self.source_filter = parse_source_filter(sources)
+        self.parameter_filter = parse_parameter_filter(parameters)
+
+        super(ViewClientGroup, self).__init__(**kwargs)
+
+        self.key: ViewClientGroupKey = (
+            self.posFormat,
+            self.indexAsValue,
+            round(self.update_interval * 1000),
+            self.source_filter,
+            self.parameter_filter,
+        )
+
+        # paths containing the source index are built when the source is first sent
+        self.oscpath_position_with_index: dict[int, str] = {}
+        self.oscpath_gain_with_index: dict[tuple[int, int], str] = {}
+
+    def print_self_information(self, print_pos_format=True):
+        # groups are created and destroyed together with view clients, so keep it short
+        log.info(f"Initialized receiver {self.my_type()} for output {self.posFormat}")
+
+    def position_path_with_index(self, source_idx: int) -> str:
+        try:
+            return self.oscpath_position_with_index[source_idx]
+        except KeyError:
+            path = f"/source/{source_idx + 1}/{self.posFormat}"
+            self.oscpath_position_with_index[source_idx] = path
+            return path
+
+    def gain_path_with_index(self, source_idx: int, render_idx: int) -> str:
+        try:
+            return self.oscpath_gain_with_index[source_idx, render_idx]
+        except KeyError:
+            pass
+
+        render_units = self.globalConfig.get("render_units", [])
+        if all(unit in render_units for unit in ("ambi", "wfs", "reverb")):
+            # the standard render units have named paths
+            path = f"/source/{source_idx + 1}/{render_units[render_idx]}"
         else:
-            deleteClient(self, self.alias)
+            path = f"/source/{source_idx + 1}/send/{render_idx}"
+        self.oscpath_gain_with_index[source_idx, render_idx] = path
+        return path
 
-    def receivedIsAlive(self):
-        self.pingCounter = 0
+    def add_member(self, view_client: "ViewClient", dump: bool = True) -> None:
+        """Add a view client to this group, its current state is sent to it right away.
+
+        Args:
+            view_client (ViewClient): the newly subscribed client
+            dump (bool, optional): send the current state to the client, clients moving between groups
+                already have it. Defaults to True.
+        """
+        view_client.group = self
+        self.members[view_client.alias] = view_client
+
+        # the receivers list is replaced instead of changed,
+        # so updates that are sent at the same time are not affected
+        self.receivers = self.receivers + [
+            (view_client.hostname, view_client.osc_client)
+        ]
+
+        if dump:
+            self.dump_to_member(view_client)
+
+    def remove_member(self, view_client: "ViewClient") -> None:
+        self.members.pop(view_client.alias, None)
+        self.receivers = [
+            (hostname, client)
+            for hostname, client in self.receivers
+            if client is not view_client.osc_client
+        ]
+        view_client.group = None
 
-    def sourcePositionChanged(self, source_idx):
+    def is_empty(self) -> bool:
+        return len(self.members) == 0
+
+    def is_subscribed(self, source_idx: int, parameter_type: skc.ParameterType) -> bool:
+        """check the filters of this group
+
+        Args:
+            source_idx (int): index of the changed source
+            parameter_type (skc.ParameterType): type of the changed parameter
+
+        Returns:
+            bool: True if the members of this group should receive this update
+        """
+        return (
+            self.parameter_filter is None or parameter_type in self.parameter_filter
+        ) and (self.source_filter is None or source_idx in self.source_filter)
+
+    def dump_to_member(self, view_client: "ViewClient") -> None:
+        """send the current state of all subscribed sources and parameters only to a single member of this group
+
+        Args:
+            view_client (ViewClient): member that should receive the state
+        """
+        self.dump_state(view_client.hostname, view_client.port)
+
+    def position_update(self, source_idx: int) -> Update:
         if self.indexAsValue:
-            path = self.oscpath_position_with_index[source_idx]
+            path = self.position_path_with_index(source_idx)
             source_index_for_update = None
         else:
             path = self.oscpath_position
             source_index_for_update = source_idx
-        self.add_update(
-            source_idx,
-            PositionUpdate(
-                path=path,
-                soundobject=self.sources[source_idx],
-                coord_fmt=self.posFormat,
-                source_index=source_index_for_update,
-            ),
+        return PositionUpdate(
+            path=path,
+            soundobject=self.sources[source_idx],
+            coord_fmt=self.posFormat,
+            source_index=source_index_for_update,
         )
 
-    def sourceRenderGainChanged(self, source_idx, render_idx):
+    def gain_update(self, source_idx: int, render_idx: int) -> Update:
         # TODO option to send named paths instead
         if self.indexAsValue:
-            path = self.oscpath_gain_with_index[source_idx][render_idx]
+            path = self.gain_path_with_index(source_idx, render_idx)
             source_index_for_update = None
         else:
             path = "/source/send"
             source_index_for_update = source_idx
-        self.add_update(
-            source_idx,
-            GainUpdate(
-                path,
-                soundobject=self.sources[source_idx],
-                render_idx=render_idx,
-                source_index=source_index_for_update,
-                include_render_idx=True,
-            ),
+        return GainUpdate(
+            path,
+            soundobject=self.sources[source_idx],
+            render_idx=render_idx,
+            source_index=source_index_for_update,
+            include_render_idx=True,
         )
 
-    def sourceDirectSendChanged(self, source_idx, send_idx):
+    def position_updates(self, source_idx: int) -> list[Update]:
+        if not self.is_subscribed(source_idx, skc.ParameterType.position):
+            return []
+        return [self.position_update(source_idx)]
+
+    def render_gain_updates(self, source_idx: int, render_idx: int) -> list[Update]:
+        if not self.is_subscribed(source_idx, skc.ParameterType.gain):
+            return []
+        return [self.gain_update(source_idx, render_idx)]
+
+    def direct_send_updates(self, source_idx: int, send_idx: int) -> list[Update]:
+        if not self.is_subscribed(source_idx, skc.ParameterType.directsend):
+            return []
         path = "/source/direct"
-        self.add_update(
-            source_idx,
+        return [
             DirectSendUpdate(
                 path,
                 soundobject=self.sources[source_idx],
                 send_index=send_idx,
                 source_index=source_idx,
                 include_send_idx=True,
-            ),
-        )
+            )
+        ]
 
-    def sourceAttributeChanged(self, source_idx, attribute):
+    def attribute_updates(
+        self, source_idx: int, attribute: skc.SourceAttributes
+    ) -> list[Update]:
+        if not self.is_subscribed(source_idx, skc.ParameterType.attribute):
+            return []
         path = "/source/attribute"
-        self.add_update(
-            source_idx,
+        return [
             AttributeUpdate(
                 path,
                 attribute,
                 soundobject=self.sources[source_idx],
                 source_index=source_idx,
                 include_attribute_name=True,
+            )
+        ]
+
+
+class ViewClient:
+    """A client connected using the subscription protocol.
+    The ViewClient only keeps the subscription alive, all source updates are sent by the ViewClientGroup it is a member of.
+
+    The round trip time and the rate of missed pongs are measured with every ping. When the link to the client
+    is struggling, the update interval of the client is stretched (the client moves to a slower group),
+    when the link recovers it is restored step by step to the interval requested by the client.
+    """
+
+    # smoothing factor for round trip time and loss measurements
+    ewma_alpha = 0.2
+
+    # number of unanswered pings after which a client is removed
+    max_missed_pings = 6
+
+    def __init__(
+        self,
+        aliasname: str,
+        hostname: str,
+        port: int,
+        group_config: dict[str, Any] | None = None,
+    ):
+        self.alias = aliasname
+        self.hostname = hostname
+        self.port = port
+
+        # the subscription parameters, used to find the group of this client
+        self.group_config: dict[str, Any] = (
+            group_config if group_config is not None else {}
+        )
+
+        self.osc_client = SimpleUDPClient(hostname, port)
+        self.group: ViewClientGroup | None = None
+
+        self.pingCounter = 0
+
+        # link quality measurement
+        self.ping_sent_time: float | None = None
+        self.rtt: float | None = None
+        self.loss = 0.0
+
+        # update interval adaption, all intervals in ms
+        self.requested_interval = int(self.group_config.get("updateintervall", 10))
+        self.update_interval = self.requested_interval
+        self.adaptive_rate = read_config_option(
+            BaseReceiver.globalConfig, "viewclient_adaptive_rate", bool, True
+        )
+        self.max_update_interval = max(
+            self.requested_interval,
+            read_config_option(
+                BaseReceiver.globalConfig, "viewclient_max_updateintervall", int, 200
             ),
         )
+        self.rtt_limit = (
+            read_config_option(
+                BaseReceiver.globalConfig, "viewclient_rtt_limit", float, 100
+            )
+            / 1000
+        )
+        self.loss_limit = read_config_option(
+            BaseReceiver.globalConfig, "viewclient_loss_limit", float, 0.25
+        )
+
+    def __repr__(self) -> str:
+        return f"ViewClient_{self.alias}"
+
+    def get_group_config(self) -> dict[str, Any]:
+        """the config of the group this client should currently be a member of
+
+        Returns:
+            dict[str, Any]: the subscription parameters with the current update interval
+        """
+        return {**self.group_config, "updateintervall": self.update_interval}
+
+    def checkAlive(self) -> bool:
+        """evaluate the answer to the previous ping, called before every ping
+
+        Returns:
+            bool: False if the client stopped answering and should be removed
+        """
+        if self.pingCounter >= self.max_missed_pings:
+            return False
+
+        if self.ping_sent_time is not None:
+            self.update_link_quality(missed_pong=self.pingCounter > 0)
+        return True
+
+    def send_ping(self, ping: OscMessage) -> None:
+        # count the ping before sending it, so a fast pong can't be overwritten
+        self.pingCounter += 1
+        self.ping_sent_time = monotonic()
+        self.osc_client.send(ping)
+
+    def receivedIsAlive(self):
+        # the pong doesn't tell which ping it answers. The round trip time is only measured from the first pong
+        # while a single ping is unanswered, a late pong to an older ping would make it look too short
+        if self.pingCounter == 1 and self.ping_sent_time is not None:
+            rtt = monotonic() - self.ping_sent_time
+            if self.rtt is None:
+                self.rtt = rtt
+            else:
+                self.rtt += self.ewma_alpha * (rtt - self.rtt)
+        self.pingCounter = 0
+
+    def update_link_quality(self, missed_pong: bool):
+        self.loss += self.ewma_alpha * (float(missed_pong) - self.loss)
+
+    def link_is_struggling(self) -> bool:
+        return self.loss > self.loss_limit or (
+            self.rtt is not None and self.rtt > self.rtt_limit
+        )
+
+    def link_is_healthy(self) -> bool:
+        return self.loss < self.loss_limit / 2 and (
+            self.rtt is None or self.rtt < self.rtt_limit / 2
+        )
+
+    def adapt_update_interval(self) -> bool:
+        """stretch the update interval when the link is struggling, restore it once it is healthy again
+
+        Returns:
+            bool: True if the update interval changed
+        """
+        if not self.adaptive_rate:
+            return False
+
+        old_interval = self.update_interval
+        if self.link_is_struggling():
+            self.update_interval = min(
+                self.max_update_interval, max(10, self.update_interval * 2)
+            )
+        elif self.link_is_healthy() and self.update_interval > self.requested_interval:
+            self.update_interval = max(
+                self.requested_interval, self.update_interval // 2
+            )
+
+        if self.update_interval == old_interval:
+            return False
+
+        log.info(
+            f"client {self.alias}: rtt {round((self.rtt or 0) * 1000, 1)}ms, loss {round(self.loss * 100)}%, "
+            f"update interval changed from {old_interval}ms to {self.update_interval}ms"
+        )
+        return True
+
+    def dump_room_polygon(self, oscpath: str = "/room/polygon"):
+        if self.group is not None:
+            self.group.dump_room_polygon(oscpath, self.hostname, self.port)
+
+
+class LivenessManager:
+    """Pings all subscribed view clients from a single Scheduler.
+    Each client is an entry in a heap ordered by the time of its next ping,
+    all clients that are due within batch_window are pinged in one go with the same encoded ping message.
+    """
+
+    def __init__(
+        self,
+        scheduler: Scheduler,
+        settings_port: int,
+        deleteClient: Callable[[ViewClient, str], None],
+        moveClient: Callable[[ViewClient], None],
+        ping_interval: float = 2.0,
+        batch_window: float = 0.1,
+    ) -> None:
+        self.scheduler = scheduler
+        self.deleteClient = deleteClient
+        self.moveClient = moveClient
+        self.ping_interval = ping_interval
+        self.batch_window = batch_window
+
+        # the ping is the same for every client, so it is only encoded once
+        # TODO change ping path to constant defined somewhere else
+        self.ping = OSCMessage("/oscrouter/ping", settings_port).build()
+
+        self.clients: set[ViewClient] = set()
+        self.heap: list[tuple[float, int, ViewClient]] = []
+        self.counter = count()
+        self.lock = Lock()
+        self.next_wakeup: ScheduledEvent | None = None
+
+    def add_client(self, view_client: ViewClient) -> None:
+        """start pinging a client, the first ping is sent right away"""
+        with self.lock:
+            self.clients.add(view_client)
+            heapq.heappush(self.heap, (monotonic(), next(self.counter), view_client))
+            self.schedule_wakeup()
+
+    def remove_client(self, view_client: ViewClient) -> None:
+        # the heap entry of the client is dropped when it is due
+        with self.lock:
+            self.clients.discard(view_client)
+
+    def schedule_wakeup(self) -> None:
+        """schedule the scheduler callback for the next due client, has to be called with the lock held"""
+        if not self.heap:
+            return
+        due = self.heap[0][0]
+        if self.next_wakeup is not None and not self.next_wakeup.cancelled:
+            if self.next_wakeup.when <= due:
+                return
+            self.scheduler.cancel(self.next_wakeup)
+        self.next_wakeup = self.scheduler.call_at(due, self.ping_due_clients)
+
+    def ping_due_clients(self) -> None:
+        now = monotonic()
+        due_clients: list[ViewClient] = []
+        with self.lock:
+            self.next_wakeup = None
+            while self.heap and self.heap[0][0] <= now + self.batch_window:
+                _, _, view_client = heapq.heappop(self.heap)
+                if view_client not in self.clients:
+                    continue
+                due_clients.append(view_client)
+                heapq.heappush(
+                    self.heap,
+                    (now + self.ping_interval, next(self.counter), view_client),
+                )
+            self.schedule_wakeup()
+
+        for view_client in due_clients:
+            if not view_client.checkAlive():
+                log.info(f"client {view_client.alias} stopped answering pings")
+                self.remove_client(view_client)
+                self.deleteClient(view_client, view_client.alias)
+                continue
+
+            if view_client.adapt_update_interval():
+                self.moveClient(view_client)
+
+            try:
+                view_client.send_ping(self.ping)
+            except Exception as e:
+                log.warning(e)
+                log.warning(
+                    f"error while pinging client { view_client.alias }, removing"
+                )
+                self.remove_client(view_client)
+                self.deleteClient(view_client, view_client.alias)
@@ -6,7 +6,14 @@ import osc_kreuz.str_keys_conventions as skc
 
 from .base_receiver import ReceiverException
 from .spatial_receiver import SpatialReceiver
-from .updates import AttributeUpdate, PositionUpdate, OSCMessage
+from .updates import (
+    AttributeUpdate,
+    OSCMessage,
+    OSCPacket,
+    PositionUpdate,
+    Update,
+    iter_bundles,
+)
 
 log = logging.getLogger("receiver")
 verbosity = 0
@@ -41,74 +48,69 @@ class Wonder(SpatialReceiver):
 
         super(Wonder, self).__init__(**kwargs)
 
-    def sourcePositionChanged(self, source_idx):
-        # Add position Update to update stack
-        self.add_update(
-            source_idx,
+    def position_updates(self, source_idx: int) -> list[Update]:
+        updates: list[Update] = [
             PositionUpdate(
                 path=self.oscpath_position,
                 soundobject=self.sources[source_idx],
                 coord_fmt=self.posFormat,
                 source_index=source_idx,
                 post_arg=self.interpolTime,
-            ),
-        )
+            )
+        ]
 
         # optionally update angle if the wave is planar
         if self.linkPositionAndAngle and self.sources[source_idx].getAttribute(
             skc.SourceAttributes.planewave
         ):
-            self.sourceAttributeChanged(source_idx, skc.SourceAttributes.angle)
+            updates += self.attribute_updates(source_idx, skc.SourceAttributes.angle)
+        return updates
 
-    def sourceAttributeChanged(self, source_idx, attribute: skc.SourceAttributes):
+    def attribute_updates(
+        self, source_idx: int, attribute: skc.SourceAttributes
+    ) -> list[Update]:
         if attribute == skc.SourceAttributes.planewave:
             # planewave has special update type
-            self.add_update(
-                source_idx,
+            updates: list[Update] = [
                 wonderPlanewaveAttributeUpdate(
                     path=self.attributeOsc[attribute],
                     soundobject=self.sources[source_idx],
                     source_index=source_idx,
                     attribute=attribute,
-                ),
-            )
-
+                )
+            ]
             if self.sources[source_idx].getAttribute(attribute):
-                self.update_auto_angle(source_idx)
+                updates.append(self.auto_angle_update(source_idx))
+            return updates
         elif attribute == skc.SourceAttributes.angle:
             # angle needs interpolation time as additional param
-            self.add_update(
-                source_idx,
+            return [
                 AttributeUpdate(
                     path=self.attributeOsc[attribute],
                     soundobject=self.sources[source_idx],
                     source_index=source_idx,
                     attribute=attribute,
                     post_arg=self.interpolTime,
-                ),
-            )
+                )
+            ]
         else:
-            self.add_update(
-                source_idx,
+            return [
                 AttributeUpdate(
                     path=self.attributeOsc[attribute],
                     soundobject=self.sources[source_idx],
                     source_index=source_idx,
                     attribute=attribute,
-                ),
-            )
+                )
+            ]
 
-    def update_auto_angle(self, source_idx: int):
+    def auto_angle_update(self, source_idx: int) -> Update:
         # TODO take into account the user specified angle
-        self.add_update(
-            source_idx,
-            PositionUpdate(
-                path=self.attributeOsc[skc.SourceAttributes.angle],
-                soundobject=self.sources[source_idx],
-                source_index=source_idx,
-                coord_fmt="azim",
-                post_arg=self.interpolTime,
-            ),
+        return PositionUpdate(
+            path=self.attributeOsc[skc.SourceAttributes.angle],
+            soundobject=self.sources[source_idx],
+            source_index=source_idx,
+            coord_fmt="azim",
+            post_arg=self.interpolTime,
         )
 
 
@@ -126,6 +128,9 @@ class TWonder(Wonder):
         if self.posFormat == "xyz":
             self.oscpath_position += "3D"
 
+        # the initialization is the same for every twonder, so it is only built and encoded once
+        self.initialization_packets = self.build_initialization_packets()
+
     def add_twonder(self, hostname: str, port: int) -> None:
         """Initialize a new receiving twonder.
         if multicast is being used just send the initialization over, but don't save it
@@ -151,7 +156,7 @@ class TWonder(Wonder):
         # TODO find a way to do this without multicasting to every connected twonder
         # self.dump_source_positions()
 
-    def add_receiver(self, hostname: str, port: int):
+    def add_receiver(self, hostname: str, port: int, transport: str = "udp"):
 
         # check that osc-kreuz is ready to function as cwonder replacement
         if "room_polygon" not in self.globalConfig:
@@ -163,22 +168,26 @@ class TWonder(Wonder):
         if (hostname, port) not in (
             (hostname, receiver._port) for hostname, receiver in self.receivers
         ):
-            super().add_receiver(hostname, port)
+            super().add_receiver(hostname, port, transport)
             if not self.is_multicast:
                 add_receiver_to_state_file("twonder", hostname, port)
 
-    def send_room_information(self, hostname: str, port: int):
-        """send status information for renderer to twonder
+    def global_config_changed(self) -> None:
+        super().global_config_changed()
+        self.initialization_packets = self.build_initialization_packets()
 
-        Args:
-            hostname (str): hostname of the receiving twonder
-            port (int): port of the receiving twonder
+    def build_initialization_packets(self) -> list[OSCPacket]:
+        """build the status information for a twonder, packed into as few bundles as possible
+
+        Returns:
+            list[OSCPacket]: encoded bundles, in the order they have to be sent
         """
+        msgs = []
 
         # send room polygon before number of sources, because twonder checks initialization based on the room polygon
-        self.dump_room_polygon(self.oscpath_room_polygon, hostname, port)
-
-        msgs = []
+        room_polygon = self.room_polygon_message(self.oscpath_room_polygon)
+        if room_polygon is not None:
+            msgs.append(room_polygon)
 
         # send number of sources
         msgs.append(OSCMessage(self.oscpath_n_sources, self.n_sources))
@@ -186,4 +195,29 @@ class TWonder(Wonder):
         # send activation information
         for i in range(self.n_sources):
             msgs.append(OSCMessage(self.oscpath_activate_source, i))
-        self.send_updates(msgs, hostname, port)
+
+        return list(iter_bundles(msg.build() for msg in msgs))
+
+    def dump_state(self, hostname: str | None = None, port: int | None = None) -> None:
+        # a twonder has to be initialized before it accepts source updates. This also initializes twonders
+        # whose hostname was resolved after they connected, packets sent to them before were dropped
+        self.send_room_information(hostname, port)
+        super().dump_state(hostname, port)
+
+    def send_room_information(
+        self, hostname: str | None = None, port: int | None = None
+    ):
+        """send status information for renderer to twonder
+
+        Args:
+            hostname (str | None, optional): hostname of the receiving twonder, all twonders if None. Defaults to None.
+            port (int | None, optional): port of the receiving twonder, used together with hostname. Defaults to None.
+        """
+        receivers_to_update = (
+            self.get_receivers_for_host(hostname, port)
+            if hostname is not None and port is not None
+            else self.receivers
+        )
+        for _, receiver in receivers_to_update:
+            for packet in self.initialization_packets:
+                self.send_packet(packet, receiver, "twonder initialization")
@@ -0,0 +1,209 @@
+"""Recording of all incoming OSC traffic and replaying it, to reproduce problems that only happen during a show.
+
+A recording starts with a header (magic, version, wall clock time of the start in ns), followed by one record per
+received datagram: the time since the start of the recording in ns, the port type the datagram was received on,
+its length and the datagram itself.
+"""
+
+from collections import deque
+from collections.abc import Iterator
+from enum import IntEnum
+import logging
+from pathlib import Path
+import socket
+import struct
+import sys
+from threading import Event, Thread
+from time import monotonic_ns, perf_counter, sleep, time_ns
+
+import click
+
+log = logging.getLogger("recorder")
+
+RECORDING_MAGIC = b"OKREC"
+RECORDING_VERSION = 1
+header_struct = struct.Struct("<5sBQ")
+record_struct = struct.Struct("<QBI")
+
+
+class PortType(IntEnum):
+    ui = 0
+    data = 1
+    settings = 2
+
+
+class RecordingError(Exception):
+    pass
+
+
+class TrafficRecorder:
+    """Appends received datagrams to a recording.
+
+    record() is called from the threads of the osc servers, it only timestamps the datagram and puts it into a queue.
+    A background thread writes the queue to the file every flush_interval seconds.
+    """
+
+    def __init__(self, path: Path | str, flush_interval: float = 0.2) -> None:
+        """
+        Args:
+            path (Path | str): path of the recording, an existing file is overwritten
+            flush_interval (float, optional): time in s between writes to the file. Defaults to 0.2.
+        """
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.file = open(self.path, "wb")
+        self.file.write(
+            header_struct.pack(RECORDING_MAGIC, RECORDING_VERSION, time_ns())
+        )
+        self.time_start = monotonic_ns()
+
+        self.queue: deque[tuple[int, int, bytes]] = deque()
+        self.n_records = 0
+        self.stopped = Event()
+        self.thread = Thread(target=self.run, name="recorder", daemon=True)
+        self.thread.start()
+        log.info(f"recording incoming osc to {self.path}")
+
+    def record(self, port_type: PortType, dgram: bytes) -> None:
+        self.queue.append((monotonic_ns() - self.time_start, port_type, dgram))
+
+    def write_queue(self) -> None:
+        records = []
+        while self.queue:
+            timestamp, port_type, dgram = self.queue.popleft()
+            records.append(record_struct.pack(timestamp, port_type, len(dgram)))
+            records.append(dgram)
+        if records:
+            self.n_records += len(records) // 2
+            self.file.write(b"".join(records))
+            self.file.flush()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.flush_interval):
+            try:
+                self.write_queue()
+            except OSError as e:
+                log.error(f"writing recording {self.path} failed: {e}")
+
+    def close(self) -> None:
+        self.stopped.set()
+        self.thread.join()
+        self.write_queue()
+        self.file.close()
+        log.info(f"recorded {self.n_records} datagrams to {self.path}")
+
+
+def read_recording(path: Path | str) -> Iterator[tuple[int, PortType, bytes]]:
+    """read a recording
+
+    Args:
+        path (Path | str): path of the recording
+
+    Raises:
+        RecordingError: raised if the file is not a recording
+
+    Yields:
+        tuple[int, PortType, bytes]: time since the start of the recording in ns, port type and datagram
+    """
+    with open(path, "rb") as f:
+        header = f.read(header_struct.size)
+        if len(header) < header_struct.size:
+            raise RecordingError(f"{path} is not a recording")
+        magic, version, _ = header_struct.unpack(header)
+        if magic != RECORDING_MAGIC or version != RECORDING_VERSION:
+            raise RecordingError(f"{path} is not a recording")
+
+        while True:
+            record_header = f.read(record_struct.size)
+            if len(record_header) < record_struct.size:
+                # the end of the file, or a record that was cut off when the recording was interrupted
+                return
+            timestamp, port_type, length = record_struct.unpack(record_header)
+            dgram = f.read(length)
+            if len(dgram) < length:
+                return
+            yield timestamp, PortType(port_type), dgram
+
+
+def replay_recording(
+    path: Path | str,
+    ip: str,
+    ports: dict[PortType, int],
+    speed: float = 1.0,
+) -> int:
+    """send the datagrams of a recording to an osc-kreuz with the original timing
+
+    Args:
+        path (Path | str): path of the recording
+        ip (str): ip of the osc-kreuz
+        ports (dict[PortType, int]): port to send the datagrams of each port type to, port types that are
+            not in ports are skipped
+        speed (float, optional): factor the replay is sped up by, 0 replays as fast as possible. Defaults to 1.0.
+
+    Returns:
+        int: number of sent datagrams
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    n_sent = 0
+    time_start = perf_counter()
+    for timestamp, port_type, dgram in read_recording(path):
+        if port_type not in ports:
+            continue
+        if speed > 0:
+            delay = time_start + timestamp / 1e9 / speed - perf_counter()
+            if delay > 0:
+                sleep(delay)
+        sock.sendto(dgram, (ip, ports[port_type]))
+        n_sent += 1
+    sock.close()
+    return n_sent
+
+
+@click.command(help="Replay a recording of incoming OSC to an osc-kreuz")
+@click.argument(
+    "recording",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+)
+@click.option(
+    "-i", "--ip", type=click.STRING, default="127.0.0.1", help="ip of the osc-kreuz"
+)
+@click.option("-u", "--port_ui", type=click.INT, default=4455, show_default=True)
+@click.option("-d", "--port_data", type=click.INT, default=4007, show_default=True)
+@click.option("-s", "--port_settings", type=click.INT, default=4999, show_default=True)
+@click.option(
+    "--speed",
+    type=click.FLOAT,
+    default=1.0,
+    show_default=True,
+    help="speed up the replay by this factor, 0 replays as fast as possible",
+)
+@click.option(
+    "--no-settings",
+    is_flag=True,
+    help="skip datagrams received on the settings port, e.g. subscriptions of view clients",
+)
+def replay(
+    recording: Path,
+    ip: str,
+    port_ui: int,
+    port_data: int,
+    port_settings: int,
+    speed: float,
+    no_settings: bool,
+) -> None:
+    logging.basicConfig(level=logging.INFO)
+    ports = {PortType.ui: port_ui, PortType.data: port_data}
+    if not no_settings:
+        ports[PortType.settings] = port_settings
+
+    time_start = perf_counter()
+    try:
+        n_sent = replay_recording(recording, ip, ports, speed)
+    except RecordingError as e:
+        log.error(e)
+        sys.exit(-1)
+    log.info(f"replayed {n_sent} datagrams in {perf_counter() - time_start:.2f}s")
+
+
+if __name__ == "__main__":
+    replay()
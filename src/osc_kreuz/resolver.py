@@ -0,0 +1,181 @@
+from collections.abc import Callable
+import ipaddress
+import logging
+import socket
+from threading import Condition, Thread
+from time import monotonic
+from typing import Any
+
+log = logging.getLogger("resolver")
+
+
+class Resolver:
+    """Resolves hostnames in a background thread, so an unresolvable host never blocks the caller.
+
+    Resolved addresses are cached and resolved again after ttl seconds, callbacks registered with watch()
+    are called from the resolver thread whenever the address of their hostname changes.
+    Failed lookups are retried with an exponential backoff, starting at retry_interval up to max_retry_interval.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        retry_interval: float = 1.0,
+        max_retry_interval: float = 30.0,
+        family: int = socket.AF_INET,
+    ) -> None:
+        """
+        Args:
+            ttl (float, optional): time in s after which a resolved hostname is resolved again. Defaults to 300.0.
+            retry_interval (float, optional): time in s until a failed lookup is retried. Defaults to 1.0.
+            max_retry_interval (float, optional): maximum time in s between retries. Defaults to 30.0.
+            family (int, optional): address family of the looked up addresses. Defaults to socket.AF_INET.
+        """
+        self.ttl = ttl
+        self.retry_interval = retry_interval
+        self.max_retry_interval = max_retry_interval
+        self.family = family
+
+        # hostname -> resolved address
+        self.cache: dict[str, str] = {}
+        # hostname -> time of the next lookup
+        self.next_lookup: dict[str, float] = {}
+        # hostname -> current retry interval, only for hostnames whose last lookup failed
+        self.backoff: dict[str, float] = {}
+        self.callbacks: dict[str, list[Callable[[str], Any]]] = {}
+
+        self.condition = Condition()
+        self.running = True
+        self.thread: Thread | None = None
+
+    def get(self, hostname: str) -> str | None:
+        """get the cached address of a hostname
+
+        Returns:
+            str | None: the address, None if the hostname wasn't resolved yet
+        """
+        if is_ip_address(hostname):
+            return hostname
+        with self.condition:
+            return self.cache.get(hostname)
+
+    def watch(self, hostname: str, callback: Callable[[str], Any]) -> str | None:
+        """resolve a hostname in the background and call callback with the new address
+        every time it changes. Addresses are not resolved again and callback is never called for ip addresses.
+
+        Args:
+            hostname (str): hostname to resolve
+            callback (Callable[[str], Any]): called from the resolver thread with the new address
+
+        Returns:
+            str | None: the address if it is already known, otherwise None
+        """
+        if is_ip_address(hostname):
+            return hostname
+
+        with self.condition:
+            self.callbacks.setdefault(hostname, []).append(callback)
+            if hostname not in self.next_lookup:
+                self.next_lookup[hostname] = monotonic()
+                self.condition.notify()
+            if self.thread is None:
+                self.thread = Thread(target=self.run, name="resolver", daemon=True)
+                self.thread.start()
+            return self.cache.get(hostname)
+
+    def unwatch(self, hostname: str, callback: Callable[[str], Any]) -> None:
+        """stop calling callback for changes of hostname, the hostname is not resolved anymore
+        once no callbacks are left"""
+        with self.condition:
+            callbacks = self.callbacks.get(hostname, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+            if not callbacks:
+                self.callbacks.pop(hostname, None)
+                self.next_lookup.pop(hostname, None)
+                self.backoff.pop(hostname, None)
+
+    def stop(self) -> None:
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+
+    def lookup(self, hostname: str) -> str:
+        """resolve a hostname, blocking. Raises socket.gaierror if it fails"""
+        addresses = socket.getaddrinfo(hostname, None, self.family, socket.SOCK_DGRAM)
+        # the first entry is the preferred address, its sockaddr starts with the ip
+        return addresses[0][4][0]
+
+    def run(self) -> None:
+        while True:
+            with self.condition:
+                while self.running:
+                    now = monotonic()
+                    due = [
+                        hostname
+                        for hostname, when in self.next_lookup.items()
+                        if when <= now
+                    ]
+                    if due:
+                        break
+                    timeout = (
+                        min(self.next_lookup.values()) - now
+                        if self.next_lookup
+                        else None
+                    )
+                    self.condition.wait(timeout)
+                if not self.running:
+                    return
+
+            # lookups happen without holding the lock, so watch() never blocks
+            for hostname in due:
+                self.resolve(hostname)
+
+    def resolve(self, hostname: str) -> None:
+        try:
+            address = self.lookup(hostname)
+        except (socket.gaierror, UnicodeError) as e:
+            with self.condition:
+                if hostname not in self.next_lookup:
+                    return
+                retry_interval = self.backoff.get(hostname, self.retry_interval)
+                self.backoff[hostname] = min(
+                    retry_interval * 2, self.max_retry_interval
+                )
+                self.next_lookup[hostname] = monotonic() + retry_interval
+            log.warning(
+                f"resolving {hostname} failed: {e}, retrying in {retry_interval}s"
+            )
+            return
+
+        with self.condition:
+            if hostname not in self.next_lookup:
+                return
+            self.backoff.pop(hostname, None)
+            self.next_lookup[hostname] = monotonic() + self.ttl
+            previous_address = self.cache.get(hostname)
+            self.cache[hostname] = address
+            callbacks = list(self.callbacks.get(hostname, []))
+
+        if address == previous_address:
+            return
+        if previous_address is None:
+            log.info(f"resolved {hostname} to {address}")
+        else:
+            log.info(
+                f"address of {hostname} changed from {previous_address} to {address}"
+            )
+
+        for callback in callbacks:
+            try:
+                callback(address)
+            except Exception as e:
+                log.error(f"handling new address of {hostname} failed: {e}")
+
+
+def is_ip_address(hostname: str) -> bool:
+    try:
+        ipaddress.ip_address(hostname)
+        return True
+    except ValueError:
+        return False
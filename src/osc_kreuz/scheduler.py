@@ -0,0 +1,178 @@
+from collections.abc import Callable
+import heapq
+from itertools import count
+import logging
+from math import floor
+from threading import Condition, Lock, Thread
+from time import monotonic
+from typing import Any
+
+log = logging.getLogger("scheduler")
+
+
+class ScheduledEvent:
+    """A callback scheduled on a Scheduler, can be used to cancel the callback"""
+
+    def __init__(
+        self, when: float, seq: int, func: Callable[..., Any], args: tuple
+    ) -> None:
+        self.when = when
+        self.seq = seq
+        self.func = func
+        self.args = args
+        self.cancelled = False
+
+    def __lt__(self, other: "ScheduledEvent") -> bool:
+        return (self.when, self.seq) < (other.when, other.seq)
+
+
+class Scheduler:
+    """Runs callbacks at a given time on a single thread.
+    Scheduled callbacks are kept in a heap, so a scheduled callback costs a heap entry instead of a thread.
+    All callbacks that are due are run together in one wake up of the thread.
+    Times are given as values of time.monotonic().
+
+    Callbacks should return quickly, since they delay all other callbacks.
+    """
+
+    def __init__(self, name: str = "scheduler") -> None:
+        self.name = name
+        self.events: list[ScheduledEvent] = []
+        self.condition = Condition()
+        self.counter = count()
+        self.running = False
+        self.thread: Thread | None = None
+        self.frame_clocks: dict[float, "FrameClock"] = {}
+
+    def start(self) -> None:
+        with self.condition:
+            if self.running:
+                return
+            self.running = True
+        self.thread = Thread(target=self.run, name=self.name, daemon=True)
+        self.thread.start()
+
+    def shutdown(self) -> None:
+        with self.condition:
+            self.running = False
+            self.events.clear()
+            self.condition.notify()
+        if self.thread is not None and self.thread.is_alive():
+            self.thread.join(1)
+
+    def call_at(self, when: float, func: Callable[..., Any], *args) -> ScheduledEvent:
+        """schedule func to be called at the monotonic time when
+
+        Args:
+            when (float): monotonic time in s
+            func (Callable[..., Any]): callback
+
+        Returns:
+            ScheduledEvent: the scheduled event
+        """
+        event = ScheduledEvent(when, next(self.counter), func, args)
+        with self.condition:
+            heapq.heappush(self.events, event)
+
+            # only wake the thread if the new event is the next one
+            if self.events[0] is event:
+                self.condition.notify()
+        return event
+
+    def call_later(
+        self, delay: float, func: Callable[..., Any], *args
+    ) -> ScheduledEvent:
+        return self.call_at(monotonic() + delay, func, *args)
+
+    def frame_clock(self, interval: float) -> "FrameClock":
+        """get the frame clock ticking every interval seconds, all users of the same interval share a clock
+
+        Args:
+            interval (float): time between ticks in s
+
+        Returns:
+            FrameClock: the frame clock
+        """
+        with self.condition:
+            if interval not in self.frame_clocks:
+                self.frame_clocks[interval] = FrameClock(self, interval)
+            return self.frame_clocks[interval]
+
+    def cancel(self, event: ScheduledEvent) -> None:
+        # cancelled events stay in the heap and are skipped when they are due
+        event.cancelled = True
+
+    def run(self) -> None:
+        while True:
+            due_events: list[ScheduledEvent] = []
+            with self.condition:
+                while self.running and not due_events:
+                    now = monotonic()
+                    while self.events and self.events[0].when <= now:
+                        due_events.append(heapq.heappop(self.events))
+                    if due_events:
+                        break
+                    timeout = self.events[0].when - now if self.events else None
+                    self.condition.wait(timeout)
+
+                if not self.running:
+                    return
+
+            for event in due_events:
+                if event.cancelled:
+                    continue
+                try:
+                    event.func(*event.args)
+                except Exception:
+                    log.exception(f"exception in scheduled callback {event.func}")
+
+
+class FrameClock:
+    """Calls all registered callbacks on a fixed tick of a Scheduler. The ticks are aligned to multiples of the
+    interval on the monotonic clock, so the timing doesn't depend on when the clock was started.
+    If the callbacks take longer than the interval, the missed ticks are skipped.
+    """
+
+    def __init__(self, scheduler: Scheduler, interval: float) -> None:
+        """
+        Args:
+            scheduler (Scheduler): scheduler the callbacks run on
+            interval (float): time between ticks in s
+        """
+        self.scheduler = scheduler
+        self.interval = interval
+        self.callbacks: list[Callable[[], Any]] = []
+        self.event: ScheduledEvent | None = None
+        self.lock = Lock()
+
+    def add(self, callback: Callable[[], Any]) -> None:
+        """call callback on every tick, the clock starts ticking with the first callback"""
+        with self.lock:
+            # the list is replaced instead of changed, so a running tick is not affected
+            self.callbacks = self.callbacks + [callback]
+            if self.event is None:
+                self.schedule_next_tick()
+
+    def remove(self, callback: Callable[[], Any]) -> None:
+        """stop calling callback, the clock stops ticking without callbacks"""
+        with self.lock:
+            self.callbacks = [c for c in self.callbacks if c != callback]
+            if not self.callbacks and self.event is not None:
+                self.scheduler.cancel(self.event)
+                self.event = None
+
+    def schedule_next_tick(self) -> None:
+        next_tick = (floor(monotonic() / self.interval) + 1) * self.interval
+        self.event = self.scheduler.call_at(next_tick, self.tick, next_tick)
+
+    def tick(self, when: float) -> None:
+        for callback in self.callbacks:
+            try:
+                callback()
+            except Exception:
+                log.exception(f"exception in frame clock callback {callback}")
+
+        with self.lock:
+            # if the clock was stopped and started again during this tick, the next tick is already scheduled
+            if self.callbacks and self.event is not None and self.event.when == when:
+                self.schedule_next_tick()
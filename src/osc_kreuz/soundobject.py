@@ -120,6 +120,25 @@ class SoundObject(object):
             position_has_changed = True
         return position_has_changed
 
+    def restorePosition(self, coordinate_format_str: str, *values: float) -> None:
+        """Sets a position that was read with getPosition, e.g. from a state file. Unlike setPosition
+        the values are not scaled by the coordinate scaling factor and the ui blocking is not changed
+
+        Args:
+            coordinate_format_str (str): string describing the coordinate format
+            *values (float): coordinates in the given format
+        """
+        coordinate_format, coordinate_keys = parse_coordinate_format(
+            coordinate_format_str
+        )
+        self.position[coordinate_format].set_coordinates(coordinate_keys, values)
+        for c_fmt in self.position:
+            if c_fmt == coordinate_format:
+                continue
+            self.position[c_fmt].set_all(
+                *(self.position[coordinate_format].convert_to(c_fmt))
+            )
+
     def getPosition(self, coordinate_format_str: str) -> list[float]:
         coordinate_format, coordinate_keys = parse_coordinate_format(
             coordinate_format_str
@@ -66,6 +66,29 @@ class SourceAttributes(Enum):
     angle = "angle"
 
 
+class ParameterType(Enum):
+    """Classes of source parameters a view client can subscribe to"""
+
+    position = "position"
+    gain = "gain"
+    directsend = "directsend"
+    attribute = "attribute"
+
+
+parameter_type_aliases = {
+    "position": ParameterType.position,
+    "positions": ParameterType.position,
+    "pos": ParameterType.position,
+    "gain": ParameterType.gain,
+    "gains": ParameterType.gain,
+    "directsend": ParameterType.directsend,
+    "directsends": ParameterType.directsend,
+    "direct": ParameterType.directsend,
+    "attribute": ParameterType.attribute,
+    "attributes": ParameterType.attribute,
+}
+
+
 # global config keywords
 globalconfig = "global"
 inputport_data = "port_data"
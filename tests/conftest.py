@@ -0,0 +1,39 @@
+import pytest
+
+from osc_kreuz.benchmark import preserved_class_variables
+from osc_kreuz.receiver.base_receiver import BaseReceiver
+from osc_kreuz.soundobject import SoundObject
+
+
+@pytest.fixture(autouse=True)
+def restore_class_variables():
+    """sources and receivers are configured with class variables, they are restored after every test
+    so the result of a test doesn't depend on the tests that ran before it"""
+    # some tests replace update_source to keep the updates in the queue
+    update_source = BaseReceiver.update_source
+    with preserved_class_variables():
+        yield
+    BaseReceiver.update_source = update_source
+
+
+@pytest.fixture
+def global_conf() -> dict:
+    """configure sources and receivers with two sources and three render units, without a scheduler.
+    Tests can add options to the returned config, it is used by sources and receivers
+
+    Returns:
+        dict: the global config
+    """
+    conf = {
+        "number_direct_sends": 2,
+        "data_port_timeout": 0,
+        "render_units": ["ambi", "wfs", "reverb"],
+        "send_changes_only": True,
+        "max_gain": 2,
+    }
+    SoundObject.readGlobalConfig(conf)
+    BaseReceiver.globalConfig = conf
+    BaseReceiver.n_sources = 2
+    BaseReceiver.sources = [SoundObject(), SoundObject()]
+    BaseReceiver.scheduler = None
+    return conf
@@ -0,0 +1,31 @@
+from osc_kreuz.benchmark import run_benchmark
+from osc_kreuz.receiver.base_receiver import BaseReceiver
+from osc_kreuz.resolver import Resolver
+from osc_kreuz.soundobject import SoundObject
+
+
+def test_benchmark():
+    result = run_benchmark(
+        n_sources=4, n_receivers=2, rate=200, duration=0.5, drain_time=0.2
+    )
+    assert result.messages_sent == 100
+    # every position is sent by both receivers
+    assert result.positions_matched > 100
+    assert result.messages_received >= result.positions_matched
+    assert 0 < result.latency_ms_p50 <= result.latency_ms_p99 <= result.latency_ms_max
+    assert result.cpu_us_per_message > 0
+
+
+def test_benchmark_restores_configuration(global_conf):
+    resolver = Resolver()
+    BaseReceiver.resolver = resolver
+    sources = BaseReceiver.sources
+
+    run_benchmark(n_sources=2, n_receivers=1, rate=100, duration=0.1, drain_time=0.1)
+
+    # the benchmark's osc-kreuz doesn't leave its configuration or its stopped scheduler behind
+    assert SoundObject.globalConfig is global_conf
+    assert BaseReceiver.globalConfig is global_conf
+    assert BaseReceiver.sources is sources
+    assert BaseReceiver.scheduler is None
+    assert BaseReceiver.resolver is resolver and resolver.running
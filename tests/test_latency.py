@@ -0,0 +1,82 @@
+import socket
+from time import monotonic, sleep
+
+from pythonosc.dispatcher import Dispatcher
+
+from osc_kreuz.latency import (
+    LatencyHistogram,
+    clear_receive_time,
+    get_receive_time,
+    set_receive_time,
+)
+from osc_kreuz.osccomcenter import OSCUDPServer
+from osc_kreuz.receiver import createReceiverClient
+from osc_kreuz.receiver.base_receiver import BaseReceiver
+from osc_kreuz.receiver.updates import OSCMessage
+from osc_kreuz.recorder import PortType
+
+
+def test_histogram():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) == 0
+
+    for _ in range(90):
+        histogram.record(0.001)
+    for _ in range(10):
+        histogram.record(0.5)
+
+    assert histogram.count == 100
+    assert histogram.max == 0.5
+    assert 0.001 <= histogram.percentile(50) < 0.002
+    assert histogram.percentile(99) == 0.5
+
+
+def test_receiver_latency(global_conf):
+    receiver = createReceiverClient({"type": "spatial", "updateintervall": 50})
+
+    # the first update is sent right away, the second one is held back for the update interval
+    for x in (1.0, 2.0):
+        set_receive_time(monotonic())
+        BaseReceiver.sources[0].setPosition("xyz", x, 0, 0)
+        receiver.sourcePositionChanged(0)
+        clear_receive_time()
+    sleep(0.2)
+
+    latency = receiver.latency
+    assert latency.total.count == 2
+    assert latency.hold.max >= 0.03
+    assert latency.processing.max < latency.hold.max
+    assert latency.total.max >= latency.hold.max
+
+    latency.reset()
+    assert latency.total.count == 0
+
+    # changes that were not caused by a received message, like from a timer, are not traced
+    BaseReceiver.sources[0].setPosition("xyz", 3.0, 0, 0)
+    receiver.sourcePositionChanged(0)
+    sleep(0.1)
+    assert latency.total.count == 0
+
+
+def test_receive_time_is_cleared():
+    receive_times = []
+    dispatcher = Dispatcher()
+    dispatcher.map(
+        "/source/xyz", lambda *args: receive_times.append(get_receive_time())
+    )
+    server = OSCUDPServer(("127.0.0.1", 0), dispatcher, PortType.data)
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sender.sendto(
+            OSCMessage("/source/xyz", [0, 1.0, 2.0, 3.0]).build().dgram,
+            server.server_address,
+        )
+        server.timeout = 1
+        server.handle_request()
+    finally:
+        server.server_close()
+        sender.close()
+
+    # the stamp is only set while the datagram is handled
+    assert len(receive_times) == 1 and receive_times[0] is not None
+    assert get_receive_time() is None
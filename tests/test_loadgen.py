@@ -0,0 +1,74 @@
+import socket
+
+import numpy as np
+from pythonosc.osc_bundle import OscBundle
+from pythonosc.osc_message import OscMessage
+
+from osc_kreuz.loadgen import LoadConfig, LoadGenerator, run_load
+from osc_kreuz.soundobject import SoundObject
+
+
+def test_load_generator(global_conf):
+    global_conf["send_changes_only"] = False
+    for coordinate_format in ["xyz", "aed", "aedrad", "xy", "azim"]:
+        generator = LoadGenerator(
+            LoadConfig(
+                n_sources=8,
+                coordinate_format=coordinate_format,
+                gain_ratio=0,
+                attribute_ratio=0,
+            )
+        )
+        msgs = [OscMessage(dgram) for dgram in generator.generate(1.0, 16)]
+        assert len(msgs) == 16
+        # base and extended paths are mixed
+        assert {msg.address for msg in msgs} >= {
+            f"/source/{coordinate_format}",
+            f"/source/1/{coordinate_format}",
+        }
+
+        positions = generator.get_positions(1.0)
+        for msg in msgs:
+            if msg.address == f"/source/{coordinate_format}":
+                source_index, *values = msg.params
+                source_index -= 1
+            else:
+                source_index = int(msg.address.split("/")[2]) - 1
+                values = msg.params
+            assert np.allclose(values, positions[:, source_index], atol=1e-5)
+
+            # sources move on a circle with a radius of 5
+            if coordinate_format == "aed":
+                so = SoundObject()
+                so.setPosition("aed", *values)
+                assert np.isclose(np.linalg.norm(so.getPosition("xy")), 5.0)
+
+    # gains and attributes, sent in bundles
+    generator = LoadGenerator(
+        LoadConfig(n_sources=8, gain_ratio=0.5, attribute_ratio=0.5, bundle_size=10)
+    )
+    bundles = [OscBundle(dgram) for dgram in generator.generate(0.0, 100)]
+    assert [bundle.num_contents for bundle in bundles] == [10] * 10
+    addresses = {msg.address for bundle in bundles for msg in bundle}
+    assert "/source/send/wfs" in addresses
+    assert "/source/doppler" in addresses
+    assert all(
+        0 <= msg.params[-1] <= 1
+        for bundle in bundles
+        for msg in bundle
+        if "send" in msg.address
+    )
+
+
+def test_run_load():
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(("127.0.0.1", 0))
+    server.settimeout(2)
+
+    config = LoadConfig(n_sources=4, rate=1000)
+    n_sent, time_sent = run_load(config, *server.getsockname(), duration=0.1)
+    assert n_sent == 100
+    assert 0.09 < time_sent < 0.5
+    for _ in range(n_sent):
+        OscMessage(server.recv(1024))
+    server.close()
@@ -0,0 +1,178 @@
+"""Microbenchmarks of the building blocks every incoming message passes through.
+
+The cost per call of each benchmark is compared to the baseline stored in assets/microbenchmark_baseline.json,
+a benchmark fails if it got slower than the baseline by more than the threshold.
+Costs are stored relative to a fixed pure python workload, so the baseline can be used on different machines.
+
+Wall clock measurements are unreliable on shared or loaded machines, so the benchmarks only run
+if OSC_KREUZ_BENCH=1 is set. Set OSC_KREUZ_UPDATE_BASELINE=1 to write the measured costs as new baseline
+and OSC_KREUZ_BENCH_THRESHOLD to change the threshold (default 2, twice as slow as the baseline).
+"""
+
+from itertools import cycle
+import json
+import os
+from pathlib import Path
+import timeit
+from typing import Callable
+
+import pytest
+
+from osc_kreuz.coordinates import (
+    CoordinateCartesian,
+    CoordinatePolar,
+    CoordinatePolarRadians,
+    CoordinateSystemType,
+    get_all_coordinate_formats,
+    parse_coordinate_format,
+)
+from osc_kreuz.receiver import createReceiverClient
+from osc_kreuz.receiver.base_receiver import BaseReceiver
+from osc_kreuz.receiver.updates import (
+    GainUpdate,
+    OSCMessage,
+    PositionUpdate,
+    iter_bundles,
+)
+from osc_kreuz.soundobject import SoundObject
+
+baseline_path = Path(__file__).parent / "assets" / "microbenchmark_baseline.json"
+threshold = float(os.environ.get("OSC_KREUZ_BENCH_THRESHOLD", 2.0))
+update_baseline = os.environ.get("OSC_KREUZ_UPDATE_BASELINE") == "1"
+run_benchmarks = update_baseline or os.environ.get("OSC_KREUZ_BENCH") == "1"
+
+pytestmark = [
+    pytest.mark.skipif(
+        not run_benchmarks, reason="microbenchmarks only run with OSC_KREUZ_BENCH=1"
+    ),
+    pytest.mark.usefixtures("global_conf"),
+]
+
+
+def reference_workload():
+    total = 0
+    for i in range(1000):
+        total += i * i % 7
+    return total
+
+
+def time_per_call(func: Callable[[], object], repeat: int = 5) -> float:
+    """best time per call in ns, each of the repeats runs for about 10ms"""
+    number = max(1, int(0.01 / (timeit.timeit(func, number=10) / 10)))
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e9
+
+
+def load_baseline() -> dict[str, float]:
+    if not baseline_path.exists():
+        return {}
+    return json.loads(baseline_path.read_text())["benchmarks"]
+
+
+def relative_cost(func: Callable[[], object]) -> float:
+    """cost of func relative to the reference workload, measured right after each other so both see the same load"""
+    return time_per_call(func) / time_per_call(reference_workload)
+
+
+@pytest.fixture(scope="module")
+def benchmark():
+    """measures a function and compares its cost to the baseline"""
+    baseline = load_baseline()
+    measured: dict[str, float] = {}
+
+    def run(name: str, func: Callable[[], object]) -> None:
+        cost = relative_cost(func)
+        if not update_baseline and name not in baseline:
+            pytest.skip(f"no baseline for {name}")
+
+        # other threads can slow down a single measurement, measure again before failing
+        for _ in range(2):
+            if update_baseline or cost <= baseline[name] * threshold:
+                break
+            cost = min(cost, relative_cost(func))
+        measured[name] = cost
+        if update_baseline:
+            return
+        assert (
+            cost <= baseline[name] * threshold
+        ), f"{name} takes {cost / baseline[name]:.1f} times as long as the baseline"
+
+    yield run
+
+    if update_baseline:
+        baseline.update({name: float(f"{cost:.4g}") for name, cost in measured.items()})
+        baseline_path.write_text(
+            json.dumps({"benchmarks": dict(sorted(baseline.items()))}, indent=2) + "\n"
+        )
+
+
+@pytest.mark.parametrize("coordinate_format", get_all_coordinate_formats())
+def test_set_position(benchmark, coordinate_format):
+    so = SoundObject()
+    n_values = len(parse_coordinate_format(coordinate_format)[1])
+    # alternate between two positions, so the position actually changes with every call
+    positions = cycle([(1.0, 0.5, 0.25)[:n_values], (0.5, 0.25, 1.0)[:n_values]])
+    benchmark(
+        f"setPosition[{coordinate_format}]",
+        lambda: so.setPosition(coordinate_format, *next(positions)),
+    )
+
+
+@pytest.mark.parametrize(
+    "coordinate",
+    [
+        CoordinateCartesian(1.0, 0.5, 0.25),
+        CoordinatePolar(45.0, 10.0, 2.0),
+        CoordinatePolarRadians(0.5, 0.1, 2.0),
+    ],
+    ids=lambda c: c.__class__.__name__,
+)
+@pytest.mark.parametrize("target", list(CoordinateSystemType), ids=lambda t: t.name)
+def test_convert_to(benchmark, coordinate, target):
+    benchmark(
+        f"{coordinate.__class__.__name__}.convert_to[{target.name}]",
+        lambda: coordinate.convert_to(target),
+    )
+
+
+@pytest.mark.parametrize(
+    "coordinate_format", ["xyz", "xy", "aed", "aedrad", "azim", "distance"]
+)
+def test_parse_coordinate_format(benchmark, coordinate_format):
+    benchmark(
+        f"parse_coordinate_format[{coordinate_format}]",
+        lambda: parse_coordinate_format(coordinate_format),
+    )
+
+
+def test_updates(benchmark):
+    so = BaseReceiver.sources[0]
+    position = PositionUpdate("/source/xyz", so, "xyz", source_index=0)
+    gain = GainUpdate("/source/send", so, 1, source_index=0, include_render_idx=True)
+
+    benchmark("PositionUpdate.to_message", position.to_message)
+    benchmark("PositionUpdate.__hash__", position.__hash__)
+    benchmark("GainUpdate.to_message", gain.to_message)
+    benchmark("GainUpdate.__hash__", gain.__hash__)
+
+
+def test_add_update(benchmark):
+    receiver = createReceiverClient({"type": "spatial"})
+    update = PositionUpdate("/source/xyz", BaseReceiver.sources[0], "xyz", 0)
+
+    # while an update of the source is pending, add_update only queues the update,
+    # which is what happens to most updates under load
+    receiver.update_semaphore[0].acquire()
+    try:
+        benchmark("BaseReceiver.add_update", lambda: receiver.add_update(0, update))
+    finally:
+        receiver.update_semaphore[0].release()
+
+
+def test_osc_encoding(benchmark):
+    benchmark(
+        "OSCMessage.build",
+        lambda: OSCMessage("/source/xyz", [0, 1.0, 0.5, 0.25]).build(),
+    )
+
+    msgs = [OSCMessage("/source/xyz", [i, 1.0, 0.5, 0.25]).build() for i in range(64)]
+    benchmark("iter_bundles[64]", lambda: list(iter_bundles(msgs)))
@@ -0,0 +1,35 @@
+from threading import Event, Thread
+
+from osc_kreuz.profiler import SamplingProfiler
+
+
+def busy_loop(stop: Event):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+def test_sampling_profiler(tmp_path):
+    stop = Event()
+    busy_thread = Thread(target=busy_loop, args=(stop,), name="busy")
+    busy_thread.start()
+
+    profiler = SamplingProfiler(duration=0.2, interval=0.005, directory=tmp_path)
+    try:
+        profiler.start()
+        assert profiler.finished.wait(2)
+    finally:
+        stop.set()
+        busy_thread.join()
+
+    assert profiler.path is not None and profiler.path.parent == tmp_path
+    lines = profiler.path.read_text().splitlines()
+    stacks = {}
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        stacks[stack] = int(count)
+
+    # stacks start with the name of the thread, the profiler doesn't sample itself
+    busy_stacks = [stack for stack in stacks if stack.startswith("busy;")]
+    assert any("busy_loop (test_profiler.py:" in stack for stack in busy_stacks)
+    assert not any(stack.startswith("profiler;") for stack in stacks)
+    assert sum(stacks[stack] for stack in busy_stacks) == profiler.n_samples > 10
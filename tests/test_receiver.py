@@ -1,19 +1,85 @@
+from importlib.metadata import EntryPoint
+import os
+import socket
+import subprocess
+import sys
+from threading import Event
+from time import monotonic, sleep, time
+import uuid
+
+import pytest
+import yaml
+from pythonosc.osc_bundle import OscBundle
+from pythonosc.osc_message import OscMessage
+
 from osc_kreuz.receiver.audiomatrix import AudioMatrix
 from osc_kreuz.receiver.audiorouter import Audiorouter, AudiorouterWFS
 from osc_kreuz.receiver.updates import (
     AttributeUpdate,
     DirectSendUpdate,
     GainUpdate,
+    OSCMessage,
     PositionUpdate,
     Update,
+    iter_bundles,
+)
+from osc_kreuz.receiver.viewclient import (
+    LivenessManager,
+    ViewClient,
+    ViewClientGroup,
+    parse_parameter_filter,
+    parse_source_filter,
 )
-from osc_kreuz.receiver.wonder import wonderPlanewaveAttributeUpdate, Wonder
-from osc_kreuz.receiver.base_receiver import BaseReceiver
-from osc_kreuz.receiver import createReceiverClient
+from osc_kreuz.receiver.shared_memory import SharedMemoryStateReader
+from osc_kreuz.receiver.spatial_receiver import SpatialReceiver
+from osc_kreuz.receiver.state_dump import PacedSender
+from osc_kreuz.receiver.wonder import TWonder, wonderPlanewaveAttributeUpdate, Wonder
+from osc_kreuz.receiver.base_receiver import BaseReceiver, ReceiverException
+from osc_kreuz.resolver import Resolver
+from osc_kreuz.latency import clear_receive_time, set_receive_time
+import osc_kreuz.receiver
+from osc_kreuz.receiver import createReceiverClient, get_receiver_class
+import osc_kreuz.osccomcenter as osccomcenter
+from osc_kreuz.scheduler import Scheduler
 from osc_kreuz.soundobject import SoundObject
 import osc_kreuz.str_keys_conventions as skc
 
 
+def test_receiver_loading(monkeypatch):
+    # receiver modules are only imported when they are used
+    code = (
+        "import sys, osc_kreuz.osccomcenter, osc_kreuz.osc_kreuz, osc_kreuz.receiver as r; "
+        "lazy = ['audiomatrix', 'viewclient', 'wonder', 'transport', 'debug_tap', 'source_state']; "
+        "assert not [m for m in lazy if f'osc_kreuz.receiver.{m}' in sys.modules]; "
+        "assert 'osc_kreuz.resolver' not in sys.modules; "
+        "r.get_receiver_class('audiomatrix'); "
+        "assert 'osc_kreuz.receiver.audiomatrix' in sys.modules"
+    )
+    subprocess.run(
+        [sys.executable, "-c", code],
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        check=True,
+    )
+
+    assert get_receiver_class("AudioMatrix") is AudioMatrix
+    with pytest.raises(ReceiverException):
+        get_receiver_class("doesnotexist")
+
+    # receivers installed as plugins are found using their entry point
+    plugin = EntryPoint(
+        name="myreceiver",
+        value="osc_kreuz.receiver.spatial_receiver:SpatialReceiver",
+        group=osc_kreuz.receiver.receiver_entry_point_group,
+    )
+    monkeypatch.setattr(
+        osc_kreuz.receiver,
+        "entry_points",
+        lambda group: [plugin] if group == plugin.group else [],
+    )
+    monkeypatch.setattr(osc_kreuz.receiver, "receiver_classes", {})
+    assert get_receiver_class("MyReceiver") is SpatialReceiver
+
+
 def test_update_classes():
     updates = set()
     u1 = Update("/", None)
@@ -83,6 +149,7 @@ def prepare_renderer(conf: dict, disable_network: bool = True):
     BaseReceiver.n_sources = 1
     BaseReceiver.sources = [SoundObject(), SoundObject()]
     BaseReceiver.globalConfig = global_conf
+    BaseReceiver.scheduler = None
     if disable_network:
         BaseReceiver.update_source = function_override
     client = createReceiverClient(conf)
@@ -158,6 +225,72 @@ def test_wonder_renderer():
         check_source_update(c, "attr", 0, path, expected, attr)
 
 
+def test_twonder_initialization(global_conf):
+    global_conf["room_name"] = "test_room"
+    global_conf["room_polygon"] = [[0, 0, 0], [1, 0, 0], [0, 1, 0]]
+    BaseReceiver.n_sources = 64
+    twonder = TWonder(hosts=[], multicast=True)
+
+    sent = []
+    twonder.send_packet = lambda packet, receiver, description="": sent.append(packet)
+    for port in [50001, 50002]:
+        twonder.add_twonder("127.0.0.1", port)
+
+    # every twonder gets the same precomputed bundles
+    assert len(sent) == 2 * len(twonder.initialization_packets)
+    assert sent[: len(sent) // 2] == twonder.initialization_packets
+    assert len(twonder.initialization_packets) < 5
+
+    msgs = [
+        msg
+        for packet in twonder.initialization_packets
+        for msg in OscBundle(packet.dgram)
+    ]
+    assert len(msgs) == 2 + 64
+    # the room polygon has to be the first message
+    assert msgs[0].address == "/WONDER/global/renderpolygon"
+    assert msgs[0].params[:2] == ["test_room", 3]
+    assert msgs[1].address == "/WONDER/global/maxNoSources"
+    assert [msg.params[0] for msg in msgs[2:]] == list(range(64))
+
+
+def test_twonder_initialization_after_resolving(monkeypatch, global_conf):
+    global_conf["room_name"] = "test_room"
+    global_conf["room_polygon"] = [[0, 0, 0], [1, 0, 0], [0, 1, 0]]
+    monkeypatch.setattr(
+        "osc_kreuz.receiver.wonder.add_receiver_to_state_file", lambda *args: None
+    )
+
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(("127.0.0.1", 0))
+    sink.settimeout(1)
+
+    # the hostname of the twonder is only resolved after it connected
+    dns_answer = Event()
+
+    def lookup(hostname):
+        dns_answer.wait(2)
+        return "127.0.0.1"
+
+    resolver = Resolver()
+    resolver.lookup = lookup
+    BaseReceiver.resolver = resolver
+    twonder = TWonder(hosts=[])
+    try:
+        twonder.add_twonder("twonder.invalid", sink.getsockname()[1])
+        dns_answer.set()
+
+        # the initialization that was dropped before is sent once the twonder is known, followed by the state
+        n_init = len(twonder.initialization_packets)
+        dgrams = [sink.recv(65536) for _ in range(n_init + 1)]
+        assert dgrams[:n_init] == [p.dgram for p in twonder.initialization_packets]
+        assert OscBundle(dgrams[-1]).content(0).address == "/WONDER/source/position"
+    finally:
+        twonder.close()
+        resolver.stop()
+        sink.close()
+
+
 def test_audiomatrix_renderer():
     conf = {
         "type": "audiomatrix",
@@ -194,6 +327,75 @@ def test_audiomatrix_renderer():
         check_source_update(c, "gain", 0, path, expected, r_idx)
 
 
+def test_audiomatrix_gain_vectors():
+    conf = {
+        "type": "audiomatrix",
+        "hosts": [],
+        "updateintervall": 20,
+        "paths": [
+            {"path": "/source/gains", "type": "gain_row"},
+            {"path": "/renderer/wfs/gains", "type": "gain_column", "renderer": "wfs"},
+            {"path": "/renderer/gains", "type": "gain_column"},
+        ],
+    }
+    c = prepare_renderer(conf)
+    assert isinstance(c, AudioMatrix)
+    so = c.sources[0]
+
+    sent: list[OSCMessage] = []
+    c.send_updates = lambda msgs, *args: sent.extend(msgs)
+
+    so._torendererSends[:] = [0.25, 0.5, 0.75]
+    for r_idx in range(3):
+        c.sourceRenderGainChanged(0, r_idx)
+
+    # a single row update for all changes of the source
+    assert len(c.update_queue[0]) == 1
+    assert c.update_queue[0].pop().to_message().values == [0, 0.25, 0.5, 0.75]
+
+    # the first change of every column is sent right away, the others are queued until the next tick
+    assert [(m.path, m.values) for m in sent] == [("/renderer/gains", [0, 0.25])]
+    sleep(0.05)
+    assert sorted((m.path, m.values) for m in sent[1:]) == [
+        ("/renderer/gains", [1, 0.5]),
+        ("/renderer/gains", [2, 0.75]),
+        ("/renderer/wfs/gains", [0.5]),
+    ]
+
+    # repeated changes of the same column are merged into a single vector per tick
+    sent.clear()
+    so._torendererSends[1] = 1.0
+    for _ in range(3):
+        c.sourceRenderGainChanged(0, 1)
+    assert len(sent) == 1
+    sleep(0.05)
+    assert sorted((m.path, m.values) for m in sent[1:]) == [
+        ("/renderer/gains", [1, 1.0]),
+        ("/renderer/wfs/gains", [1.0]),
+    ]
+
+
+def test_state_updates_are_read_only():
+    conf = {
+        "type": "audiomatrix",
+        "hosts": [],
+        "paths": [{"path": "/source/gains", "type": "gain_row"}],
+    }
+    c = prepare_renderer(conf)
+    c.sources[0]._torendererSends[:] = [0.25, 0.5, 0.75]
+
+    # the dump sends the known state without applying changes that weren't notified or queueing anything
+    updates = c.get_state_updates()
+    assert [u.to_message().values for u in updates] == [
+        [i, 0.0, 0.0, 0.0] for i in range(c.n_sources)
+    ]
+    assert c.gain_matrix[0].tolist() == [0.0, 0.0, 0.0]
+    assert all(len(queue) == 0 for queue in c.update_queue.values())
+
+    c.sourceRenderGainChanged(0, 1)
+    assert c.gain_matrix[0].tolist() == [0.0, 0.5, 0.0]
+
+
 def test_audiorouter_renderer():
     conf = {"type": "audiorouter", "hosts": [], "updateintervall": 5}
     c = prepare_renderer(conf)
@@ -238,3 +440,517 @@ def test_audiorouterWFS_renderer():
         (2, [], []),
     ]:
         check_source_update(c, "gain", 0, path, expected, r_idx)
+
+
+def test_audiorouter_routing():
+    conf = {
+        "type": "audiorouter",
+        "hosts": [],
+        "routing": [
+            {"renderer": "wfs", "path": "/source/send/wfs", "include_index": False},
+            {"renderer": "reverb", "path": "/source/send/spatial"},
+        ],
+    }
+    c = prepare_renderer(conf)
+    assert c.gain_routes == [
+        None,
+        ("/source/send/wfs", False),
+        ("/source/send/spatial", True),
+    ]
+
+    for r_idx, path, expected in [
+        (0, [], []),
+        (1, "/source/send/wfs", [0, 0]),
+        (2, "/source/send/spatial", [0, 2, 0]),
+    ]:
+        check_source_update(c, "gain", 0, path, expected, r_idx)
+
+    for invalid_rule in [{"renderer": "binaural", "path": "/a"}, {"renderer": 3}]:
+        with pytest.raises(ReceiverException):
+            prepare_renderer(
+                {"type": "audiorouter", "hosts": [], "routing": [invalid_rule]}
+            )
+
+
+def prepare_viewclient_group(**kwargs) -> ViewClientGroup:
+    global_conf = {
+        "number_direct_sends": 2,
+        "data_port_timeout": 0,
+        "render_units": ["ambi", "wfs", "reverb"],
+        "n_renderengines": 3,
+        "port_settings": 4999,
+    }
+    SoundObject.readGlobalConfig(global_conf)
+    BaseReceiver.n_sources = 2
+    BaseReceiver.sources = [SoundObject(), SoundObject()]
+    BaseReceiver.globalConfig = global_conf
+    BaseReceiver.scheduler = None
+    group = ViewClientGroup(**kwargs)
+
+    # keep updates in the queue instead of sending them
+    group.update_source = lambda source_idx: None
+    return group
+
+
+def test_viewclient_group_shares_encoded_updates():
+    group = prepare_viewclient_group(
+        dataformat="xyz", indexAsValue=0, updateintervall=0
+    )
+
+    sent: dict[str, list] = {}
+    clients = [
+        ViewClient(name, "127.0.0.1", port)
+        for name, port in [("a", 50001), ("b", 50002)]
+    ]
+    for client in clients:
+        sent[client.alias] = []
+        client.osc_client.send = sent[client.alias].append
+        group.add_member(client)
+
+    # each member receives the initial state only once, packed into a single bundle
+    assert len(sent["a"]) == len(sent["b"]) == 1
+    # position, 3 gains, 2 direct sends and 3 attributes per source
+    assert OscBundle(sent["a"][0].dgram).num_contents == 2 * (1 + 3 + 2 + 3)
+
+    for client in clients:
+        sent[client.alias].clear()
+
+    group.send_updates([group.position_update(1).to_message()])
+    assert len(sent["a"]) == len(sent["b"]) == 1
+
+    # the message is encoded once and the same datagram is sent to all members
+    assert sent["a"][0] is sent["b"][0]
+
+    group.remove_member(clients[0])
+    assert not group.is_empty()
+    group.remove_member(clients[1])
+    assert group.is_empty()
+    assert len(group.receivers) == 0
+
+    # clients moving between groups already have the state, so nothing is sent when they join
+    sent["a"].clear()
+    group.add_member(clients[0], dump=False)
+    assert len(sent["a"]) == 0
+    assert len(group.receivers) == 1
+
+
+def test_lazy_source_bookkeeping():
+    group = prepare_viewclient_group(dataformat="aed", indexAsValue=1)
+    assert len(group.update_queue) == 0
+    assert len(group.update_semaphore) == 0
+    assert len(group.oscpath_position_with_index) == 0
+
+    group.sourcePositionChanged(1)
+    group.sourceRenderGainChanged(1, 2)
+    # only the changed source got a queue
+    assert list(group.update_queue.keys()) == [1]
+    paths = {update.path for update in group.update_queue[1]}
+    assert paths == {"/source/2/aed", "/source/2/reverb"}
+
+
+def test_frame_clock_receiver(global_conf):
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(("127.0.0.1", 0))
+    sink.settimeout(1)
+    scheduler = Scheduler()
+    scheduler.start()
+    BaseReceiver.scheduler = scheduler
+    receiver = SpatialReceiver(
+        hostname="127.0.0.1",
+        port=sink.getsockname()[1],
+        updateintervall=20,
+        frameclock=True,
+    )
+    try:
+        # the changes are traced like changes received by the osc servers
+        set_receive_time(monotonic())
+        for x in (1.0, 2.0, 3.0):
+            BaseReceiver.sources[0].setPosition("xyz", x, 0, 0)
+            receiver.sourcePositionChanged(0)
+        BaseReceiver.sources[1].setPosition("xyz", 0, 1.0, 0)
+        receiver.sourcePositionChanged(1)
+        clear_receive_time()
+
+        # all changes are sent together in a single bundle on the next tick, only the latest state of each source
+        bundle = OscBundle(sink.recv(4096))
+        assert [msg.params for msg in bundle] == [[0, 3.0, 0, 0], [1, 0, 1.0, 0]]
+        assert receiver.latency.total.count == 2
+    finally:
+        receiver.close()
+        scheduler.shutdown()
+        sink.close()
+
+
+def test_frame_clock_gain_columns(global_conf):
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(("127.0.0.1", 0))
+    sink.settimeout(1)
+    scheduler = Scheduler()
+    scheduler.start()
+    BaseReceiver.scheduler = scheduler
+    receiver = AudioMatrix(
+        hostname="127.0.0.1",
+        port=sink.getsockname()[1],
+        updateintervall=20,
+        frameclock=True,
+        paths=[
+            {"path": "/source/gains", "type": "gain_row"},
+            {"path": "/renderer/gains", "type": "gain_column"},
+        ],
+    )
+    try:
+        for gain in (0.25, 0.5):
+            BaseReceiver.sources[1]._torendererSends[1] = gain
+            receiver.sourceRenderGainChanged(1, 1)
+
+        # columns are sent in the same frame as the rows, not on their own
+        bundle = OscBundle(sink.recv(4096))
+        assert [(msg.address, msg.params) for msg in bundle] == [
+            ("/source/gains", [1, 0.0, 0.5, 0.0]),
+            ("/renderer/gains", [1, 0.0, 0.5]),
+        ]
+        assert len(receiver.column_queue) == 0
+    finally:
+        receiver.close()
+        scheduler.shutdown()
+        sink.close()
+
+
+def test_timetagged_bundles():
+    sinks = []
+    for _ in range(2):
+        sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sink.bind(("127.0.0.1", 0))
+        sink.settimeout(1)
+        sinks.append(sink)
+    receiver = SpatialReceiver(
+        hosts=[
+            {"hostname": "127.0.0.1", "port": sink.getsockname()[1]} for sink in sinks
+        ],
+        timetag=50,
+    )
+    try:
+        time_sent = time()
+        receiver.send_updates(
+            [OSCMessage("/source/xyz", [0, 1.0, 2.0, 0]), OSCMessage("/source/xyz", 1)]
+        )
+
+        # every host gets the same bundle, scheduled the configured latency into the future
+        dgrams = [sink.recv(4096) for sink in sinks]
+        assert dgrams[0] == dgrams[1]
+        bundle = OscBundle(dgrams[0])
+        assert [msg.params for msg in bundle] == [[0, 1.0, 2.0, 0], [1]]
+        assert 0.04 < bundle.timestamp - time_sent < 0.1
+    finally:
+        receiver.close()
+        for sink in sinks:
+            sink.close()
+
+
+def test_paced_state_dump():
+    group = prepare_viewclient_group(sources="1", parameters="position,gain")
+    msgs = [update.to_message().build() for update in group.get_state_updates()]
+    assert len(msgs) == 1 + 3
+
+    # bundles never get larger than the limit, but no message is left out
+    bundles = list(iter_bundles(msgs * 10, max_size=200))
+    assert all(bundle.size <= 200 for bundle in bundles)
+    assert sum(OscBundle(bundle.dgram).num_contents for bundle in bundles) == 40
+
+    sent = []
+    scheduler = Scheduler()
+    scheduler.start()
+    try:
+        total_size = sum(bundle.size for bundle in bundles)
+        PacedSender(bundles, sent.append, total_size * 5, scheduler).start()
+
+        # sending happens in the background, paced to the rate
+        assert len(sent) == 0
+        sleep(0.05)
+        assert 0 < len(sent) < len(bundles)
+        sleep(0.3)
+        assert sent == bundles
+    finally:
+        scheduler.shutdown()
+
+
+def test_viewclient_subscription_filters():
+    assert parse_source_filter(None) is None
+    assert parse_source_filter("all") is None
+    assert parse_source_filter(3) == {2}
+    assert parse_source_filter("1-3,7") == {0, 1, 2, 6}
+    assert parse_parameter_filter("") is None
+    assert parse_parameter_filter("gains, pos") == {
+        skc.ParameterType.gain,
+        skc.ParameterType.position,
+    }
+    for invalid_filter in ["0-3", "4-2", "a"]:
+        with pytest.raises(ValueError):
+            parse_source_filter(invalid_filter)
+    with pytest.raises(ValueError):
+        parse_parameter_filter("volume")
+
+    group = prepare_viewclient_group(sources="2", parameters="gain")
+    for source_idx in range(2):
+        group.sourcePositionChanged(source_idx)
+        group.sourceAttributeChanged(source_idx, skc.SourceAttributes.doppler)
+        group.sourceRenderGainChanged(source_idx, 0)
+
+    assert len(group.update_queue[0]) == 0
+    assert len(group.update_queue[1]) == 1
+    assert isinstance(group.update_queue[1].pop(), GainUpdate)
+
+
+def test_viewclient_adaptive_update_interval():
+    prepare_viewclient_group()
+    client = ViewClient("tablet", "127.0.0.1", 50003, {"updateintervall": 20})
+    assert client.get_group_config()["updateintervall"] == 20
+
+    # a slow link stretches the interval up to the configured maximum
+    client.rtt = 0.5
+    intervals = []
+    while client.adapt_update_interval():
+        intervals.append(client.update_interval)
+    assert intervals == [40, 80, 160, 200]
+
+    # missed pongs alone also count as a struggling link
+    client.rtt = 0.001
+    for _ in range(5):
+        client.update_link_quality(missed_pong=True)
+    assert client.link_is_struggling()
+    assert not client.adapt_update_interval()
+
+    # once the link is healthy again the requested interval is restored
+    for _ in range(20):
+        client.update_link_quality(missed_pong=False)
+    while client.adapt_update_interval():
+        pass
+    assert client.update_interval == 20
+    assert client.get_group_config()["updateintervall"] == 20
+
+
+def test_viewclient_rtt():
+    prepare_viewclient_group()
+    client = ViewClient("tablet", "127.0.0.1", 50003, {})
+    client.osc_client.send = lambda packet: None
+    ping = OSCMessage("/oscrouter/ping", 4999).build()
+
+    # a pong that arrives after the next ping was sent may answer either ping, so it isn't measured
+    client.send_ping(ping)
+    client.send_ping(ping)
+    sleep(0.01)
+    client.receivedIsAlive()
+    assert client.rtt is None
+    client.receivedIsAlive()
+    assert client.rtt is None
+
+    client.send_ping(ping)
+    client.receivedIsAlive()
+    assert client.rtt is not None and client.rtt < 0.01
+
+
+def test_liveness_manager():
+    prepare_viewclient_group()
+    scheduler = Scheduler("test liveness")
+    deleted = []
+    liveness = LivenessManager(
+        scheduler,
+        4999,
+        deleteClient=lambda client, alias: deleted.append(alias),
+        moveClient=lambda client: None,
+        ping_interval=0.01,
+        batch_window=0.005,
+    )
+
+    pings: dict[str, list] = {"alive": [], "dead": []}
+    clients = {}
+    for name, port in [("alive", 50004), ("dead", 50005)]:
+        clients[name] = ViewClient(name, "127.0.0.1", port)
+        clients[name].osc_client.send = pings[name].append
+        liveness.add_client(clients[name])
+
+    scheduler.start()
+    for _ in range(100):
+        clients["alive"].receivedIsAlive()
+        if deleted:
+            break
+        sleep(0.01)
+    scheduler.shutdown()
+
+    # the client that never answered is removed, all pings share one encoded message
+    assert deleted == ["dead"]
+    assert len(pings["dead"]) == ViewClient.max_missed_pings
+    assert len(pings["alive"]) > ViewClient.max_missed_pings
+    assert all(ping is liveness.ping for ping in pings["alive"] + pings["dead"])
+    assert clients["dead"] not in liveness.clients
+
+
+def test_debug_tap():
+    debug_client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    debug_client.bind(("127.0.0.1", 0))
+    debug_client.settimeout(2)
+    debug_port = debug_client.getsockname()[1]
+
+    group = prepare_viewclient_group()
+    client = ViewClient("a", "127.0.0.1", 50001)
+    client.osc_client.send = lambda packet: None
+    group.add_member(client)
+
+    try:
+        # only every second message starting with /source/xyz is mirrored
+        BaseReceiver.createDebugClient(
+            "127.0.0.1", debug_port, sample_every=2, filter="/source/xyz"
+        )
+        for i in range(4):
+            group.send_updates(
+                [
+                    OSCMessage("/source/xyz", [i, 1.0, 2.0, 3.0]),
+                    OSCMessage("/source/send", [i, 0, 1.0]),
+                ]
+            )
+        mirrored = [OscMessage(debug_client.recv(1024)) for _ in range(2)]
+        assert [msg.address for msg in mirrored] == [
+            "/dViewClientGroup/127.0.0.1:50001/source/xyz"
+        ] * 2
+        assert [msg.params for msg in mirrored] == [
+            [1, 1.0, 2.0, 3.0],
+            [3, 1.0, 2.0, 3.0],
+        ]
+
+        # wrapped in bundles the original packet is sent unchanged
+        BaseReceiver.createDebugClient("127.0.0.1", debug_port, wrap_in_bundles=True)
+        group.send_updates([OSCMessage("/source/xyz", [0, 1.0, 2.0, 3.0])])
+        target, msg = OscBundle(debug_client.recv(1024))
+        assert target.address == "/debug/target"
+        assert target.params == ["ViewClientGroup", "127.0.0.1", 50001]
+        assert msg.address == "/source/xyz"
+    finally:
+        BaseReceiver.stopDebugClient()
+        debug_client.close()
+
+
+def test_reload_receivers(tmp_path, global_conf):
+    global_conf["number_sources"] = 2
+    global_conf["room_name"] = "studio"
+
+    unchanged = {"type": "spatial", "hostname": "127.0.0.1", "port": 50010}
+    changed_hosts = {
+        "type": "spatial",
+        "dataformat": "aed",
+        "hostname": "127.0.0.1",
+        "port": 50011,
+    }
+    removed = {
+        "type": "spatial",
+        "dataformat": "xy",
+        "hostname": "127.0.0.1",
+        "port": 50012,
+    }
+    added = {
+        "type": "spatial",
+        "dataformat": "aedrad",
+        "hostname": "127.0.0.1",
+        "port": 50013,
+    }
+
+    receivers = [
+        createReceiverClient(dict(conf)) for conf in (unchanged, changed_hosts, removed)
+    ]
+    # receivers that are not part of the config are not touched
+    not_configured = createReceiverClient(
+        {"type": "spatial", "hostname": "127.0.0.1", "port": 50014}
+    )
+    not_configured.config = None
+
+    osc = osccomcenter.OSCComCenter(
+        soundobjects=BaseReceiver.sources,
+        receivers=[*receivers, not_configured],
+        renderengines=global_conf["render_units"],
+        n_sources=2,
+        n_direct_sends=2,
+        ip="127.0.0.1",
+        port_ui=0,
+        port_data=0,
+        port_settings=0,
+    )
+    try:
+        osc.apply_config(
+            {
+                "global": {
+                    **global_conf,
+                    "number_sources": 4,
+                    "room_name": "hall",
+                },
+                "receivers": [
+                    unchanged,
+                    {
+                        **changed_hosts,
+                        "hostname": None,
+                        "hosts": [{"hostname": "127.0.0.1", "port": 50015}],
+                    },
+                    added,
+                ],
+            }
+        )
+    finally:
+        for server in (osc.osc_ui_server, osc.osc_data_server, osc.osc_setting_server):
+            server.server_close()
+
+    assert osc.receivers[0] is not_configured
+    assert osc.receivers[1] is receivers[0]
+    assert osc.receivers[2] is receivers[1]
+    assert [client._port for _, client in receivers[1].receivers] == [50015]
+    assert osc.receivers[3].posFormat == "aedrad"
+    assert len(osc.receivers) == 4
+    assert receivers[2].receivers == []
+
+    # options that need a restart are not changed
+    assert global_conf["room_name"] == "hall"
+    assert global_conf["number_sources"] == 2
+
+    # reloading the config file happens on its own thread, the scheduler isn't needed
+    config_path = tmp_path / "config.yml"
+    config_path.write_text(
+        yaml.dump({"global": global_conf, "receivers": [unchanged]}), "utf-8"
+    )
+    osc.config_path = config_path
+    reload_thread = osc.request_reload()
+    reload_thread.join(5)
+    assert reload_thread.name == "config reload"
+    assert osc.receivers == [not_configured, receivers[0]]
+
+
+def test_reload_shared_memory_receiver(global_conf):
+    name = f"osc_kreuz_test_{uuid.uuid4().hex[:8]}"
+    old = createReceiverClient({"type": "sharedmemory", "name": name})
+    osc = osccomcenter.OSCComCenter(
+        soundobjects=BaseReceiver.sources,
+        receivers=[old],
+        renderengines=global_conf["render_units"],
+        n_sources=2,
+        n_direct_sends=2,
+        ip="127.0.0.1",
+        port_ui=0,
+        port_data=0,
+        port_settings=0,
+    )
+    try:
+        osc.reload_receivers(
+            [{"type": "sharedmemory", "name": name, "dataformat": "aed"}]
+        )
+        [new] = osc.receivers
+        assert new is not old
+
+        # the replacement owns the memory, closing its predecessor didn't remove it
+        reader = SharedMemoryStateReader(name)
+        assert reader.header["dataformat"] == b"aed"
+        reader.close()
+
+        # changes that still reach the closed receiver are ignored
+        old.sourcePositionChanged(0)
+        old.close()
+    finally:
+        for server in (osc.osc_ui_server, osc.osc_data_server, osc.osc_setting_server):
+            server.server_close()
+        for receiver in osc.receivers:
+            receiver.close()
@@ -0,0 +1,63 @@
+import socket
+from time import perf_counter, sleep
+
+from pythonosc.dispatcher import Dispatcher
+from pythonosc.osc_message import OscMessage
+
+from osc_kreuz.osccomcenter import OSCUDPServer
+from osc_kreuz.receiver.updates import OSCMessage
+from osc_kreuz.recorder import (
+    PortType,
+    TrafficRecorder,
+    read_recording,
+    replay_recording,
+)
+
+
+def test_record_and_replay(tmp_path):
+    path = tmp_path / "show.okrec"
+    recorder = TrafficRecorder(path, flush_interval=0.01)
+
+    # datagrams are recorded by the servers before they are handled
+    received = []
+    dispatcher = Dispatcher()
+    dispatcher.map("/source/xyz", lambda address, *args: received.append(args))
+    server = OSCUDPServer(("127.0.0.1", 0), dispatcher, PortType.data)
+    server.recorder = recorder
+
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    msgs = [OSCMessage("/source/xyz", [i, 1.0, 2.0, 3.0]).build() for i in range(3)]
+    for msg in msgs:
+        client.sendto(msg.dgram, server.server_address)
+        server.handle_request()
+        sleep(0.05)
+    recorder.record(PortType.settings, b"/osckreuz/subscribe\x00")
+    recorder.close()
+    server.server_close()
+
+    assert len(received) == 3
+    records = list(read_recording(path))
+    assert [(port_type, dgram) for _, port_type, dgram in records] == [
+        (PortType.data, msg.dgram) for msg in msgs
+    ] + [(PortType.settings, b"/osckreuz/subscribe\x00")]
+    timestamps = [timestamp for timestamp, _, _ in records]
+    assert timestamps == sorted(timestamps)
+    assert timestamps[2] - timestamps[0] >= 100_000_000
+
+    # replay to a fake osc-kreuz, skipping the settings port
+    client.close()
+    osc_kreuz = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    osc_kreuz.bind(("127.0.0.1", 0))
+    osc_kreuz.settimeout(2)
+    ports = {PortType.data: osc_kreuz.getsockname()[1]}
+
+    time_start = perf_counter()
+    assert replay_recording(path, "127.0.0.1", ports, speed=1) == 3
+    assert perf_counter() - time_start >= 0.1
+    assert [OscMessage(osc_kreuz.recv(1024)).params[0] for _ in range(3)] == [0, 1, 2]
+
+    # at double speed it takes about half as long
+    time_start = perf_counter()
+    assert replay_recording(path, "127.0.0.1", ports, speed=2) == 3
+    assert 0.05 <= perf_counter() - time_start < 0.1
+    osc_kreuz.close()
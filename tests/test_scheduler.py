@@ -0,0 +1,110 @@
+import threading
+from threading import Event
+from time import monotonic, sleep, time
+
+from osc_kreuz.osccomcenter import ScheduledDispatcher
+from osc_kreuz.receiver.base_receiver import BaseReceiver
+from osc_kreuz.receiver.spatial_receiver import SpatialReceiver
+from osc_kreuz.receiver.updates import OSCMessage, iter_bundles
+from osc_kreuz.scheduler import Scheduler
+
+
+def test_scheduler_order_and_cancel():
+    scheduler = Scheduler("test scheduler")
+    scheduler.start()
+
+    calls = []
+    done = Event()
+    now = monotonic()
+
+    scheduler.call_at(now + 0.05, calls.append, 2)
+    scheduler.call_at(now + 0.01, calls.append, 1)
+    cancelled = scheduler.call_at(now + 0.03, calls.append, "cancelled")
+    scheduler.call_later(0.08, done.set)
+    scheduler.cancel(cancelled)
+
+    assert done.wait(1)
+    assert calls == [1, 2]
+
+    # exceptions in callbacks don't stop the scheduler
+    scheduler.call_later(0, lambda: 1 / 0)
+    done.clear()
+    scheduler.call_later(0.01, done.set)
+    assert done.wait(1)
+
+    scheduler.shutdown()
+    assert scheduler.thread is not None
+    sleep(0.01)
+    assert not scheduler.thread.is_alive()
+
+
+def test_frame_clock():
+    scheduler = Scheduler("test scheduler")
+    scheduler.start()
+    try:
+        clock = scheduler.frame_clock(0.01)
+        assert scheduler.frame_clock(0.01) is clock
+
+        ticks = []
+        clock.add(lambda: ticks.append(clock.event.when))
+        sleep(0.1)
+        clock.remove(clock.callbacks[0])
+        n_ticks = len(ticks)
+        sleep(0.03)
+
+        # ticks are aligned to multiples of the interval and stop without callbacks
+        assert 5 <= n_ticks <= 11
+        # a tick that was already running when the callback was removed may still finish
+        assert len(ticks) <= n_ticks + 1
+        assert all(abs(tick / 0.01 - round(tick / 0.01)) < 1e-6 for tick in ticks)
+    finally:
+        scheduler.shutdown()
+
+
+def test_scheduled_dispatcher():
+    scheduler = Scheduler("test scheduler")
+    scheduler.start()
+    try:
+        received = []
+        dispatcher = ScheduledDispatcher(scheduler)
+        dispatcher.map("/source/xyz", lambda address, *args: received.append(args))
+
+        # a bundle for the future is handled at its timetag without blocking, messages that are due right away
+        bundle = next(
+            iter_bundles(
+                [OSCMessage("/source/xyz", [0, 1.0, 2.0, 3.0]).build()],
+                timestamp=time() + 0.05,
+            )
+        )
+        dispatcher.call_handlers_for_packet(bundle.dgram, ("127.0.0.1", 0))
+        dispatcher.call_handlers_for_packet(
+            OSCMessage("/source/xyz", [1, 0.0, 0.0, 0.0]).build().dgram,
+            ("127.0.0.1", 0),
+        )
+        assert received == [(1, 0.0, 0.0, 0.0)]
+
+        sleep(0.1)
+        assert received == [(1, 0.0, 0.0, 0.0), (0, 1.0, 2.0, 3.0)]
+    finally:
+        scheduler.shutdown()
+
+
+def test_update_interval_on_scheduler(global_conf):
+    scheduler = Scheduler("test scheduler")
+    scheduler.start()
+    BaseReceiver.scheduler = scheduler
+    receiver = SpatialReceiver(hosts=[], updateintervall=20)
+    sent = []
+    receiver.send_updates = lambda msgs, *args: sent.extend(msgs)
+    try:
+        for x in (1.0, 2.0):
+            BaseReceiver.sources[0].setPosition("xyz", x, 0, 0)
+            receiver.sourcePositionChanged(0)
+
+        # the rate limit of the source is released by the scheduler, without a timer thread
+        assert not any(t.name.startswith("rel_") for t in threading.enumerate())
+        assert [msg.values for msg in sent] == [[0, 1.0, 0, 0]]
+        sleep(0.05)
+        assert [msg.values for msg in sent] == [[0, 1.0, 0, 0], [0, 2.0, 0, 0]]
+    finally:
+        scheduler.shutdown()
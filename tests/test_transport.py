@@ -0,0 +1,271 @@
+from multiprocessing import shared_memory
+import os
+import socket
+import subprocess
+import sys
+from threading import Event
+from time import sleep
+import uuid
+
+import numpy as np
+import pytest
+from pythonosc import slip
+from pythonosc.osc_bundle import OscBundle
+from pythonosc.osc_message import OscMessage
+
+from osc_kreuz.receiver import createReceiverClient
+from osc_kreuz.receiver.base_receiver import BaseReceiver, ReceiverException
+from osc_kreuz.receiver.shared_memory import (
+    STATE_TABLE_MAGIC,
+    STATE_TABLE_VERSION,
+    SharedMemoryState,
+    SharedMemoryStateReader,
+    header_dtype,
+    state_table_attributes,
+)
+from osc_kreuz.receiver.source_state import SourceStateFile, load_source_state
+from osc_kreuz.receiver.transport import ResolvingUDPClient, TCPClient
+from osc_kreuz.receiver.updates import OSCMessage
+from osc_kreuz.soundobject import SoundObject
+from osc_kreuz.resolver import Resolver
+import osc_kreuz.str_keys_conventions as skc
+
+
+def read_messages(conn: socket.socket, n_messages: int) -> list[OscMessage]:
+    """read SLIP framed packets until n_messages osc messages were received"""
+    buffer = b""
+    messages: list[OscMessage] = []
+    conn.settimeout(2)
+    while len(messages) < n_messages:
+        buffer += conn.recv(4096)
+        *frames, buffer = buffer.split(slip.END)
+        for frame in frames:
+            if not frame:
+                continue
+            dgram = slip.decode(frame)
+            if OscBundle.dgram_is_bundle(dgram):
+                messages.extend(OscBundle(dgram))
+            else:
+                messages.append(OscMessage(dgram))
+    return messages
+
+
+def test_tcp_transport(global_conf):
+    server = socket.create_server(("127.0.0.1", 0))
+    port = server.getsockname()[1]
+    server.settimeout(5)
+
+    receiver = createReceiverClient(
+        {
+            "type": "spatial",
+            "hosts": [{"hostname": "127.0.0.1", "port": port, "transport": "tcp"}],
+        }
+    )
+    client = receiver.receivers[0][1]
+    assert isinstance(client, TCPClient)
+    client.reconnect_interval = 0.05
+
+    try:
+        # the complete state is sent after connecting
+        conn, _ = server.accept()
+        msgs = read_messages(conn, 2)
+        assert [(msg.address, msg.params[0]) for msg in msgs] == [
+            ("/source/xyz", 0),
+            ("/source/xyz", 1),
+        ]
+
+        receiver.send_updates([OSCMessage("/source/xyz", [1, 1.0, 2.0, 3.0])])
+        msgs = read_messages(conn, 1)
+        assert msgs[0].params == [1, 1.0, 2.0, 3.0]
+
+        # after the connection is lost the client reconnects and resends the state
+        conn.close()
+        for _ in range(20):
+            receiver.send_updates([OSCMessage("/source/xyz", [0, 0.0, 0.0, 0.0])])
+            server.settimeout(0.05)
+            try:
+                conn, _ = server.accept()
+                break
+            except socket.timeout:
+                pass
+        msgs = read_messages(conn, 2)
+        assert [msg.params[0] for msg in msgs] == [0, 1]
+        conn.close()
+    finally:
+        client.close()
+        server.close()
+
+
+def test_unix_transport(tmp_path, global_conf):
+    path = str(tmp_path / "receiver.sock")
+    receiver = createReceiverClient(
+        {"type": "spatial", "hosts": [{"hostname": path, "transport": "unix"}]}
+    )
+
+    # nobody is listening yet, packets are dropped
+    receiver.send_updates([OSCMessage("/source/xyz", [0, 1.0, 2.0, 3.0])])
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    server.bind(path)
+    server.settimeout(2)
+    try:
+        receiver.send_updates([OSCMessage("/source/xyz", [0, 1.0, 2.0, 3.0])])
+        msg = OscMessage(server.recv(1024))
+        assert msg.address == "/source/xyz"
+        assert msg.params == [0, 1.0, 2.0, 3.0]
+    finally:
+        server.close()
+
+
+def test_shared_memory_state(global_conf):
+    name = f"osc_kreuz_test_{uuid.uuid4().hex[:8]}"
+    receiver = createReceiverClient({"type": "sharedmemory", "name": name})
+    assert isinstance(receiver, SharedMemoryState)
+    reader = SharedMemoryStateReader(name)
+    try:
+        source = BaseReceiver.sources[1]
+        sequence = reader.sequence
+
+        source.setPosition("xyz", 1.0, 2.0, 3.0)
+        receiver.sourcePositionChanged(1)
+        source._torendererSends[2] = 0.5
+        receiver.sourceRenderGainChanged(1, 2)
+        source.setAttribute(skc.SourceAttributes.doppler, 1)
+        receiver.sourceAttributeChanged(1, skc.SourceAttributes.doppler)
+
+        assert reader.sequence == sequence + 3
+        record = reader.read_source(1)
+        assert record["sequence"] % 2 == 0
+        assert list(record["position"]) == [1.0, 2.0, 3.0]
+        assert record["gains"][2] == 0.5
+        assert (
+            record["attributes"][
+                state_table_attributes.index(skc.SourceAttributes.doppler)
+            ]
+            == 1.0
+        )
+        assert list(reader.read_source(0)["gains"]) == [0.0, 0.0, 0.0]
+
+        # a record that is left half written is given up on instead of spinning forever
+        reader.records["sequence"][0] += 1
+        assert reader.read_source(0, max_attempts=10) is None
+    finally:
+        reader.close()
+        receiver.close()
+
+
+def test_shared_memory_in_use(global_conf):
+    # memory of a running osc-kreuz is never replaced
+    name = f"osc_kreuz_test_{uuid.uuid4().hex[:8]}"
+    receiver = createReceiverClient({"type": "sharedmemory", "name": name})
+    try:
+        with pytest.raises(ReceiverException):
+            createReceiverClient({"type": "sharedmemory", "name": name})
+        assert int(receiver.header["owner_pid"]) == os.getpid()
+    finally:
+        receiver.close()
+
+    # memory left over by an osc-kreuz that is not running anymore is replaced
+    exited = subprocess.run(
+        [sys.executable, "-c", "import os; print(os.getpid())"],
+        capture_output=True,
+        check=True,
+    )
+    leftover = shared_memory.SharedMemory(
+        name=name, create=True, size=header_dtype.itemsize
+    )
+    header = np.ndarray((), dtype=header_dtype, buffer=leftover.buf)
+    header["magic"] = STATE_TABLE_MAGIC
+    header["version"] = STATE_TABLE_VERSION
+    header["owner_pid"] = int(exited.stdout)
+    del header
+    leftover.close()
+    receiver = createReceiverClient({"type": "sharedmemory", "name": name})
+    assert int(receiver.header["owner_pid"]) == os.getpid()
+    receiver.close()
+
+
+def test_source_state_file(tmp_path, global_conf):
+    BaseReceiver.sources = [SoundObject(), SoundObject(coordinate_scaling_factor=2)]
+
+    path = tmp_path / "sources.state"
+    assert not load_source_state(path, BaseReceiver.sources)
+
+    receiver = SourceStateFile(path, flush_interval=0.01)
+    source = BaseReceiver.sources[1]
+    source.setPosition("xyz", 1.0, 2.0, 3.0)
+    receiver.sourcePositionChanged(1)
+    source.setRendererGain(2, 0.5)
+    receiver.sourceRenderGainChanged(1, 2)
+    source.setAttribute(skc.SourceAttributes.planewave, 1)
+    receiver.sourceAttributeChanged(1, skc.SourceAttributes.planewave)
+    sleep(0.05)
+    receiver.close()
+
+    # a restarted osc-kreuz gets the same state without any input
+    restored = [SoundObject(), SoundObject(coordinate_scaling_factor=2)]
+    assert load_source_state(path, restored)
+    assert restored[1].getPosition("xyz") == [2.0, 4.0, 6.0]
+    assert restored[1].getPosition("aed") == source.getPosition("aed")
+    assert restored[1].getRenderGain(2) == 0.5
+    assert restored[1].getAttribute(skc.SourceAttributes.planewave) == 1
+    assert isinstance(restored[1].getAttribute(skc.SourceAttributes.planewave), int)
+    assert restored[0].getPosition("xyz") == [1.0, 0.0, 0.0]
+
+    path.write_bytes(b"garbage")
+    assert not load_source_state(path, restored)
+
+
+def test_resolving_udp_client(global_conf):
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(("127.0.0.1", 0))
+    server.settimeout(2)
+    port = server.getsockname()[1]
+
+    # the first two lookups fail, like during a dns outage
+    lookups = []
+
+    def lookup(hostname):
+        lookups.append(hostname)
+        if len(lookups) < 3:
+            raise socket.gaierror("temporary failure in name resolution")
+        return "127.0.0.1"
+
+    resolver = Resolver(retry_interval=0.01)
+    resolver.lookup = lookup
+    resolved = Event()
+
+    # creating the client doesn't block, packets are dropped until the host is resolved
+    client = ResolvingUDPClient(
+        "renderer.invalid", port, resolver, on_resolve=resolved.set
+    )
+    client.start()
+    client.send(OSCMessage("/source/xyz", [0, 1.0, 2.0, 3.0]).build())
+
+    try:
+        assert resolved.wait(2)
+        assert lookups == ["renderer.invalid"] * 3
+        assert client._address == "127.0.0.1"
+        assert resolver.get("renderer.invalid") == "127.0.0.1"
+
+        client.send(OSCMessage("/source/xyz", [1, 1.0, 2.0, 3.0]).build())
+        msg = OscMessage(server.recv(1024))
+        assert msg.params == [1, 1.0, 2.0, 3.0]
+
+        # ip addresses are used right away
+        ip_client = ResolvingUDPClient("127.0.0.1", port, resolver)
+        ip_client.start()
+        assert ip_client.client is not None
+
+        # hosts that are not part of a receiver get a client that stops following the hostname once it is resolved
+        BaseReceiver.resolver = resolver
+        receiver = createReceiverClient({"type": "spatial"})
+        [(_, unknown_host)] = receiver.get_receivers_for_host("renderer.invalid", port)
+        assert isinstance(unknown_host, ResolvingUDPClient)
+        unknown_host.send(OSCMessage("/source/xyz", [2, 1.0, 2.0, 3.0]).build())
+        assert OscMessage(server.recv(1024)).params == [2, 1.0, 2.0, 3.0]
+        assert resolver.callbacks["renderer.invalid"] == [client.set_address]
+    finally:
+        client.close()
+        resolver.stop()
+        server.close()